@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Cold build versus warm (fully cached) rebuild of many generated programs.
+
+import argparse
+import glob
+import os
+import time
+import tempfile
+
+from common import ROOT, run_quietly
+
+def generate_programs(directory, count):
+    """Write count small, distinct programs and return their paths."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"prog{i}.vpl")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'greeting ➡️ "program {i}"\n')
+            f.write('holla greeting\n')
+            f.write(f'holla {i} + 1\n')
+        paths.append(path)
+    return paths
+
+def build(vibe, programs, backend, cache_dir, out_dir):
+    start = time.perf_counter()
+    run_quietly([vibe, 'compile', '-b', backend, '--cache-dir', cache_dir] + programs, cwd=out_dir)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000, help='Number of programs (default: 10000)')
+    parser.add_argument('-b', '--backend', default='x86_64', help='Backend to build with (default: x86_64)')
+    args = parser.parse_args()
+
+    vibe = os.path.join(ROOT, 'vibe')
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = os.path.join(tmp, 'src')
+        os.mkdir(sources)
+        programs = generate_programs(sources, args.count)
+        cache_dir = os.path.join(tmp, 'cache')
+
+        cold_out = os.path.join(tmp, 'cold')
+        warm_out = os.path.join(tmp, 'warm')
+        os.mkdir(cold_out)
+        os.mkdir(warm_out)
+
+        cold = build(vibe, programs, args.backend, cache_dir, cold_out)
+        warm = build(vibe, programs, args.backend, cache_dir, warm_out)
+
+        # The cached executables must be byte-identical to the fresh ones
+        mismatches = 0
+        for path in glob.glob(os.path.join(cold_out, '*')):
+            with open(path, 'rb') as f, open(os.path.join(warm_out, os.path.basename(path)), 'rb') as g:
+                if f.read() != g.read():
+                    mismatches += 1
+
+        print(f"{args.count} programs, {os.cpu_count()} CPUs, {args.backend} backend")
+        print(f"cold build:    {cold:8.2f}s ({cold / args.count * 1000:.2f}ms/program)")
+        print(f"warm rebuild:  {warm:8.2f}s ({warm / args.count * 1000:.2f}ms/program)")
+        print(f"speedup:       {cold / warm:8.1f}x")
+        if mismatches:
+            print(f"{mismatches} cached executables differ from fresh builds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Run time and peak RSS of compiled programs printing chains of 2 to 1000 concatenated pieces,
+# joined with one runtime call per chain against a revision that makes one call per +.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import SRC, ROOT, interpret, run_quietly, compiler_command
+from vibe.bench_diff import unavailable, measure
+from bench_ir import export_revision
+
+REPEAT = 3
+
+# Engine name, backend and extra compiler options
+ENGINES = [
+    ('x86_64', 'x86_64', []),
+    ('simple', 'simple', []),
+    ('llvm', 'llvm', []),
+    ('llvm-freestanding', 'llvm', ['--freestanding']),
+]
+
+PIECES = [2, 3, 10, 100, 1000]
+
+def default_baseline():
+    """The commit before chains were joined, or HEAD while that is not committed yet."""
+    added = subprocess.run(['git', '-C', ROOT, 'log', '-S', 'JOIN', '--format=%H', '--', 'src/ir.py'],
+                           check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return f"{added[-1]}~1" if added else 'HEAD'
+
+def chain_program(pieces, statements, width):
+    """statements chains of pieces alternating a width-byte variable and a separator.
+
+    The variable is reassigned before every chain, so no chain is the same
+    expression as the one before and none is evaluated only once.
+    """
+    chain = ' + '.join('word' if i % 2 == 0 else '"-"' for i in range(pieces))
+    lines = []
+    for statement in range(statements):
+        lines.append(f'word ➡️ "{str(statement).rjust(width, "x")}"')
+        lines.append(f'holla {chain}')
+    return '\n'.join(lines) + '\n'
+
+def run(src, backend, options, program, executable, repeat):
+    """Build program with the compiler in src; returns (output, best seconds, peak RSS bytes).
+
+    Returns None when it does not build: compilers before chains were
+    joined recursed once per + and cannot type the longest chains.
+    """
+    try:
+        run_quietly(compiler_command(src) + [program, '-b', backend, '-o', executable, '--no-cache'] + options)
+    except subprocess.CalledProcessError:
+        return None
+    output, _, _, peak = measure([executable], trace=True)
+    best = min(measure([executable])[2] for _ in range(repeat))
+    return output, best, peak
+
+def kilobytes(peak):
+    return f"{peak // 1024}KB" if peak is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, default=50, help='Chains per program')
+    parser.add_argument('--width', type=int, default=64, help='Length of the variable in each chain')
+    parser.add_argument('--pieces', type=int, nargs='+', default=PIECES, help='Pieces per chain')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against (default: the commit before chains were joined)')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT, help='Runs per measurement')
+    args = parser.parse_args()
+    revision = args.baseline or default_baseline()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = export_revision(revision, os.path.join(tmp, 'baseline'))
+        print(f"{args.statements} chains per program, baseline {revision}")
+        print(f"{'pieces':>6} {'engine':<18} {'baseline':>10} {'joined':>10} {'baseline':>10} {'joined':>10}")
+        for pieces in args.pieces:
+            source = chain_program(pieces, args.statements, args.width)
+            expected = interpret(source).encode('utf-8')
+            program = os.path.join(tmp, f"chain{pieces}.vpl")
+            with open(program, 'w') as f:
+                f.write(source)
+            for engine, backend, options in ENGINES:
+                if unavailable(engine):
+                    print(f"{pieces:>6} {engine:<18} skipped: {unavailable(engine)}")
+                    continue
+                executable = os.path.join(tmp, engine)
+                before = run(baseline, backend, options, program, executable, args.repeat)
+                joined = run(SRC, backend, options, program, executable, args.repeat)
+                if joined is None:
+                    print(f"{pieces:>6} {engine:<18} does not build")
+                    failures += 1
+                    continue
+                output, after, after_peak = joined
+                before_time = f"{before[1] * 1000:>8.2f}ms" if before else f"{'no build':>10}"
+                print(f"{pieces:>6} {engine:<18} {before_time} {after * 1000:>8.2f}ms "
+                      f"{kilobytes(before[2] if before else None):>10} {kilobytes(after_peak):>10}")
+                if output != expected:
+                    print(f"{engine}: output differs from the Interpreter")
+                    failures += 1
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
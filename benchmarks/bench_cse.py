@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Interpreter and compiled run time of programs that repeat the same prefixes, with common
+# subexpression elimination (vibe run -O for the interpreter) against a revision without it.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import SRC, ROOT, TREE_IMPORTS, run_quietly, time_command, compiler_command
+from vibe.bench_diff import unavailable
+from bench_ir import export_revision
+
+REPEAT = 5
+
+BACKENDS = ['x86_64', 'llvm']
+
+# Runs in a fresh interpreter with one tree's src first on the path; prints the best time
+# of parsing and interpreting, with the elimination when the last argument is 'cse'
+WORKER = TREE_IMPORTS + '''
+import time
+Lexer, Parser = load('tokenizer').Lexer, load('parser').Parser
+Interpreter = load('interpreter').Interpreter
+with open(sys.argv[2]) as f:
+    source = f.read()
+options = {'cse': True} if sys.argv[4] == 'cse' else {}
+best = None
+sys.stdout = open(os.devnull, 'w')
+for _ in range(int(sys.argv[3])):
+    start = time.perf_counter()
+    Interpreter(**options).interpret(Parser(Lexer(source).tokenize()).parse())
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+sys.__stdout__.write(f"{best}\\n")
+'''
+
+def default_baseline():
+    """The commit before the pass was added, or HEAD while it is not committed yet."""
+    added = subprocess.run(['git', '-C', ROOT, 'log', '--diff-filter=A', '--format=%H', '--',
+                            'src/cse.py'], check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return f"{added[-1]}~1" if added else 'HEAD'
+
+def prefix_program(statements, period, width):
+    """Greetings width characters long sharing a prefix, whose name changes every period statements."""
+    lines = [f'greeting ➡️ "{"Hello " * (width // 6)}"', 'separator ➡️ ", "']
+    for i in range(statements):
+        if i % period == 0:
+            lines.append(f'name ➡️ "visitor {i}"')
+        lines.append(f'holla greeting + separator + name + " number {i}"')
+    return '\n'.join(lines) + '\n'
+
+def interpret_time(src, program, repeat, mode):
+    result = subprocess.run([sys.executable, '-c', WORKER, src, program, str(repeat), mode],
+                            check=True, stdout=subprocess.PIPE, text=True)
+    return float(result.stdout)
+
+def run_time(src, backend, program, executable, repeat):
+    run_quietly(compiler_command(src) + [program, '-b', backend, '-o', executable, '--no-cache'])
+    return time_command([executable], repeat), run_quietly([executable]).stdout
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, default=2000, help='Statements per program')
+    parser.add_argument('--periods', type=int, nargs='+', default=[1, 10, 1000],
+                        help='Statements between reassignments of the shared name')
+    parser.add_argument('--widths', type=int, nargs='+', default=[6, 300000],
+                        help='Lengths of the shared greeting')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against (default: the commit before the pass)')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT,
+                        help='Runs per measurement')
+    args = parser.parse_args()
+    revision = args.baseline or default_baseline()
+
+    sys.path.insert(0, SRC)
+    from vibe.tokenizer import Lexer
+    from vibe.parser import Parser
+    from vibe.cse import CommonSubexpressions
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = export_revision(revision, os.path.join(tmp, 'baseline'))
+        print(f"{args.statements} statements, baseline {revision}")
+        print(f"{'width':>6} {'period':>6} {'saved':>7} {'engine':<12} {'baseline':>10} {'cse':>10} {'speedup':>8}")
+        for width in args.widths:
+            for period in args.periods:
+                program = os.path.join(tmp, f"prefix-{width}-{period}.vpl")
+                with open(program, 'w') as f:
+                    f.write(prefix_program(args.statements, period, width))
+                with open(program) as f:
+                    cse = CommonSubexpressions()
+                    cse.eliminate(Parser(Lexer(f.read()).tokenize()).parse())
+                row = f"{width:>6} {period:>6} {cse.saved:>7}"
+
+                before = interpret_time(baseline, program, args.repeat, 'plain')
+                after = interpret_time(SRC, program, args.repeat, 'cse')
+                print(f"{row} {'interpreter':<12} {before * 1000:>8.1f}ms {after * 1000:>8.1f}ms "
+                      f"{before / after:>7.2f}x")
+                for backend in BACKENDS:
+                    if unavailable(backend):
+                        print(f"{row} {backend:<12} skipped: {unavailable(backend)}")
+                        continue
+                    results = [run_time(src, backend, program, os.path.join(tmp, backend), args.repeat)
+                               for src in (baseline, SRC)]
+                    (before, expected), (after, output) = results
+                    print(f"{row} {backend:<12} {before * 1000:>8.1f}ms {after * 1000:>8.1f}ms "
+                          f"{before / after:>7.2f}x")
+                    if output != expected:
+                        print(f"{backend}: output differs from the baseline")
+                        failures += 1
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Exec-to-exit latency and executable size of --freestanding builds, which start on raw
+# syscalls, against the libc-linked builds of the same backend.
+
+import os
+import sys
+import tempfile
+import time
+
+from common import test_programs, run_quietly
+from bench_precompute import build
+from vibe.bench_diff import unavailable
+from vibe.vibe_compiler import section_sizes
+
+REPEAT = 200
+
+# Each libc-linked engine and its freestanding counterpart
+PAIRS = [('native', 'native-freestanding'), ('llvm', 'llvm-freestanding')]
+
+def exec_latency(exe, repeat):
+    """Mean time from spawning exe to reaping it, its output going to /dev/null."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        actions = [(os.POSIX_SPAWN_DUP2, devnull, 1)]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            pid = os.posix_spawn(exe, [exe], os.environ, file_actions=actions)
+            os.waitpid(pid, 0)
+        return (time.perf_counter() - start) / repeat
+    finally:
+        os.close(devnull)
+
+def text_size(exe):
+    sizes = section_sizes(exe)
+    return sizes['text'] if sizes else 0
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+    pairs = [pair for pair in PAIRS if not unavailable(pair[0]) and not unavailable(pair[1])]
+    for pair in PAIRS:
+        if pair not in pairs:
+            print(f"{pair[1]}: skipped, {unavailable(pair[1]) or unavailable(pair[0])}")
+    failures = 0
+    print(f"{'program':<14} {'backend':<8} {'libc':>9} {'freestanding':>13} {'size':>8} {'freestanding':>13} "
+          f"{'text':>7} {'freestanding':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for program in test_programs():
+            name = os.path.splitext(os.path.basename(program))[0]
+            for libc_engine, freestanding_engine in pairs:
+                linked = os.path.join(tmp, f"{name}-{libc_engine}")
+                freestanding = os.path.join(tmp, f"{name}-{freestanding_engine}")
+                build(program, libc_engine, linked, False)
+                build(program, freestanding_engine, freestanding, False)
+                if run_quietly([freestanding]).stdout != run_quietly([linked]).stdout:
+                    failures += 1
+                    print(f"{name}: {freestanding_engine} output differs from {libc_engine}")
+                    continue
+
+                linked_time = exec_latency(linked, repeat)
+                freestanding_time = exec_latency(freestanding, repeat)
+                print(f"{name:<14} {libc_engine:<8} {linked_time * 1e6:>7.0f}us {freestanding_time * 1e6:>11.0f}us "
+                      f"{os.path.getsize(linked):>8} {os.path.getsize(freestanding):>13} "
+                      f"{text_size(linked):>7} {text_size(freestanding):>13}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Compile latency of the simple backend with as/ld versus the in-process assembler.
+
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from common import ROOT, test_programs, run_quietly, time_command
+from vibe.simple_compiler import compile_file
+
+REPEAT = 10
+
+def toolchain_targets_aarch64(directory):
+    """True when the as/ld on PATH can build an AArch64 executable."""
+    source = os.path.join(directory, 'probe.s')
+    with open(source, 'w') as f:
+        f.write(".global _start\n_start:\n    mov x8, #93\n    svc #0\n")
+    try:
+        run_quietly(['as', '-o', source + '.o', source])
+        run_quietly(['ld', '-o', source + '.exe', source + '.o'])
+        return True
+    except Exception:
+        return False
+
+def time_compile(program, exe, integrated):
+    """Average time of compile_file in this process, without interpreter startup."""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        with redirect_stdout(io.StringIO()):
+            compile_file(program, exe, integrated=integrated)
+    return (time.perf_counter() - start) / REPEAT
+
+def milliseconds(seconds, width):
+    if seconds is None:
+        return f"{'skipped':>{width}}"
+    return f"{seconds * 1000:>{width - 2}.1f}ms"
+
+def main():
+    vibe = os.path.join(ROOT, 'vibe')
+    print(f"{'':<20} {'compile_file':>24} {'vibe compile':>24}")
+    print(f"{'program':<20} {'as + ld':>12}{'integrated':>12} {'as + ld':>12}{'integrated':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        external = toolchain_targets_aarch64(tmp)
+        for program in test_programs():
+            name = os.path.splitext(os.path.basename(program))[0]
+            exe = os.path.join(tmp, name)
+            command = [vibe, 'compile', program, '-b', 'simple', '--no-cache', '-o', exe]
+
+            results = [
+                time_compile(program, exe, False) if external else None,
+                time_compile(program, exe, True),
+                time_command(command, REPEAT) if external else None,
+                time_command(command + ['--integrated-as'], REPEAT),
+            ]
+            print(f"{name:<20} {milliseconds(results[0], 12)}{milliseconds(results[1], 12)} "
+                  f"{milliseconds(results[2], 12)}{milliseconds(results[3], 12)}")
+
+        if not external:
+            print("as/ld on PATH cannot target AArch64; toolchain timings skipped")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Compile time of every backend on large programs, optionally against an older revision
+# of the compiler: generating code in-process, and whole builds where the tools are installed.
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from common import ROOT, SRC, TREE_IMPORTS, run_quietly, compiler_command
+from vibe.bench_diff import unavailable
+from bench_streaming import long_program
+from bench_llvm_opt import concat_heavy_program
+from bench_peephole import mixed_program
+
+REPEAT = 3
+
+# Runs in a fresh interpreter with one tree's src first on the path, so the two
+# compilers never share modules; prints the best time and the lines generated
+WORKER = TREE_IMPORTS + '''
+import time
+Lexer, Parser = load('tokenizer').Lexer, load('parser').Parser
+backend, program, repeat = sys.argv[2], sys.argv[3], int(sys.argv[4])
+if backend == 'simple':
+    ARMCodeGenerator = load('simple_compiler').ARMCodeGenerator
+    generate = lambda ast, f: ARMCodeGenerator().generate(ast, f)
+elif backend == 'native':
+    CodeGenerator = load('compiler').CodeGenerator
+    generate = lambda ast, f: CodeGenerator().compile(ast, f)
+elif backend == 'x86_64':
+    X86CodeGenerator = load('x86_compiler').X86CodeGenerator
+    generate = lambda ast, f: X86CodeGenerator().generate(ast, f)
+else:
+    LLVMCompiler = load('llvm_compiler').LLVMCompiler
+    generate = lambda ast, f: LLVMCompiler().compile(ast, f)
+with open(program) as f:
+    source = f.read()
+best = None
+for _ in range(repeat):
+    start = time.perf_counter()
+    ast = Parser(Lexer(source).tokenize()).parse()
+    with open(sys.argv[5], 'w') as f:
+        generate(ast, f)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+with open(sys.argv[5]) as f:
+    lines = sum(1 for _ in f)
+print(best, lines)
+'''
+
+BACKENDS = ['simple', 'native', 'x86_64', 'llvm']
+
+def programs(statements):
+    """Large generated programs: repeated work, constant arithmetic, long concatenation."""
+    return {
+        'repeated': long_program(statements // 3),
+        'mixed': mixed_program(statements // 3),
+        'concat': concat_heavy_program(statements),
+    }
+
+def export_revision(revision, directory):
+    """Write the src directory of a git revision into directory; returns its path."""
+    archive = subprocess.run(['git', '-C', ROOT, 'archive', revision, 'src'],
+                             check=True, stdout=subprocess.PIPE).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return os.path.join(directory, 'src')
+
+def compile_time(src, backend, program, output, repeat):
+    result = subprocess.run([sys.executable, '-c', WORKER, src, backend, program, str(repeat), output],
+                            check=True, stdout=subprocess.PIPE, text=True)
+    seconds, lines = result.stdout.split()
+    return float(seconds), int(lines)
+
+def build_time(src, backend, program, executable, repeat):
+    """Best wall time of a whole uncached build with vibe_compiler, including as/ld or llc."""
+    command = compiler_command(src) + [program, '-b', backend, '-o', executable, '--no-cache']
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_quietly(command)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, nargs='+', default=[10000, 50000],
+                        help='Program sizes in statements')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against, e.g. the commit before the IR')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT,
+                        help='Compiles per measurement; the fastest is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = export_revision(args.baseline, os.path.join(tmp, 'baseline')) if args.baseline else None
+        output = os.path.join(tmp, 'output')
+        executable = os.path.join(tmp, 'program')
+        trees = [('', SRC)] + ([('baseline ', baseline)] if baseline else [])
+
+        header = f"{'program':<10} {'statements':>10} {'backend':<8}"
+        for label, _ in trees:
+            header += f" {label + 'generate':>18} {'lines':>9} {label + 'build':>15}"
+        print(header)
+        for statements in args.statements:
+            for name, source in programs(statements).items():
+                program = os.path.join(tmp, f"{name}-{statements}.vpl")
+                with open(program, 'w') as f:
+                    f.write(source)
+                for backend in BACKENDS:
+                    row = f"{name:<10} {statements:>10} {backend:<8}"
+                    for label, src in trees:
+                        seconds, lines = compile_time(src, backend, program, output, args.repeat)
+                        build = '-'
+                        if not unavailable(backend):
+                            build = f"{build_time(src, backend, program, executable, args.repeat) * 1000:.0f}ms"
+                        row += f" {seconds * 1000:>16.0f}ms {lines:>9} {build:>15}"
+                    print(row)
+
+if __name__ == "__main__":
+    main()
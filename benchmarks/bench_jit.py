@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# End-to-end latency: `vibe run`, `vibe run --jit`, and `vibe compile` + exec.
+
+import os
+import sys
+import tempfile
+import time
+
+from common import ROOT, test_programs, interpret, run_quietly
+from bench_llvm_opt import concat_heavy_program
+
+REPEAT = 10
+
+def average(function):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - start) / REPEAT
+
+def main():
+    vibe = os.path.join(ROOT, 'vibe')
+    failures = 0
+    print(f"{'program':<20} {'vibe run':>10} {'--jit':>10} {'compile+exec':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # A larger generated program, where per-statement costs outweigh startup
+        heavy = os.path.join(tmp, 'heavy.vpl')
+        with open(heavy, 'w') as f:
+            f.write(concat_heavy_program(2000))
+
+        for program in test_programs() + [heavy]:
+            name = os.path.splitext(os.path.basename(program))[0]
+            exe = os.path.join(tmp, name)
+            with open(program, 'r') as f:
+                expected = interpret(f.read())
+            if run_quietly([vibe, 'run', '--jit', program]).stdout.decode('utf-8') != expected:
+                failures += 1
+                print(f"{name}: JIT output differs from the Interpreter")
+                continue
+
+            def compile_and_exec():
+                run_quietly([vibe, 'compile', program, '-b', 'x86_64', '-o', exe])
+                run_quietly([exe])
+
+            interpreted = average(lambda: run_quietly([vibe, 'run', program]))
+            jitted = average(lambda: run_quietly([vibe, 'run', '--jit', program]))
+            compiled = average(compile_and_exec)
+            print(f"{name:<20} {interpreted * 1000:>8.1f}ms {jitted * 1000:>8.1f}ms "
+                  f"{compiled * 1000:>11.1f}ms")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Section sizes and assemble time with and without string literal interning.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from common import parse_source, run_quietly
+from vibe.simple_compiler import ARMCodeGenerator
+from vibe.x86_compiler import X86CodeGenerator
+from vibe.llvm_compiler import LLVMCompiler
+from vibe.compiler import CodeGenerator
+from vibe.arm_assembler import write_executable
+from vibe.vibe_compiler import section_sizes
+
+MESSAGES = ["Hello World", "World", "Status: ok", "ok", "Error: file not found",
+            "not found", "found", "Warning: disk almost full", "almost full", "full"]
+
+def repetitive_program(statements):
+    """Log-style output repeating a handful of messages, many of them suffixes of others."""
+    lines = ['count ➡️ 0']
+    for i in range(statements):
+        message = MESSAGES[i % len(MESSAGES)]
+        if i % 3 == 0:
+            lines.append(f'holla "{message}"')
+        elif i % 3 == 1:
+            lines.append(f'line ➡️ "{message}" + ": " + "{MESSAGES[(i * 7) % len(MESSAGES)]}"')
+        else:
+            lines.append('count ➡️ count + 1')
+            lines.append(f'holla line + " #" + count')
+    return '\n'.join(lines) + '\n'
+
+def generate(backend, source, intern):
+    """Generate the backend's output with interning switched on or off."""
+    generator = {'simple': ARMCodeGenerator, 'x86_64': X86CodeGenerator,
+                 'llvm': LLVMCompiler, 'native': CodeGenerator}[backend]()
+    generator.literals.intern = intern
+    ast = parse_source(source)
+    code = generator.compile(ast) if backend in ('llvm', 'native') else generator.generate(ast)
+    return code, generator.literals.stored_bytes()
+
+def build(backend, code, directory):
+    """Assemble code into an ELF file; returns (seconds, path) or None when no tool can."""
+    path = os.path.join(directory, backend)
+    start = time.perf_counter()
+    if backend == 'simple':
+        write_executable(code, path)
+    elif backend == 'x86_64' and shutil.which('as') and shutil.which('ld'):
+        with open(path + '.s', 'w') as f:
+            f.write(code)
+        run_quietly(['as', '-o', path + '.o', path + '.s'])
+        run_quietly(['ld', '-o', path, path + '.o'])
+    elif backend == 'llvm' and shutil.which('llc'):
+        with open(path + '.ll', 'w') as f:
+            f.write(code)
+        path += '.o'
+        run_quietly(['llc', '-filetype=obj', '-o', path, path[:-2] + '.ll'])
+    else:
+        # The native backend needs an AArch64 toolchain and libc
+        return None
+    return time.perf_counter() - start, path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, default=30000, help='Statements in the program')
+    args = parser.parse_args()
+
+    source = repetitive_program(args.statements)
+    print(f"{args.statements} statements, {source.count(chr(34)) // 2} string literals")
+    print(f"{'backend':<8} {'interning':<10} {'literals':>10} {'text':>10} {'data':>10} {'assemble':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ('simple', 'x86_64', 'llvm', 'native'):
+            for intern in (False, True):
+                code, literal_bytes = generate(backend, source, intern)
+                built = build(backend, code, tmp)
+                columns = [f"{literal_bytes:>10}"]
+                if built:
+                    seconds, path = built
+                    sizes = section_sizes(path)
+                    columns += [f"{sizes['text']:>10}", f"{sizes['data'] + sizes['rodata']:>10}",
+                                f"{seconds * 1000:>8.0f}ms"]
+                else:
+                    columns += [f"{'-':>10}"] * 3
+                print(f"{backend:<8} {'on' if intern else 'off':<10} {' '.join(columns)}")
+
+if __name__ == "__main__":
+    main()
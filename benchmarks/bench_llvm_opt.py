@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# Compare LLVM backend optimization levels: compile time, run time and size.
+
+import os
+import sys
+import tempfile
+import time
+
+from common import interpret, run_quietly, time_command, compiler_command
+
+REPEAT = 10
+
+def concat_heavy_program(statements):
+    """A long straight-line program mixing assignments, concatenation and output."""
+    lines = ['greeting ➡️ "Hello"', 'name ➡️ "Vibe"', 'line ➡️ greeting + " " + name']
+    for i in range(statements):
+        lines.append(f'line ➡️ line + "{i % 10}"')
+        if i % 50 == 0:
+            lines.append(f'holla greeting + " " + name + " " + line')
+    lines.append('holla line')
+    return '\n'.join(lines) + '\n'
+
+def main():
+    source = concat_heavy_program(2000)
+    expected = interpret(source)
+    print(f"{'level':<6} {'compile':>10} {'run':>10} {'size':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        program = os.path.join(tmp, 'heavy.vpl')
+        with open(program, 'w') as f:
+            f.write(source)
+        for level in range(4):
+            exe = os.path.join(tmp, f'heavy_O{level}')
+            start = time.perf_counter()
+            run_quietly(compiler_command() + [program, '-b', 'llvm', f'-O{level}', '-o', exe])
+            compile_time = time.perf_counter() - start
+            if run_quietly([exe]).stdout.decode('utf-8') != expected:
+                print(f"-O{level}: output differs from the Interpreter")
+                sys.exit(1)
+            run_time = time_command([exe], REPEAT)
+            print(f"-O{level:<4} {compile_time * 1000:>8.0f}ms {run_time * 1000:>8.2f}ms "
+                  f"{os.path.getsize(exe):>10}")
+
+if __name__ == "__main__":
+    main()
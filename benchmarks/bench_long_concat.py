@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# Time compiled x86-64 programs that repeatedly concatenate long strings.
+
+import os
+import sys
+import tempfile
+
+from common import interpret, run_quietly, time_command, compiler_command
+
+REPEAT = 5
+
+def long_concat_program(piece_length, steps):
+    """A program that grows one string by piece_length bytes, steps times."""
+    lines = [f'piece ➡️ "{"x" * piece_length}"', 'text ➡️ piece']
+    lines.extend('text ➡️ text + piece' for _ in range(steps))
+    lines.append('holla text')
+    return '\n'.join(lines) + '\n'
+
+def main():
+    print(f"{'piece':>8} {'steps':>6} {'output':>10} {'time':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for piece_length, steps in [(64, 100), (1024, 100), (4096, 200), (16384, 200)]:
+            source = long_concat_program(piece_length, steps)
+            program = os.path.join(tmp, 'long.vpl')
+            with open(program, 'w') as f:
+                f.write(source)
+            exe = os.path.join(tmp, 'long')
+            run_quietly(compiler_command() + [program, '-b', 'x86_64', '-o', exe])
+            output = run_quietly([exe]).stdout.decode('utf-8')
+            if output != interpret(source):
+                print("output differs from the Interpreter")
+                sys.exit(1)
+            elapsed = time_command([exe], REPEAT)
+            print(f"{piece_length:>8} {steps:>6} {len(output):>10} {elapsed * 1000:>8.2f}ms")
+
+if __name__ == "__main__":
+    main()
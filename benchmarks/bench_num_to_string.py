@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Table-driven number formatting in the compiled runtimes (format_number and num_to_string). Checks
+# the digit count and divide-by-100 arithmetic they share at every power of ten and of two, then
+# calls each available runtime's helpers directly on those numbers and random ones, against
+# Python's str(int): the JIT's from its code in memory, the others from a shared library built
+# from their assembly or IR. Last it times a loop converting many numbers in each runtime against
+# a revision that divides by 10 once per digit.
+
+import argparse
+import ctypes
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import SRC, ROOT, TREE_IMPORTS, parse_source, run_quietly
+from vibe.bench_diff import unavailable
+from bench_ir import export_revision
+from vibe.runtime import POWERS_OF_TEN, DIVIDE_BY_100
+from vibe.type_inference import WORD_MASK
+
+REPEAT = 3
+
+# Engines whose runtimes are built into a shared library: engine, backend and freestanding.
+# The native backend's runtime is the simple one's
+LIBRARIES = [
+    ('x86_64', 'x86_64', False),
+    ('simple', 'simple', False),
+    ('llvm', 'llvm', False),
+    ('llvm-freestanding', 'llvm', True),
+]
+
+# Writes the runtime of the backend named in argv[2], as the compiler in argv[1] generates it, with
+# convert_all(values, count) converting and releasing each number in turn. The helpers are exported
+# under aliases, so the runtime's own calls to them stay local to the library
+WORKER = TREE_IMPORTS + '''
+Lexer, Parser = load('tokenizer').Lexer, load('parser').Parser
+backend, freestanding = sys.argv[2], sys.argv[3] == '1'
+if backend == 'x86_64':
+    generator = load('x86_compiler').X86CodeGenerator()
+    lines = generator.get_runtime_code() + """
+.global harness_format_number, harness_num_to_string, convert_all
+.set harness_format_number, format_number
+.set harness_num_to_string, num_to_string
+convert_all:
+    push %rbx
+    push %r12
+    mov %rdi, %rbx
+    mov %rsi, %r12
+convert_all_loop:
+    test %r12, %r12
+    jz convert_all_done
+    mov (%rbx), %rdi
+    call num_to_string
+    mov %rax, %rdi
+    mov %rdx, %rsi
+    call string_release
+    add $8, %rbx
+    dec %r12
+    jmp convert_all_loop
+convert_all_done:
+    pop %r12
+    pop %rbx
+    ret""".splitlines() + generator.get_data_code()
+elif backend == 'simple':
+    simple_compiler = load('simple_compiler')
+    lines = simple_compiler.runtime_code() + """
+.global harness_format_number, harness_num_to_string, convert_all
+.set harness_format_number, format_number
+.set harness_num_to_string, num_to_string
+convert_all:
+    stp x29, x30, [sp, #-32]!
+    mov x29, sp
+    stp x19, x20, [sp, #16]
+    mov x19, x0
+    mov x20, x1
+convert_all_loop:
+    cbz x20, convert_all_done
+    ldr x0, [x19], #8
+    bl num_to_string
+    bl string_release
+    sub x20, x20, #1
+    b convert_all_loop
+convert_all_done:
+    ldp x19, x20, [sp, #16]
+    ldp x29, x30, [sp], #32
+    ret""".splitlines() + simple_compiler.runtime_data()
+else:
+    ast = Parser(Lexer('holla "x"').tokenize()).parse()
+    module = load('llvm_compiler').LLVMCompiler(freestanding=freestanding).compile(ast)
+    lines = [module]
+    if 'define i64 @format_number' in module:
+        # An alias needs its function; revisions before format_number are only timed
+        lines += ["@harness_format_number = alias i64 (i64, i8*), i64 (i64, i8*)* @format_number",
+                  "@harness_num_to_string = alias %vibe.str (i64), %vibe.str (i64)* @num_to_string"]
+    lines += """
+define void @convert_all(i64* %values, i64 %count) {
+entry:
+    br label %loop
+loop:
+    %i = phi i64 [ 0, %entry ], [ %next, %body ]
+    %more = icmp ult i64 %i, %count
+    br i1 %more, label %body, label %done
+body:
+    %slot = getelementptr i64, i64* %values, i64 %i
+    %value = load i64, i64* %slot
+    %string = call %vibe.str @num_to_string(i64 %value)
+    call void @release_string(%vibe.str %string)
+    %next = add i64 %i, 1
+    br label %loop
+done:
+    ret void
+}""".splitlines()
+print('\\n'.join(lines))
+'''
+
+class VibeString(ctypes.Structure):
+    """A runtime string as num_to_string returns it, in two registers."""
+    _fields_ = [('pointer', ctypes.c_void_p), ('length', ctypes.c_uint64)]
+
+def default_baseline():
+    """The commit before numbers were formatted from tables, or HEAD while that is not committed yet."""
+    added = subprocess.run(['git', '-C', ROOT, 'log', '-S', 'format_number', '--format=%H', '--',
+                            'src/simple_compiler.py'], check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return f"{added[-1]}~1" if added else 'HEAD'
+
+def edge_cases():
+    """Every power of ten and of two in 64 bits with its neighbours, and the extremes."""
+    values = {0, 1, WORD_MASK}
+    for base in [10 ** i for i in range(20)] + [2 ** i for i in range(65)]:
+        for offset in (-2, -1, 0, 1, 2):
+            if 0 <= base + offset <= WORD_MASK:
+                values.add(base + offset)
+    return sorted(values)
+
+def random_values(count, seed):
+    """count unsigned 64-bit numbers with evenly spread digit counts."""
+    generator = random.Random(seed)
+    values = []
+    for _ in range(count):
+        digits = generator.randint(1, 20)
+        values.append(generator.randrange(10 ** (digits - 1) if digits > 1 else 0, min(10 ** digits, WORD_MASK + 1)))
+    return values
+
+def check_arithmetic(values):
+    """The runtimes' digit count and quotient by 100, in Python; returns the values they get wrong."""
+    wrong = []
+    for value in values:
+        odd = value | 1
+        estimate = (odd.bit_length() * 1233) >> 12
+        digits = estimate + (odd >= POWERS_OF_TEN[estimate])
+        quotient = (((value >> 2) * DIVIDE_BY_100) >> 64) >> 2
+        if digits != len(str(value)) or quotient != value // 100:
+            wrong.append(value)
+    return wrong
+
+def build_library(src, backend, freestanding, directory):
+    """A shared library of the runtime the compiler in src generates for backend; returns its path."""
+    name = f"{backend}{'-freestanding' if freestanding else ''}"
+    source = subprocess.run([sys.executable, '-c', WORKER, src, backend, '1' if freestanding else '0'],
+                            check=True, stdout=subprocess.PIPE, text=True).stdout
+    path = os.path.join(directory, name)
+    if backend == 'llvm':
+        with open(f"{path}.ll", 'w') as f:
+            f.write(source)
+        run_quietly(['llc', '-O2', '-relocation-model=pic', '-filetype=obj', f"{path}.ll", '-o', f"{path}.o"])
+    else:
+        with open(f"{path}.s", 'w') as f:
+            f.write(source)
+        run_quietly(['as', f"{path}.s", '-o', f"{path}.o"])
+    run_quietly(['ld', '-shared', f"{path}.o", '-o', f"{path}.so"])
+    return f"{path}.so"
+
+def library_helpers(path):
+    """format_number and num_to_string of a runtime library, callable from Python."""
+    library = ctypes.CDLL(path)
+    format_number = library.harness_format_number
+    format_number.argtypes = [ctypes.c_uint64, ctypes.c_char_p]
+    format_number.restype = ctypes.c_uint64
+    num_to_string = library.harness_num_to_string
+    num_to_string.argtypes = [ctypes.c_uint64]
+    num_to_string.restype = VibeString
+    return format_number, num_to_string, library
+
+def jit_helpers():
+    """format_number and num_to_string of the JIT's runtime, loaded as the JIT runs a program."""
+    from vibe.jit import JITCompiler, load_code
+    from vibe.ir import lower
+    compiler = JITCompiler()
+    region, entry = load_code(compiler.compile_ir(lower(parse_source('holla "x"'))))
+    start = ctypes.cast(entry, ctypes.c_void_p).value
+    labels = compiler.asm.labels
+    format_number = ctypes.CFUNCTYPE(ctypes.c_uint64, ctypes.c_uint64, ctypes.c_char_p)(
+        start + labels['format_number'])
+    num_to_string = ctypes.CFUNCTYPE(VibeString, ctypes.c_uint64)(start + labels['num_to_string'])
+    return format_number, num_to_string, (region, compiler)
+
+def check_helpers(format_number, num_to_string, values):
+    """The values either helper gets wrong: not str(value), or num_to_string's not NUL-terminated."""
+    wrong = []
+    buffer = ctypes.create_string_buffer(32)
+    for value in values:
+        expected = str(value).encode('ascii')
+        length = format_number(value, buffer)
+        string = num_to_string(value)
+        if (buffer.raw[:length] != expected or
+                ctypes.string_at(string.pointer, string.length + 1) != expected + b'\0'):
+            wrong.append(value)
+    return wrong
+
+def time_conversions(path, values, repeat):
+    """Best time of the library's convert_all over values."""
+    library = ctypes.CDLL(path)
+    library.convert_all.argtypes = [ctypes.POINTER(ctypes.c_uint64), ctypes.c_uint64]
+    library.convert_all.restype = None
+    array = (ctypes.c_uint64 * len(values))(*values)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        library.convert_all(array, len(values))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--random', type=int, default=100000, help='Random numbers to check besides the edge cases')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the random numbers')
+    parser.add_argument('--numbers', type=int, default=1000000, help='Numbers converted per timed run')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against (default: the commit before format_number)')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT, help='Runs per measurement')
+    args = parser.parse_args()
+    revision = args.baseline or default_baseline()
+
+    values = edge_cases() + random_values(args.random, args.seed)
+    wrong = check_arithmetic(values)
+    print(f"{len(values)} numbers, {len(wrong)} with a wrong digit count or quotient")
+    failures = len(wrong)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runtimes = []
+        if unavailable('jit'):
+            print(f"{'jit':<20} skipped: {unavailable('jit')}")
+        else:
+            runtimes.append(('jit', jit_helpers()))
+        libraries = {}
+        for engine, backend, freestanding in LIBRARIES:
+            if unavailable(engine):
+                print(f"{engine:<20} skipped: {unavailable(engine)}")
+                continue
+            libraries[engine] = build_library(SRC, backend, freestanding, tmp)
+            runtimes.append((engine, library_helpers(libraries[engine])))
+        for engine, (format_number, num_to_string, _) in runtimes:
+            wrong = check_helpers(format_number, num_to_string, values)
+            print(f"{engine:<20} {'ok' if not wrong else f'{len(wrong)} wrong, first {wrong[0]}'}")
+            failures += len(wrong)
+
+        baseline = export_revision(revision, os.path.join(tmp, 'baseline'))
+        os.mkdir(os.path.join(tmp, 'before'))
+        timed = random_values(args.numbers, args.seed + 1)
+        print(f"{args.numbers} numbers converted, baseline {revision}")
+        print(f"{'engine':<20} {'baseline':>10} {'tables':>10}")
+        for engine, backend, freestanding in LIBRARIES:
+            if engine not in libraries:
+                continue
+            before = build_library(baseline, backend, freestanding, os.path.join(tmp, 'before'))
+            times = [time_conversions(path, timed, args.repeat) for path in (before, libraries[engine])]
+            print(f"{engine:<20} {times[0] * 1000:>8.2f}ms {times[1] * 1000:>8.2f}ms")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
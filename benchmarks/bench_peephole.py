@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Count the instructions the peephole optimizer removes from the ARM64 backends.
+
+import os
+import platform
+import sys
+import tempfile
+
+from common import ROOT, parse_source, run_quietly, test_programs, compiler_command
+from vibe.simple_compiler import ARMCodeGenerator
+from vibe.compiler import CodeGenerator
+from vibe.peephole import count_instructions
+
+def mixed_program(statements):
+    """Numbers, strings and variables reassigned and read back."""
+    lines = ['total ➡️ 1', 'label ➡️ "n="']
+    for i in range(statements):
+        lines.append(f'total ➡️ total + {i}')
+        lines.append(f'line ➡️ label + total + "!"')
+        lines.append('holla line')
+    return '\n'.join(lines) + '\n'
+
+def generated_instructions(backend, source, opt_level):
+    ast = parse_source(source)
+    if backend == 'simple':
+        code = ARMCodeGenerator(opt_level).generate(ast)
+    else:
+        code = CodeGenerator(opt_level).compile(ast)
+    return count_instructions(code.split('\n'))
+
+def program_instructions(backend, source, opt_level):
+    """Instructions generated for the program itself, leaving out the runtime helpers."""
+    return (generated_instructions(backend, source, opt_level)
+            - generated_instructions(backend, '', opt_level))
+
+def run_output(program, opt_level):
+    """Build with the simple backend and run it; only possible on an ARM64 host."""
+    with tempfile.TemporaryDirectory() as tmp:
+        exe = os.path.join(tmp, 'program')
+        run_quietly(compiler_command() + [program, '-b', 'simple', '--integrated-as', f'-O{opt_level}',
+                                          '--no-cache', '-o', exe])
+        return run_quietly([exe]).stdout
+
+def main():
+    corpus = [(os.path.relpath(path, ROOT), path) for path in test_programs()]
+    with tempfile.TemporaryDirectory() as tmp:
+        generated = os.path.join(tmp, 'mixed.vpl')
+        with open(generated, 'w', encoding='utf-8') as f:
+            f.write(mixed_program(200))
+        corpus.append(('mixed (generated)', generated))
+
+        can_run = platform.machine() in ('aarch64', 'arm64') and platform.system() == 'Linux'
+        print(f"{'program':<36} {'backend':<8} {'-O0':>6} {'-O1':>6} {'removed':>8}")
+        totals = {}
+        for name, path in corpus:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            for backend in ('simple', 'native'):
+                before = program_instructions(backend, source, 0)
+                after = program_instructions(backend, source, 1)
+                total = totals.setdefault(backend, [0, 0])
+                total[0] += before
+                total[1] += after
+                print(f"{name:<36} {backend:<8} {before:>6} {after:>6} {1 - after / before:>7.0%}")
+            # Mixed number and string programs are compiled-only, so compare against -O0
+            if can_run and run_output(path, 1) != run_output(path, 0):
+                print(f"{name}: -O1 output differs from -O0")
+                sys.exit(1)
+
+        for backend, (before, after) in totals.items():
+            print(f"{'total':<36} {backend:<8} {before:>6} {after:>6} {1 - after / before:>7.0%}")
+        if not can_run:
+            print("Not an ARM64 Linux host: output of the optimized builds was not checked")
+
+if __name__ == "__main__":
+    main()
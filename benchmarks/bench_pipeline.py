@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Wall time of a many-file build, where every file pays for handing its assembly or IR
+# to as or llc, against a revision that still wrote the intermediate files to disk.
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from common import ROOT, SRC, run_quietly, compiler_command
+from vibe.bench_diff import unavailable
+from bench_ir import export_revision
+from bench_streaming import long_program
+
+REPEAT = 3
+
+BACKENDS = ['x86_64', 'llvm']
+
+def default_baseline():
+    """The commit before the pipeline was added, or HEAD while it is not committed yet."""
+    added = subprocess.run(['git', '-C', ROOT, 'log', '--diff-filter=A', '--format=%H', '--',
+                            'src/pipeline.py'], check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return f"{added[-1]}~1" if added else 'HEAD'
+
+def write_programs(directory, files, statements):
+    """files generated programs of statements statements each, varied so none are identical."""
+    programs = []
+    for i in range(files):
+        program = os.path.join(directory, f"program{i}.vpl")
+        with open(program, 'w') as f:
+            f.write(f'n ➡️ {i}\nholla "file " + n\n')
+            f.write(long_program(statements // 3))
+        programs.append(program)
+    return programs
+
+def build_time(src, backend, programs, output_dir, jobs, opt_level, repeat):
+    """Best wall time of building every program with one uncached vibe_compiler run."""
+    command = compiler_command(src) + [*programs, '-b', backend, '-O', str(opt_level), '-j', str(jobs),
+                                       '--no-cache']
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_quietly(command, cwd=output_dir)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=200, help='Number of programs to build')
+    parser.add_argument('--statements', type=int, default=300, help='Statements per program')
+    parser.add_argument('-j', '--jobs', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help='Parallel builds to measure')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against (default: the commit before the pipeline)')
+    parser.add_argument('--output-dir', default=tempfile.gettempdir(),
+                        help='Where the executables are written, a disk-backed directory by default')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT,
+                        help='Builds per measurement; the fastest is reported')
+    args = parser.parse_args()
+    revision = args.baseline or default_baseline()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = export_revision(revision, os.path.join(tmp, 'baseline'))
+        programs = write_programs(tmp, args.files, args.statements)
+        print(f"{args.files} files of {args.statements} statements, baseline {revision}")
+        print(f"{'backend':<8} {'-O':>2} {'-j':>3} {'baseline':>10} {'pipeline':>10} {'speedup':>8}")
+        for backend in BACKENDS:
+            if unavailable(backend):
+                print(f"{backend:<8} skipped: {unavailable(backend)}")
+                continue
+            for opt_level in ([0, 2] if backend == 'llvm' else [0]):
+                for jobs in args.jobs:
+                    row = f"{backend:<8} {opt_level:>2} {jobs:>3}"
+                    times = []
+                    for src in (baseline, SRC):
+                        with tempfile.TemporaryDirectory(dir=args.output_dir) as output_dir:
+                            seconds = build_time(src, backend, programs, output_dir, jobs, opt_level, args.repeat)
+                            row += f" {seconds * 1000:>8.0f}ms"
+                        times.append(seconds)
+                    print(f"{row} {times[0] / times[1]:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
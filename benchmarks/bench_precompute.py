@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Run time and executable size of --precompute builds against regular code generation.
+
+import os
+import sys
+import tempfile
+
+from common import test_programs, run_quietly, time_command, compiler_command
+from bench_llvm_opt import concat_heavy_program
+from vibe.bench_diff import COMPILED, unavailable
+
+REPEAT = 20
+
+def build(program, engine, exe, precompute):
+    backend, options = COMPILED[engine]
+    command = compiler_command() + [program, '-b', backend, '-o', exe, '--no-cache']
+    if options.get('integrated'):
+        command.append('--integrated-as')
+    if options.get('freestanding'):
+        command.append('--freestanding')
+    if precompute:
+        command.append('--precompute')
+    run_quietly(command)
+
+def main():
+    engines = [engine for engine in COMPILED if not unavailable(engine)]
+    failures = 0
+    print(f"{'program':<14} {'backend':<18} {'run':>10} {'precomputed':>12} {'size':>8} {'precomputed':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # A larger generated program, with plenty of concatenation to skip at run time
+        heavy = os.path.join(tmp, 'heavy.vpl')
+        with open(heavy, 'w') as f:
+            f.write(concat_heavy_program(2000))
+
+        for program in test_programs() + [heavy]:
+            name = os.path.splitext(os.path.basename(program))[0]
+            for engine in engines:
+                regular = os.path.join(tmp, f"{name}-{engine}")
+                precomputed = regular + '-precomputed'
+                build(program, engine, regular, False)
+                build(program, engine, precomputed, True)
+                if run_quietly([precomputed]).stdout != run_quietly([regular]).stdout:
+                    failures += 1
+                    print(f"{name}: {engine} output differs when precomputed")
+                    continue
+
+                regular_time = time_command([regular], REPEAT)
+                precomputed_time = time_command([precomputed], REPEAT)
+                print(f"{name:<14} {engine:<18} {regular_time * 1000:>8.2f}ms "
+                      f"{precomputed_time * 1000:>10.2f}ms {os.path.getsize(regular):>8} "
+                      f"{os.path.getsize(precomputed):>12}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Per-entry REPL latency as a session accumulates thousands of variables.
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+
+import common  # puts src on the path
+from vibe.repl import ReplSession
+
+def entries(count):
+    """Assignments to new variables, each reading an earlier one, and some output."""
+    yield 'v0 ➡️ 1'
+    yield 'label ➡️ "v"'
+    for i in range(1, count):
+        yield f'v{i} ➡️ v{i // 2} + {i}'
+        if i % 10 == 0:
+            # Strings only concatenate with strings
+            yield f'holla label + "{i} defined"'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--variables', type=int, default=20000,
+                        help='Variables to define over the session')
+    parser.add_argument('--buckets', type=int, default=5,
+                        help='Parts of the session to report separately')
+    args = parser.parse_args()
+
+    session = ReplSession()
+    latencies = []
+    output = io.StringIO()
+    with redirect_stdout(output):
+        for line in entries(args.variables):
+            start = time.perf_counter()
+            session.feed(line)
+            latencies.append(time.perf_counter() - start)
+    # A failing entry would time the error path instead
+    errors = [line for line in output.getvalue().splitlines() if line.startswith('Error:')]
+    if errors:
+        sys.exit(f"{len(errors)} entries failed, first: {errors[0]}")
+
+    print(f"{'entries':>15} {'variables':>10} {'median':>10} {'p99':>10}")
+    size = len(latencies) // args.buckets
+    medians = []
+    for bucket in range(args.buckets):
+        part = sorted(latencies[bucket * size:(bucket + 1) * size])
+        medians.append(statistics.median(part))
+        variables = len(session.interpreter.variables) * (bucket + 1) // args.buckets
+        print(f"{bucket * size:>7}-{(bucket + 1) * size:<7} {variables:>10} "
+              f"{medians[-1] * 1e6:>8.1f}us {part[int(len(part) * 0.99)] * 1e6:>8.1f}us")
+    print(f"Last part / first part median latency: {medians[-1] / medians[0]:.2f}x")
+
+if __name__ == "__main__":
+    main()
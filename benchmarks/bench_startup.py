@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Import time of each `vibe` subcommand, measured with -X importtime, against a budget.
+# Exits non-zero when a subcommand imports a compiler module it should not need or its
+# imports take longer than the budget, so startup regressions fail the benchmark run.
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+from common import ROOT, SRC
+
+REPEAT = 5
+
+PACKAGE = 'vibe'
+PROGRAM = os.path.join(ROOT, 'test.vpl')
+
+# Subcommand arguments, the modules of the package each may import, and the most time in
+# milliseconds all of its imports, the interpreter's own included, may take
+BUDGETS = [
+    (['help'], {'cli'}, 25),
+    (['run', '--quiet', PROGRAM], {'cli', 'main', 'tokenizer', 'parser', 'interpreter'}, 35),
+    (['compile', '--help'], {'cli', 'vibe_compiler', 'build_cache', 'precompute', 'interpreter'}, 90),
+    (['bench-diff', '--help'], {'cli', 'bench_diff', 'vibe_compiler', 'build_cache', 'precompute',
+                                'interpreter'}, 110),
+]
+
+def compiler_modules():
+    """The package's modules, by the names they are imported under."""
+    names = {os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(SRC, PACKAGE, '*.py'))}
+    return {f"{PACKAGE}.{name}" for name in names - {'__init__', '__main__'}}
+
+def import_times(args):
+    """Self time in microseconds of every module imported running `vibe args`."""
+    # As the vibe script runs it, with the checkout's package on the path
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', PACKAGE] + args, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(own)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT,
+                        help='Runs per subcommand; the fastest is compared with the budget')
+    args = parser.parse_args()
+
+    ours = compiler_modules()
+    failures = 0
+    print(f"{'command':<24} {'imports':>8} {'budget':>8} {'modules':>8}  unexpected")
+    for command, allowed, budget in BUDGETS:
+        runs = [import_times(command) for _ in range(max(1, args.repeat))]
+        best = min(sum(times.values()) for times in runs) / 1000
+        imported = set().union(*runs)
+        unexpected = sorted(name[len(PACKAGE) + 1:] for name in imported & ours
+                            if name[len(PACKAGE) + 1:] not in allowed)
+        name = ' '.join(command[:2]).replace(PROGRAM, os.path.basename(PROGRAM))
+        print(f"{name:<24} {best:>6.1f}ms {budget:>6}ms {len(imported):>8}  {' '.join(unexpected) or '-'}")
+        if unexpected or best > budget:
+            failures += 1
+    if failures:
+        print(f"{failures} subcommands over their startup budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Static cost reports (`vibe compile --stats`) of the example programs on every backend, against
+# the budgets in stats_budget.json. Nothing is assembled or run, so this gates code generation on
+# hosts without as, ld, llc or an ARM64 machine. Exits non-zero when any count grows; --update
+# writes the current counts as the new budgets.
+
+import argparse
+import json
+import os
+import sys
+
+from common import ROOT, test_programs
+from vibe.cost_model import cost_report, CATEGORIES
+
+BUDGET = os.path.join(ROOT, 'benchmarks', 'stats_budget.json')
+
+# The LLVM reports are of the IR as generated, the same for every host once the target is fixed
+LLVM_TARGET = 'x86_64-unknown-linux-gnu'
+
+# Engine name, backend and compiler options
+ENGINES = [
+    ('simple', 'simple', {'opt_level': 0}),
+    ('simple-O1', 'simple', {'opt_level': 1}),
+    ('native', 'native', {'opt_level': 0}),
+    ('native-freestanding', 'native', {'opt_level': 0, 'freestanding': True}),
+    ('x86_64', 'x86_64', {}),
+    ('llvm', 'llvm', {'target': LLVM_TARGET}),
+    ('llvm-freestanding', 'llvm', {'target': LLVM_TARGET, 'freestanding': True}),
+]
+
+# Report fields that describe the build rather than cost something, and the instruction
+# mix, which shifts with any change to the code: its totals and divides are what is gated
+UNGATED = {'opt_level', 'hollas'} | set(CATEGORIES) - {'divide'}
+
+def counts(report, prefix=''):
+    """The numbers in a report, by dotted path: instructions.program.total and so on."""
+    result = {}
+    for key, value in report.items():
+        if key in UNGATED:
+            continue
+        if isinstance(value, dict):
+            result.update(counts(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            result[prefix + key] = value
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--update', action='store_true', help='Write the current counts to the budget file')
+    parser.add_argument('--budget', default=BUDGET, help='Budget file (default: benchmarks/stats_budget.json)')
+    args = parser.parse_args()
+
+    current = {}
+    for program in test_programs():
+        with open(program, 'r') as f:
+            source = f.read()
+        name = os.path.relpath(program, ROOT)
+        for engine, backend, options in ENGINES:
+            current[f"{name} {engine}"] = counts(cost_report(source, backend, options))
+
+    if args.update:
+        with open(args.budget, 'w') as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote budgets for {len(current)} builds to {args.budget}")
+        return
+
+    with open(args.budget, 'r') as f:
+        budgets = json.load(f)
+    failures = 0
+    improved = 0
+    for build, values in current.items():
+        budget = budgets.get(build, {})
+        for field, value in sorted(values.items()):
+            limit = budget.get(field, 0)
+            if value > limit:
+                print(f"{build}: {field} {value} over budget {limit}")
+                failures += 1
+            elif value < limit:
+                improved += 1
+    print(f"{len(current)} builds, {failures} counts over budget, {improved} under")
+    if improved and not failures:
+        print("Run with --update to lower the budgets")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Peak memory of code generation as programs grow, streaming to a file versus building a string.
+
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+from common import parse_source
+from vibe.simple_compiler import ARMCodeGenerator
+from vibe.x86_compiler import X86CodeGenerator
+from vibe.llvm_compiler import LLVMCompiler
+from vibe.compiler import CodeGenerator
+from vibe.type_inference import infer_types
+
+BACKENDS = {
+    'simple': lambda: ARMCodeGenerator().generate,
+    'native': lambda: CodeGenerator().compile,
+    'x86_64': lambda: X86CodeGenerator().generate,
+    'llvm': lambda: LLVMCompiler().compile,
+}
+
+def long_program(repeats):
+    """The same few statements over and over, so only the output grows."""
+    lines = ['greeting ➡️ "Hello"', 'count ➡️ 0']
+    for _ in range(repeats):
+        lines.append('count ➡️ count + 1')
+        lines.append('line ➡️ greeting + " World"')
+        lines.append('holla line')
+    return '\n'.join(lines) + '\n'
+
+def peak_memory(backend, ast, path):
+    """Peak bytes allocated while generating code for ast, into path or a string."""
+    generate = BACKENDS[backend]()
+    tracemalloc.start()
+    if path:
+        with open(path, 'w') as f:
+            generate(ast, f)
+    else:
+        generate(ast)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='Program sizes in statements')
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'statements':>10} {'output':>10} {'to file':>10} {'to string':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'program.s')
+        for backend in BACKENDS:
+            for size in args.sizes:
+                # Parse and type the program first so only code generation is measured
+                ast = parse_source(long_program(size // 3))
+                infer_types(ast)
+                streamed = peak_memory(backend, ast, path)
+                output = os.path.getsize(path)
+                collected = peak_memory(backend, ast, None)
+                print(f"{backend:<8} {size:>10} {output / 2**20:>8.1f}MB {streamed / 2**20:>8.2f}MB "
+                      f"{collected / 2**20:>8.1f}MB")
+
+if __name__ == "__main__":
+    main()
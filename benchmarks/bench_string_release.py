@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Peak RSS and run time of compiled programs that build many temporary strings, with strings
+# released or reused after their last read against a revision that never gives them back.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import SRC, ROOT, run_quietly, compiler_command
+from vibe.bench_diff import unavailable, measure
+from bench_ir import export_revision
+
+REPEAT = 3
+
+# Engine name, backend and extra compiler options
+ENGINES = [
+    ('x86_64', 'x86_64', []),
+    ('simple', 'simple', []),
+    ('llvm', 'llvm', []),
+    ('llvm-freestanding', 'llvm', ['--freestanding']),
+]
+
+def default_baseline():
+    """The commit before strings were released, or HEAD while that is not committed yet."""
+    added = subprocess.run(['git', '-C', ROOT, 'log', '-S', 'mark_owned_strings', '--format=%H', '--',
+                            'src/ir.py'], check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return f"{added[-1]}~1" if added else 'HEAD'
+
+def growing_program(statements, width):
+    """One variable grown by a width-byte piece every statement, printed at the end."""
+    lines = [f'piece ➡️ "{"x" * width}"', 'text ➡️ piece']
+    lines.extend('text ➡️ text + piece' for _ in range(statements))
+    lines.append('holla text')
+    return '\n'.join(lines) + '\n'
+
+def printing_program(statements, width):
+    """A width-byte prefix printed with a different number and suffix every statement."""
+    lines = [f'prefix ➡️ "{"x" * width}"', 'name ➡️ "visitor"']
+    lines.extend(f'holla prefix + name + {i} + "!"' for i in range(statements))
+    return '\n'.join(lines) + '\n'
+
+def reassigning_program(statements, width):
+    """A variable overwritten with a new width-byte string every statement, and printed."""
+    lines = [f'prefix ➡️ "{"x" * width}"']
+    for i in range(statements):
+        lines.append(f'line ➡️ prefix + {i}')
+        lines.append('holla line')
+    return '\n'.join(lines) + '\n'
+
+PROGRAMS = [('growing', growing_program), ('printing', printing_program),
+            ('reassigning', reassigning_program)]
+
+def run(src, backend, options, program, executable, repeat):
+    """Build program with the compiler in src; returns (output, best seconds, peak RSS bytes)."""
+    run_quietly(compiler_command(src) + [program, '-b', backend, '-o', executable, '--no-cache'] + options)
+    output, _, _, peak = measure([executable], trace=True)
+    best = min(measure([executable])[2] for _ in range(repeat))
+    return output, best, peak
+
+def kilobytes(peak):
+    return f"{peak // 1024}KB" if peak is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, default=200, help='Statements per program')
+    parser.add_argument('--width', type=int, default=16384, help='Length of the strings added')
+    parser.add_argument('--baseline', metavar='REV',
+                        help='Git revision to compare against (default: the commit before strings were released)')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT, help='Runs per measurement')
+    args = parser.parse_args()
+    revision = args.baseline or default_baseline()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = export_revision(revision, os.path.join(tmp, 'baseline'))
+        print(f"{args.statements} statements of {args.width} bytes, baseline {revision}")
+        print(f"{'program':<12} {'engine':<18} {'baseline':>10} {'released':>10} {'baseline':>10} {'released':>10}")
+        for name, generate in PROGRAMS:
+            program = os.path.join(tmp, f"{name}.vpl")
+            with open(program, 'w') as f:
+                f.write(generate(args.statements, args.width))
+            for engine, backend, options in ENGINES:
+                if unavailable(engine):
+                    print(f"{name:<12} {engine:<18} skipped: {unavailable(engine)}")
+                    continue
+                executable = os.path.join(tmp, engine)
+                expected, before, before_peak = run(baseline, backend, options, program, executable, args.repeat)
+                output, after, after_peak = run(SRC, backend, options, program, executable, args.repeat)
+                print(f"{name:<12} {engine:<18} {kilobytes(before_peak):>10} {kilobytes(after_peak):>10} "
+                      f"{before * 1000:>8.2f}ms {after * 1000:>8.2f}ms")
+                if output != expected:
+                    print(f"{engine}: output differs from the baseline")
+                    failures += 1
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# Compare the x86-64 backend's executables against `vibe run`, checking
+# that every program prints exactly what the Interpreter prints.
+
+import os
+import sys
+import tempfile
+
+from common import ROOT, test_programs, interpret, run_quietly, time_command, compiler_command
+
+REPEAT = 20
+
+def main():
+    vibe = os.path.join(ROOT, 'vibe')
+    failures = 0
+    print(f"{'program':<20} {'vibe run':>12} {'compiled':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for program in test_programs():
+            name = os.path.splitext(os.path.basename(program))[0]
+            exe = os.path.join(tmp, name)
+            run_quietly(compiler_command() + [program, '-b', 'x86_64', '-o', exe])
+
+            with open(program, 'r') as f:
+                expected = interpret(f.read())
+            actual = run_quietly([exe]).stdout.decode('utf-8')
+            if actual != expected:
+                failures += 1
+                print(f"{name}: output differs from the Interpreter")
+                print(f"  expected {expected!r}")
+                print(f"  got      {actual!r}")
+                continue
+
+            interpreted = time_command([vibe, 'run', program], REPEAT)
+            compiled = time_command([exe], REPEAT)
+            print(f"{name:<20} {interpreted * 1000:>10.2f}ms {compiled * 1000:>10.2f}ms "
+                  f"{interpreted / compiled:>7.1f}x")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Shared helpers for the benchmark scripts
+import glob
+import io
+import os
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+sys.path.insert(0, SRC)
+
+from vibe.tokenizer import Lexer
+from vibe.parser import Parser
+from vibe.interpreter import Interpreter
+
+# Prefix of the scripts run on a tree's sources, the src directory in argv[1] of this checkout or
+# of an exported revision: puts it on the path and defines load(name), which imports one module
+# of the vibe package, or the top-level module of that name in revisions from before the package
+TREE_IMPORTS = '''
+import importlib, os, sys
+sys.path.insert(0, sys.argv[1])
+PREFIX = 'vibe.' if os.path.isdir(os.path.join(sys.argv[1], 'vibe')) else ''
+def load(name):
+    return importlib.import_module(PREFIX + name)
+'''
+
+# Runs vibe_compiler's main with the arguments after the tree
+RUN_COMPILER = TREE_IMPORTS + '''
+del sys.argv[1]
+load('vibe_compiler').main()
+'''
+
+def test_programs():
+    """The example programs every engine is expected to run identically."""
+    programs = [os.path.join(ROOT, 'test.vpl'), os.path.join(ROOT, 'advanced_test.vpl')]
+    programs.extend(sorted(glob.glob(os.path.join(ROOT, 'benchmarks', 'programs', '*.vpl'))))
+    return programs
+
+def parse_source(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def interpret(source):
+    """Run source through the Interpreter and return what it printed."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        Interpreter().interpret(parse_source(source))
+    return output.getvalue()
+
+def compiler_command(src=SRC):
+    """Command running the compiler of the tree in src, as vibe_compiler.py; append its arguments."""
+    return [sys.executable, '-c', RUN_COMPILER, src]
+
+def run_quietly(command, **kwargs):
+    return subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+
+def time_command(command, repeat):
+    """Average wall time of running command repeat times."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_quietly(command)
+    return (time.perf_counter() - start) / repeat
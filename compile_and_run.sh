@@ -29,15 +29,15 @@ echo "=== Compiling $INPUT_FILE ==="
 echo
 
 # Try different compilers based on what's available
-if command -v llc &> /dev/null && [ -f "src/llvm_compiler.py" ]; then
+if command -v llc &> /dev/null && [ -f "src/vibe/llvm_compiler.py" ]; then
     echo "Using LLVM compiler backend"
-    python3 src/vibe_compiler.py "$INPUT_FILE" -b llvm -o "$FILENAME" --verbose
-elif [ -f "src/simple_compiler.py" ]; then
+    ./vibe compile "$INPUT_FILE" -b llvm -o "$FILENAME" --verbose
+elif [ -f "src/vibe/simple_compiler.py" ]; then
     echo "Using simple assembly compiler backend"
-    python3 src/vibe_compiler.py "$INPUT_FILE" -b simple -o "$FILENAME" --verbose
+    ./vibe compile "$INPUT_FILE" -b simple -o "$FILENAME" --verbose
 else
     echo "Using native compiler backend"
-    python3 src/vibe_compiler.py "$INPUT_FILE" -o "$FILENAME" --verbose
+    ./vibe compile "$INPUT_FILE" -o "$FILENAME" --verbose
 fi
 
 echo
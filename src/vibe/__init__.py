@@ -0,0 +1,2 @@
+# The Vibe language: tokenizer, parser, interpreter, compilers and the `vibe`
+# command. Nothing is imported here, so `vibe help` loads no compiler code.
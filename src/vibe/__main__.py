@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/__main__.py
+
+# `python3 -m vibe` is the `vibe` command
+from .cli import main
+
+main()
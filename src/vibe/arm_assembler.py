@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/arm_assembler.py
+
+import os
+import re
+import struct
+
+# Static executables are loaded here, like ld's default for AArch64
+BASE_ADDRESS = 0x400000
+PAGE_SIZE = 0x10000
+NOP = 0xD503201F
+
+CONDITIONS = {
+    'eq': 0, 'ne': 1, 'hs': 2, 'cs': 2, 'lo': 3, 'cc': 3, 'mi': 4, 'pl': 5,
+    'vs': 6, 'vc': 7, 'hi': 8, 'ls': 9, 'ge': 10, 'lt': 11, 'gt': 12, 'le': 13, 'al': 14,
+}
+
+# Directives that carry no bytes for a static executable
+IGNORED_DIRECTIVES = {'.arch', '.type', '.size', '.file', '.loc', '.ident'}
+
+LABEL_PATTERN = re.compile(r'^\s*([A-Za-z_.$][\w.$]*):')
+REGISTER_PATTERN = re.compile(r'^([xw])(\d+)$')
+
+def strip_comment(line):
+    """Remove a // comment, ignoring slashes inside string and character literals."""
+    quote = None
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif line.startswith('//', i):
+            return line[:i]
+        i += 1
+    return line
+
+def split_operands(text):
+    """Split on commas that are not inside brackets or quotes."""
+    operands = []
+    depth = 0
+    quote = None
+    current = ''
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            operands.append(current.strip())
+            current = ''
+            continue
+        current += char
+    if current.strip():
+        operands.append(current.strip())
+    return operands
+
+def parse_string(text):
+    """Decode a quoted assembler string literal into bytes."""
+    text = text.strip()
+    if len(text) < 2 or text[0] != '"' or text[-1] != '"':
+        raise Exception(f"Invalid string literal: {text}")
+    result = bytearray()
+    escapes = {'n': 10, 't': 9, 'r': 13, '\\': 92, '"': 34, "'": 39}
+    i = 1
+    while i < len(text) - 1:
+        char = text[i]
+        if char == '\\':
+            i += 1
+            char = text[i]
+            if char in escapes:
+                result.append(escapes[char])
+            elif char == 'x':
+                digits = re.match(r'[0-9a-fA-F]{1,2}', text[i + 1:]).group(0)
+                result.append(int(digits, 16))
+                i += len(digits)
+            elif char in '01234567':
+                digits = re.match(r'[0-7]{1,3}', text[i:]).group(0)
+                result.append(int(digits, 8) & 0xff)
+                i += len(digits) - 1
+            else:
+                raise Exception(f"Unknown escape in string literal: \\{char}")
+        else:
+            result.extend(char.encode('utf-8'))
+        i += 1
+    return bytes(result)
+
+def parse_number(text):
+    text = text.strip()
+    if text.startswith('#'):
+        text = text[1:].strip()
+    if len(text) == 3 and text[0] == "'" and text[2] == "'":
+        return ord(text[1])
+    try:
+        return int(text, 0)
+    except ValueError:
+        raise Exception(f"Invalid immediate: {text}")
+
+def parse_register(name):
+    """Return (number, is_64_bit) for a general purpose register name."""
+    name = name.strip().lower()
+    if name in ('sp', 'xzr'):
+        return 31, True
+    if name in ('wsp', 'wzr'):
+        return 31, False
+    if name == 'fp':
+        return 29, True
+    if name == 'lr':
+        return 30, True
+    match = REGISTER_PATTERN.match(name)
+    if not match or int(match.group(2)) > 30:
+        raise Exception(f"Invalid register: {name}")
+    return int(match.group(2)), match.group(1) == 'x'
+
+def is_register(text):
+    text = text.strip().lower()
+    return text in ('sp', 'wsp', 'xzr', 'wzr', 'fp', 'lr') or bool(REGISTER_PATTERN.match(text))
+
+def is_stack_pointer(text):
+    return text.strip().lower() in ('sp', 'wsp')
+
+def encode_bitmask(value, width):
+    """Encode value as a logical immediate, returning (N, immr, imms) or None."""
+    value &= (1 << width) - 1
+    if value == 0 or value == (1 << width) - 1:
+        return None
+
+    # Find the smallest repeating element
+    size = width
+    while size > 2:
+        half = size // 2
+        mask = (1 << half) - 1
+        if value & mask != (value >> half) & mask:
+            break
+        size = half
+
+    # The element must be a rotated run of ones
+    mask = (1 << size) - 1
+    element = value & mask
+    ones = bin(element).count('1')
+    for rotation in range(size):
+        rotated = ((element >> rotation) | (element << (size - rotation))) & mask
+        if rotated == (1 << ones) - 1:
+            immr = (size - rotation) % size
+            imms = ((~(size - 1) << 1) & 0x3f) | (ones - 1)
+            return (1 if size == 64 else 0), immr, imms
+    return None
+
+def move_wide(value, width):
+    """Find a single movz/movn for value, returning (opcode, hw, imm16) or None."""
+    value &= (1 << width) - 1
+    for opcode, candidate in ((0x52800000, value), (0x12800000, ~value & ((1 << width) - 1))):
+        for hw in range(width // 16):
+            if candidate & ~(0xffff << (16 * hw)) == 0:
+                return opcode, hw, (candidate >> (16 * hw)) & 0xffff
+    return None
+
+class Instruction:
+    def __init__(self, mnemonic, operands, address, line):
+        self.mnemonic = mnemonic
+        self.operands = operands
+        self.address = address
+        self.line = line
+
+class ARMAssembler:
+    """Encode the AArch64 subset emitted by ARMCodeGenerator into a static ELF executable.
+
+    The assembly text is read in one pass that records labels, data and
+    instruction addresses; instructions are encoded in a second pass once
+    every symbol's final address is known, so no relocations are left
+    for a linker.
+    """
+    def __init__(self):
+        self.sections = {name: bytearray() for name in ('text', 'rodata', 'data', 'bss')}
+        self.bss_size = 0
+        self.alignments = {'text': 4, 'rodata': 1, 'data': 8, 'bss': 16}
+        self.instructions = []
+        self.labels = {}
+        self.globals = set()
+        self.literal_pool = {}
+        self.addresses = {}
+        self.entry = None
+
+    def size(self, section):
+        if section == 'bss':
+            return self.bss_size
+        return len(self.sections[section])
+
+    def align(self, section, alignment):
+        self.alignments[section] = max(self.alignments[section], alignment)
+        padding = -self.size(section) % alignment
+        if section == 'bss':
+            self.bss_size += padding
+        elif section == 'text':
+            while padding:
+                self.sections['text'] += struct.pack('<I', NOP)
+                padding -= 4
+        else:
+            self.sections[section] += bytes(padding)
+
+    def emit_data(self, section, data):
+        if section == 'bss':
+            if any(data):
+                raise Exception("Initialized data in .bss")
+            self.bss_size += len(data)
+        else:
+            self.sections[section] += data
+
+    def parse(self, assembly_code):
+        section = 'text'
+        for number, raw in enumerate(assembly_code.split('\n'), 1):
+            line = strip_comment(raw).strip()
+            while True:
+                match = LABEL_PATTERN.match(line)
+                if not match:
+                    break
+                self.labels[match.group(1)] = (section, self.size(section))
+                line = line[match.end():].strip()
+            if not line:
+                continue
+
+            parts = line.split(None, 1)
+            name = parts[0].lower()
+            args = parts[1] if len(parts) > 1 else ''
+
+            if name.startswith('.'):
+                section = self.parse_directive(section, name, args, number)
+                continue
+
+            if section != 'text':
+                raise Exception(f"Line {number}: instruction outside .text: {line}")
+            operands = split_operands(args)
+            if name == 'ldr' and operands[1].startswith('='):
+                self.add_literal(operands[1][1:], parse_register(operands[0])[1])
+            self.instructions.append(Instruction(name, operands, self.size('text'), number))
+            self.sections['text'] += bytes(4)
+
+    def parse_directive(self, section, name, args, number):
+        if name in ('.text', '.data', '.bss'):
+            return name[1:]
+        if name == '.section':
+            target = split_operands(args)[0]
+            if target not in ('.text', '.rodata', '.data', '.bss'):
+                raise Exception(f"Line {number}: unsupported section {target}")
+            return target[1:]
+        if name in ('.global', '.globl'):
+            self.globals.add(args.strip())
+        elif name in ('.string', '.asciz'):
+            for value in split_operands(args):
+                self.emit_data(section, parse_string(value) + b'\0')
+        elif name == '.ascii':
+            for value in split_operands(args):
+                self.emit_data(section, parse_string(value))
+        elif name in ('.byte', '.hword', '.word', '.quad'):
+            size = {'.byte': 1, '.hword': 2, '.word': 4, '.quad': 8}[name]
+            for value in split_operands(args):
+                number_value = parse_number(value) & ((1 << (8 * size)) - 1)
+                self.emit_data(section, number_value.to_bytes(size, 'little'))
+        elif name in ('.skip', '.zero', '.space'):
+            self.emit_data(section, bytes(parse_number(split_operands(args)[0])))
+        elif name == '.balign':
+            self.align(section, parse_number(args))
+        elif name in ('.p2align', '.align'):
+            self.align(section, 1 << parse_number(args))
+        elif name not in IGNORED_DIRECTIVES:
+            raise Exception(f"Line {number}: unsupported directive {name}")
+        return section
+
+    def add_literal(self, text, is_64_bit):
+        value = parse_number(text)
+        width = 64 if is_64_bit else 32
+        # Like the toolchain, small values become a mov instead of a pool entry
+        if move_wide(value, width) is None:
+            key = (value & ((1 << width) - 1), width)
+            self.literal_pool.setdefault(key, None)
+
+    def layout(self):
+        """Place the literal pool and sections, then resolve every label."""
+        # The literal pool follows the code
+        if self.literal_pool:
+            self.alignments['text'] = max(self.alignments['text'], 8)
+            self.sections['text'] += bytes(-self.size('text') % 8)
+            self.labels.setdefault('$d', ('text', self.size('text')))
+            for key in self.literal_pool:
+                self.literal_pool[key] = self.size('text')
+                value, width = key
+                self.sections['text'] += value.to_bytes(width // 8, 'little')
+
+        headers = 64 + 2 * 56
+        text_offset = headers + (-headers % self.alignments['text'])
+        rodata_offset = text_offset + self.size('text')
+        rodata_offset += -rodata_offset % self.alignments['rodata']
+        text_end = rodata_offset + self.size('rodata')
+
+        # Writable segment: a new page, congruent with its file offset
+        data_offset = text_end + (-text_end % max(self.alignments['data'], 16))
+        data_address = BASE_ADDRESS + text_end + (-text_end % PAGE_SIZE) + PAGE_SIZE + data_offset % PAGE_SIZE
+        bss_address = data_address + self.size('data')
+        bss_address += -bss_address % self.alignments['bss']
+
+        self.addresses = {
+            'text': BASE_ADDRESS + text_offset,
+            'rodata': BASE_ADDRESS + rodata_offset,
+            'data': data_address,
+            'bss': bss_address,
+        }
+        self.offsets = {'text': text_offset, 'rodata': rodata_offset, 'data': data_offset}
+        self.text_end = text_end
+
+    def symbol(self, name):
+        # A symbol, optionally plus a constant: .LC0+4
+        name, _, addend = name.strip().partition('+')
+        if name not in self.labels:
+            raise Exception(f"Undefined symbol: {name}")
+        section, offset = self.labels[name]
+        return self.addresses[section] + offset + (parse_number(addend) if addend else 0)
+
+    def encode_all(self):
+        text = self.sections['text']
+        base = self.addresses['text']
+        for instruction in self.instructions:
+            pc = base + instruction.address
+            try:
+                word = self.encode(instruction.mnemonic, instruction.operands, pc)
+            except Exception as e:
+                raise Exception(f"Line {instruction.line}: {e}")
+            struct.pack_into('<I', text, instruction.address, word)
+
+    def encode(self, mnemonic, operands, pc):
+        if mnemonic.startswith('b.'):
+            condition = CONDITIONS[mnemonic[2:]]
+            return 0x54000000 | (self.branch_offset(operands[0], pc, 19) << 5) | condition
+        if mnemonic in ('b', 'bl'):
+            opcode = 0x14000000 if mnemonic == 'b' else 0x94000000
+            return opcode | self.branch_offset(operands[0], pc, 26)
+        if mnemonic in ('cbz', 'cbnz'):
+            rt, is_64_bit = parse_register(operands[0])
+            opcode = 0x34000000 if mnemonic == 'cbz' else 0x35000000
+            return (is_64_bit << 31) | opcode | (self.branch_offset(operands[1], pc, 19) << 5) | rt
+        if mnemonic in ('ret', 'br', 'blr'):
+            register = parse_register(operands[0])[0] if operands else 30
+            opcode = {'ret': 0xD65F0000, 'br': 0xD61F0000, 'blr': 0xD63F0000}[mnemonic]
+            return opcode | (register << 5)
+        if mnemonic == 'svc':
+            return 0xD4000001 | (parse_number(operands[0]) << 5)
+        if mnemonic == 'nop':
+            return NOP
+        if mnemonic in ('adrp', 'adr'):
+            rd = parse_register(operands[0])[0]
+            target = self.symbol(operands[1])
+            if mnemonic == 'adrp':
+                delta = ((target & ~0xfff) - (pc & ~0xfff)) >> 12
+                opcode = 0x90000000
+            else:
+                delta = target - pc
+                opcode = 0x10000000
+            if not -(1 << 20) <= delta < (1 << 20):
+                raise Exception(f"{mnemonic} target out of range: {operands[1]}")
+            return opcode | ((delta & 3) << 29) | (((delta >> 2) & 0x7ffff) << 5) | rd
+        if mnemonic in ('add', 'adds', 'sub', 'subs', 'cmp', 'cmn', 'neg'):
+            return self.encode_arithmetic(mnemonic, operands)
+        if mnemonic in ('mov', 'movz', 'movn', 'movk'):
+            return self.encode_move(mnemonic, operands)
+        if mnemonic in ('and', 'ands', 'orr', 'eor', 'tst'):
+            return self.encode_logical(mnemonic, operands)
+        if mnemonic in ('lsl', 'lsr', 'asr'):
+            return self.encode_shift(mnemonic, operands)
+        if mnemonic == 'clz':
+            rd, is_64_bit = parse_register(operands[0])
+            rn = parse_register(operands[1])[0]
+            return (is_64_bit << 31) | 0x5AC01000 | (rn << 5) | rd
+        if mnemonic in ('mul', 'madd', 'msub', 'udiv', 'sdiv', 'umulh', 'smulh'):
+            return self.encode_multiply(mnemonic, operands)
+        if mnemonic in ('csel', 'csinc', 'csinv', 'csneg', 'cset'):
+            return self.encode_select(mnemonic, operands)
+        if mnemonic in ('ldp', 'stp'):
+            return self.encode_pair(mnemonic, operands)
+        if mnemonic in ('ldr', 'str', 'ldrb', 'strb', 'ldrh', 'strh', 'ldur', 'stur', 'ldurb', 'sturb'):
+            return self.encode_load_store(mnemonic, operands, pc)
+        raise Exception(f"Unsupported instruction: {mnemonic}")
+
+    def branch_offset(self, label, pc, bits):
+        delta = self.symbol(label) - pc
+        if delta % 4 or not -(1 << (bits + 1)) <= delta < (1 << (bits + 1)):
+            raise Exception(f"Branch target out of range: {label}")
+        return (delta >> 2) & ((1 << bits) - 1)
+
+    def immediate(self, text):
+        """Value of an immediate operand, including :lo12: symbol references."""
+        text = text.strip()
+        if text.startswith(':lo12:'):
+            return self.symbol(text[6:]) & 0xfff
+        return parse_number(text)
+
+    def encode_arithmetic(self, mnemonic, operands):
+        if mnemonic in ('cmp', 'cmn'):
+            sets_flags = True
+            subtract = mnemonic == 'cmp'
+            operands = ['xzr' if parse_register(operands[0])[1] else 'wzr'] + operands
+        elif mnemonic == 'neg':
+            sets_flags = False
+            subtract = True
+            operands = [operands[0], 'xzr' if parse_register(operands[0])[1] else 'wzr'] + operands[1:]
+        else:
+            sets_flags = mnemonic.endswith('s')
+            subtract = mnemonic.startswith('sub')
+        rd, is_64_bit = parse_register(operands[0])
+        rn = parse_register(operands[1])[0]
+        flags = (is_64_bit << 31) | (subtract << 30) | (sets_flags << 29)
+
+        if not is_register(operands[2]):
+            value = self.immediate(operands[2])
+            if value < 0:
+                value = -value
+                flags ^= 1 << 30
+            shift = 0
+            if value > 0xfff and value & 0xfff == 0 and value >> 12 <= 0xfff:
+                value >>= 12
+                shift = 1
+            if value > 0xfff:
+                raise Exception(f"Immediate out of range: {operands[2]}")
+            return flags | 0x11000000 | (shift << 22) | (value << 10) | (rn << 5) | rd
+
+        rm = parse_register(operands[2])[0]
+        kind, amount = 'lsl', 0
+        if len(operands) > 3:
+            kind, amount = operands[3].split(None, 1)
+            kind = kind.lower()
+            amount = parse_number(amount)
+        if is_stack_pointer(operands[0]) or is_stack_pointer(operands[1]):
+            # Extended register form: the only one that can address sp
+            option = 3 if is_64_bit else 2
+            return flags | 0x0B200000 | (rm << 16) | (option << 13) | (amount << 10) | (rn << 5) | rd
+        shift = {'lsl': 0, 'lsr': 1, 'asr': 2}[kind]
+        return flags | 0x0B000000 | (shift << 22) | (rm << 16) | (amount << 10) | (rn << 5) | rd
+
+    def encode_move(self, mnemonic, operands):
+        rd, is_64_bit = parse_register(operands[0])
+        width = 64 if is_64_bit else 32
+        if mnemonic == 'mov' and is_register(operands[1]):
+            if is_stack_pointer(operands[0]) or is_stack_pointer(operands[1]):
+                return self.encode_arithmetic('add', [operands[0], operands[1], '#0'])
+            rm = parse_register(operands[1])[0]
+            return (is_64_bit << 31) | 0x2A0003E0 | (rm << 16) | rd
+
+        value = self.immediate(operands[1])
+        if mnemonic == 'mov':
+            wide = move_wide(value, width)
+            if wide:
+                opcode, hw, imm16 = wide
+                return (is_64_bit << 31) | opcode | (hw << 21) | (imm16 << 5) | rd
+            bitmask = encode_bitmask(value, width)
+            if bitmask is None:
+                raise Exception(f"Immediate cannot be moved in one instruction: {operands[1]}")
+            n, immr, imms = bitmask
+            return (is_64_bit << 31) | 0x320003E0 | (n << 22) | (immr << 16) | (imms << 10) | rd
+
+        hw = 0
+        if len(operands) > 2:
+            hw = parse_number(operands[2].split(None, 1)[1]) // 16
+        opcode = {'movz': 0x52800000, 'movn': 0x12800000, 'movk': 0x72800000}[mnemonic]
+        return (is_64_bit << 31) | opcode | (hw << 21) | ((value & 0xffff) << 5) | rd
+
+    def encode_logical(self, mnemonic, operands):
+        if mnemonic == 'tst':
+            mnemonic = 'ands'
+            operands = ['xzr' if parse_register(operands[0])[1] else 'wzr'] + operands
+        rd, is_64_bit = parse_register(operands[0])
+        rn = parse_register(operands[1])[0]
+        opc = {'and': 0, 'orr': 1, 'eor': 2, 'ands': 3}[mnemonic]
+        flags = (is_64_bit << 31) | (opc << 29)
+        if is_register(operands[2]):
+            rm = parse_register(operands[2])[0]
+            return flags | 0x0A000000 | (rm << 16) | (rn << 5) | rd
+        bitmask = encode_bitmask(self.immediate(operands[2]), 64 if is_64_bit else 32)
+        if bitmask is None:
+            raise Exception(f"Invalid logical immediate: {operands[2]}")
+        n, immr, imms = bitmask
+        return flags | 0x12000000 | (n << 22) | (immr << 16) | (imms << 10) | (rn << 5) | rd
+
+    def encode_shift(self, mnemonic, operands):
+        rd, is_64_bit = parse_register(operands[0])
+        rn = parse_register(operands[1])[0]
+        width = 64 if is_64_bit else 32
+        if is_register(operands[2]):
+            rm = parse_register(operands[2])[0]
+            opcode = {'lsl': 0x1AC02000, 'lsr': 0x1AC02400, 'asr': 0x1AC02800}[mnemonic]
+            return (is_64_bit << 31) | opcode | (rm << 16) | (rn << 5) | rd
+        amount = parse_number(operands[2])
+        if mnemonic == 'lsl':
+            immr, imms = -amount % width, width - 1 - amount
+        else:
+            immr, imms = amount, width - 1
+        opcode = 0x13000000 if mnemonic == 'asr' else 0x53000000
+        return (is_64_bit << 31) | opcode | (is_64_bit << 22) | (immr << 16) | (imms << 10) | (rn << 5) | rd
+
+    def encode_multiply(self, mnemonic, operands):
+        rd, is_64_bit = parse_register(operands[0])
+        rn = parse_register(operands[1])[0]
+        rm = parse_register(operands[2])[0]
+        if mnemonic in ('udiv', 'sdiv'):
+            opcode = 0x1AC00800 if mnemonic == 'udiv' else 0x1AC00C00
+            return (is_64_bit << 31) | opcode | (rm << 16) | (rn << 5) | rd
+        if mnemonic in ('umulh', 'smulh'):
+            opcode = 0x9BC07C00 if mnemonic == 'umulh' else 0x9B407C00
+            return opcode | (rm << 16) | (rn << 5) | rd
+        ra = parse_register(operands[3])[0] if mnemonic != 'mul' else 31
+        opcode = 0x1B008000 if mnemonic == 'msub' else 0x1B000000
+        return (is_64_bit << 31) | opcode | (rm << 16) | (ra << 10) | (rn << 5) | rd
+
+    def encode_select(self, mnemonic, operands):
+        if mnemonic == 'cset':
+            zero = 'xzr' if parse_register(operands[0])[1] else 'wzr'
+            condition = CONDITIONS[operands[1].lower()] ^ 1
+            mnemonic, operands = 'csinc', [operands[0], zero, zero]
+        else:
+            condition = CONDITIONS[operands[3].lower()]
+        rd, is_64_bit = parse_register(operands[0])
+        rn = parse_register(operands[1])[0]
+        rm = parse_register(operands[2])[0]
+        opcode = {'csel': 0x1A800000, 'csinc': 0x1A800400, 'csinv': 0x5A800000, 'csneg': 0x5A800400}[mnemonic]
+        return (is_64_bit << 31) | opcode | (rm << 16) | (condition << 12) | (rn << 5) | rd
+
+    def parse_address(self, operands):
+        """Split [base, offset]!, [base] and [base], #post into (base, offset, mode)."""
+        address = operands[0].strip()
+        mode = 'offset'
+        if address.endswith('!'):
+            mode = 'pre'
+            address = address[:-1].strip()
+        if not (address.startswith('[') and address.endswith(']')):
+            raise Exception(f"Invalid address: {operands[0]}")
+        parts = split_operands(address[1:-1])
+        base = parse_register(parts[0])[0]
+        offset = self.immediate(parts[1]) if len(parts) > 1 else 0
+        if len(operands) > 1:
+            mode = 'post'
+            offset = self.immediate(operands[1])
+        return base, offset, mode
+
+    def encode_pair(self, mnemonic, operands):
+        rt, is_64_bit = parse_register(operands[0])
+        rt2 = parse_register(operands[1])[0]
+        base, offset, mode = self.parse_address(operands[2:])
+        scale = 8 if is_64_bit else 4
+        if offset % scale or not -64 <= offset // scale < 64:
+            raise Exception(f"Pair offset out of range: {offset}")
+        modes = {'post': 1, 'offset': 2, 'pre': 3}
+        opcode = (0xA8000000 if is_64_bit else 0x28000000) | (modes[mode] << 23)
+        load = mnemonic == 'ldp'
+        return opcode | (load << 22) | (((offset // scale) & 0x7f) << 15) | (rt2 << 10) | (base << 5) | rt
+
+    def encode_load_store(self, mnemonic, operands, pc):
+        rt, is_64_bit = parse_register(operands[0])
+        load = mnemonic.startswith('ld')
+        if mnemonic.endswith('b'):
+            size = 0
+        elif mnemonic.endswith('h'):
+            size = 1
+        else:
+            size = 3 if is_64_bit else 2
+
+        if mnemonic == 'ldr' and operands[1].startswith('='):
+            value = parse_number(operands[1][1:])
+            width = 64 if is_64_bit else 32
+            if move_wide(value, width):
+                return self.encode_move('mov', [operands[0], '#' + operands[1][1:]])
+            literal = self.addresses['text'] + self.literal_pool[(value & ((1 << width) - 1), width)]
+            opcode = 0x58000000 if is_64_bit else 0x18000000
+            return opcode | ((((literal - pc) >> 2) & 0x7ffff) << 5) | rt
+
+        base, offset, mode = self.parse_address(operands[1:])
+        scale = 1 << size
+        unscaled = mnemonic.startswith(('ldur', 'stur'))
+        if mode == 'offset' and not unscaled and offset >= 0 and offset % scale == 0 and offset // scale <= 0xfff:
+            return (size << 30) | 0x39000000 | (load << 22) | ((offset // scale) << 10) | (base << 5) | rt
+        if not -256 <= offset < 256:
+            raise Exception(f"Offset out of range: {offset}")
+        index = {'offset': 0, 'post': 1, 'pre': 3}[mode]
+        return (size << 30) | 0x38000000 | (load << 22) | ((offset & 0x1ff) << 12) | (index << 10) | (base << 5) | rt
+
+    def assemble(self, assembly_code):
+        self.parse(assembly_code)
+        self.layout()
+        self.encode_all()
+        if '_start' not in self.labels:
+            raise Exception("No _start symbol")
+        self.entry = self.symbol('_start')
+
+    def symbol_table(self, section_indices):
+        """Build .symtab and .strtab, with $x/$d mapping symbols for disassemblers."""
+        strtab = bytearray(b'\0')
+        local_symbols = []
+        global_symbols = []
+
+        def add(name, section, value, binding):
+            entry = (len(strtab), binding << 4, section_indices[section], value)
+            strtab.extend(name.encode('utf-8') + b'\0')
+            (global_symbols if binding else local_symbols).append(entry)
+
+        add('$x', 'text', self.addresses['text'], 0)
+        for name, (section, offset) in self.labels.items():
+            if name.startswith('.L'):
+                continue
+            add(name, section, self.addresses[section] + offset, 1 if name in self.globals else 0)
+
+        symtab = bytearray(24)
+        for name_offset, info, index, value in local_symbols + global_symbols:
+            symtab += struct.pack('<IBBHQQ', name_offset, info, 0, index, value, 0)
+        return symtab, strtab, 1 + len(local_symbols)
+
+    def write_executable(self, filename):
+        """Write the assembled program as a static AArch64 ELF executable."""
+        text = bytes(self.sections['text'])
+        rodata = bytes(self.sections['rodata'])
+        data = bytes(self.sections['data'])
+        section_indices = {'text': 1, 'rodata': 2, 'data': 3, 'bss': 4}
+        symtab, strtab, first_global = self.symbol_table(section_indices)
+        shstrtab = b'\0.text\0.rodata\0.data\0.bss\0.symtab\0.strtab\0.shstrtab\0'
+
+        data_end = self.offsets['data'] + len(data)
+        symtab_offset = data_end + (-data_end % 8)
+        strtab_offset = symtab_offset + len(symtab)
+        shstrtab_offset = strtab_offset + len(strtab)
+        section_headers = shstrtab_offset + len(shstrtab)
+        section_headers += -section_headers % 8
+
+        memory_end = self.addresses['bss'] + self.bss_size
+        header = bytearray(b'\x7fELF\x02\x01\x01' + bytes(9))
+        header += struct.pack('<HHIQQQIHHHHHH', 2, 183, 1, self.entry, 64, section_headers,
+                              0, 64, 56, 2, 64, 8, 7)
+        # Read/execute segment: headers, code and read-only data
+        header += struct.pack('<IIQQQQQQ', 1, 5, 0, BASE_ADDRESS, BASE_ADDRESS,
+                              self.text_end, self.text_end, PAGE_SIZE)
+        # Read/write segment: data followed by zero-filled bss
+        header += struct.pack('<IIQQQQQQ', 1, 6, self.offsets['data'], self.addresses['data'],
+                              self.addresses['data'], len(data), memory_end - self.addresses['data'], PAGE_SIZE)
+
+        image = bytearray(header)
+        image += bytes(self.offsets['text'] - len(image)) + text
+        image += bytes(self.offsets['rodata'] - len(image)) + rodata
+        image += bytes(self.offsets['data'] - len(image)) + data
+        image += bytes(symtab_offset - len(image)) + symtab + strtab + shstrtab
+        image += bytes(section_headers - len(image))
+
+        def section_header(name, kind, flags, address, offset, size, link=0, info=0, align=1, entry=0):
+            return struct.pack('<IIQQQQIIQQ', shstrtab.index(name.encode() + b'\0'), kind, flags,
+                               address, offset, size, link, info, align, entry)
+
+        image += bytes(64)
+        image += section_header('.text', 1, 6, self.addresses['text'], self.offsets['text'], len(text),
+                                align=self.alignments['text'])
+        image += section_header('.rodata', 1, 2, self.addresses['rodata'], self.offsets['rodata'], len(rodata),
+                                align=self.alignments['rodata'])
+        image += section_header('.data', 1, 3, self.addresses['data'], self.offsets['data'], len(data),
+                                align=self.alignments['data'])
+        image += section_header('.bss', 8, 3, self.addresses['bss'], data_end, self.bss_size,
+                                align=self.alignments['bss'])
+        image += section_header('.symtab', 2, 0, 0, symtab_offset, len(symtab), link=6,
+                                info=first_global, align=8, entry=24)
+        image += section_header('.strtab', 3, 0, 0, strtab_offset, len(strtab))
+        image += section_header('.shstrtab', 3, 0, 0, shstrtab_offset, len(shstrtab))
+
+        with open(filename, 'wb') as f:
+            f.write(image)
+        os.chmod(filename, 0o755)
+
+def write_executable(assembly_code, filename):
+    """Assemble and link AArch64 assembly straight into a static executable."""
+    assembler = ARMAssembler()
+    assembler.assemble(assembly_code)
+    assembler.write_executable(filename)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/bench_diff.py
+
+import sys
+import os
+import glob
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import time
+import ctypes
+import signal
+
+from .build_cache import backend_tools
+from .vibe_compiler import compile_one
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# The checkout the package is in; an installed package has no example programs next to it
+ROOT = os.path.dirname(os.path.dirname(PACKAGE_DIR))
+
+# Runs the interpreter entry point of this copy of the package, installed or not
+RUN_MAIN = "import sys; sys.path.insert(0, sys.argv.pop(1)); from vibe.main import main; main()"
+
+# Engines in the order they run; the first one to succeed on a program is the reference
+ENGINES = ['interpreter', 'interpreter-cse', 'jit', 'native', 'native-freestanding', 'simple', 'simple-integrated',
+           'llvm', 'llvm-freestanding', 'x86_64']
+
+# Backend and extra compile options of the compiled engines
+COMPILED = {
+    'native': ('native', {}),
+    'native-freestanding': ('native', {'freestanding': True}),
+    'simple': ('simple', {}),
+    'simple-integrated': ('simple', {'integrated': True}),
+    'llvm': ('llvm', {}),
+    'llvm-freestanding': ('llvm', {'freestanding': True}),
+    'x86_64': ('x86_64', {}),
+}
+
+# Machines whose executables each backend produces; llvm builds for the host
+EXECUTABLE_MACHINES = {
+    'native': ('aarch64', 'arm64'),
+    'simple': ('aarch64', 'arm64'),
+    'x86_64': ('x86_64', 'amd64'),
+}
+
+# ptrace requests for measuring peak memory on Linux
+PTRACE_TRACEME, PTRACE_CONT, PTRACE_SETOPTIONS = 0, 7, 0x4200
+PTRACE_O_TRACEEXIT, PTRACE_EVENT_EXIT = 0x40, 6
+SIGTRAP = signal.SIGTRAP
+
+libc = None
+if platform.system() == 'Linux':
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.ptrace.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_void_p, ctypes.c_void_p]
+
+def default_corpus():
+    """The example programs shipped with the repository, or none outside a checkout."""
+    programs = [os.path.join(ROOT, 'test.vpl'), os.path.join(ROOT, 'advanced_test.vpl')]
+    programs.extend(sorted(glob.glob(os.path.join(ROOT, 'benchmarks', 'programs', '*.vpl'))))
+    return [program for program in programs if os.path.exists(program)]
+
+def unavailable(engine):
+    """Why an engine cannot run on this host, or None when it can."""
+    machine = platform.machine().lower()
+    if engine in ('interpreter', 'interpreter-cse'):
+        return None
+    if engine == 'jit':
+        if machine not in EXECUTABLE_MACHINES['x86_64'] or platform.system() != 'Linux':
+            return "needs an x86-64 Linux host"
+        return None
+
+    backend, options = COMPILED[engine]
+    if backend in EXECUTABLE_MACHINES and machine not in EXECUTABLE_MACHINES[backend]:
+        return f"builds {EXECUTABLE_MACHINES[backend][0]} executables, host is {machine}"
+    missing = [tool for tool in backend_tools(backend, options) if not shutil.which(tool)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    return None
+
+def prepare(engine, program, directory, opt_level):
+    """Command that runs program on engine, compiling it first if needed.
+
+    Returns (command, None), or (None, error) when compilation failed.
+    """
+    run_main = [sys.executable, '-c', RUN_MAIN, os.path.dirname(PACKAGE_DIR)]
+    if engine == 'interpreter':
+        return run_main + ['--quiet', program], None
+    if engine == 'interpreter-cse':
+        # -O evaluates repeated additions once, as the compiled engines do
+        return run_main + ['--quiet', '-O', program], None
+    if engine == 'jit':
+        return run_main + ['--jit', program], None
+
+    backend, options = COMPILED[engine]
+    options = dict(options)
+    if backend != 'x86_64':
+        options['opt_level'] = opt_level
+    name = os.path.splitext(os.path.basename(program))[0]
+    executable = os.path.join(directory, f"{name}-{engine}")
+    job = (program, executable, backend, options, None, False, False)
+    _, _, status, log = compile_one(job)
+    if status == 'error':
+        return None, log.strip().splitlines()[-1] if log.strip() else "compilation failed"
+    return [executable], None
+
+def trace_exit():
+    """In the child before exec: stop at exec so the parent can ask to see the exit."""
+    libc.ptrace(PTRACE_TRACEME, 0, None, None)
+
+def peak_rss_at_exit(pid):
+    """Follow a traced child to its exit; returns (wait status, peak RSS bytes).
+
+    ru_maxrss is no use for this on Linux: exec carries the high-water mark
+    of the process it replaces (this Python interpreter) into the child's.
+    The VmHWM of the new address space, read while the child is stopped on
+    its way out, is the program's own peak.
+    """
+    peak = None
+    _, status = os.waitpid(pid, 0)    # stopped at exec
+    if not os.WIFSTOPPED(status):
+        # Tracing is not permitted here
+        return status, peak
+    libc.ptrace(PTRACE_SETOPTIONS, pid, None, PTRACE_O_TRACEEXIT)
+    libc.ptrace(PTRACE_CONT, pid, None, 0)
+    while True:
+        _, status = os.waitpid(pid, 0)
+        if not os.WIFSTOPPED(status):
+            return status, peak
+        deliver = 0
+        if status >> 8 == (SIGTRAP | PTRACE_EVENT_EXIT << 8):
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peak = int(line.split()[1]) * 1024
+        elif os.WSTOPSIG(status) != SIGTRAP:
+            deliver = os.WSTOPSIG(status)
+        libc.ptrace(PTRACE_CONT, pid, None, deliver)
+
+def measure(command, trace=False):
+    """Run command once; returns (stdout bytes, exit code, wall seconds, peak RSS bytes).
+
+    The peak is only measured when trace is set, since tracing slows the
+    start of the process down; it is None when it cannot be measured.
+    """
+    peak = None
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        if trace and libc:
+            process = subprocess.Popen(command, stdout=output, stderr=subprocess.DEVNULL,
+                                       preexec_fn=trace_exit)
+            status, peak = peak_rss_at_exit(process.pid)
+        else:
+            process = subprocess.Popen(command, stdout=output, stderr=subprocess.DEVNULL)
+            _, status, usage = os.wait4(process.pid, 0)
+            if trace and platform.system() == 'Darwin':
+                # ru_maxrss is in bytes on macOS
+                peak = usage.ru_maxrss
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        output.seek(0)
+        return output.read(), process.returncode, elapsed, peak
+
+def first_difference(expected, actual):
+    """Describe the first line where two outputs disagree."""
+    expected_lines = expected.split(b'\n')
+    actual_lines = actual.split(b'\n')
+    for number, (want, got) in enumerate(zip(expected_lines, actual_lines), 1):
+        if want != got:
+            return f"line {number}: expected {want!r}, got {got!r}"
+    return f"expected {len(expected_lines)} lines, got {len(actual_lines)}"
+
+def bench_diff(programs, engines, repeat=3, opt_level=0):
+    """Run every program on every engine and print a comparison table.
+
+    Each engine's stdout is compared byte for byte with the reference
+    engine's (the first listed that ran the program successfully). Times
+    are the best of repeat runs, excluding compilation; peak RSS comes from
+    one more run. Returns the number of runs that failed or disagreed.
+    """
+    problems = 0
+    print(f"{'program':<20} {'engine':<18} {'result':<10} {'time':>10} {'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for program in programs:
+            name = os.path.basename(program)
+            reference = None
+            notes = []
+            for engine in engines:
+                command, error = prepare(engine, program, tmp, opt_level)
+                if command is None:
+                    problems += 1
+                    print(f"{name:<20} {engine:<18} {'no build':<10}")
+                    notes.append(f"  {engine}: {error}")
+                    continue
+
+                output, exit_code, _, peak = measure(command, trace=True)
+                best = min(measure(command)[2] for _ in range(repeat))
+                if exit_code != 0:
+                    result = 'failed'
+                    notes.append(f"  {engine}: exited with status {exit_code}")
+                elif reference is None:
+                    result = 'reference'
+                    reference = (engine, output)
+                elif output == reference[1]:
+                    result = 'ok'
+                else:
+                    result = 'DIFFERS'
+                    notes.append(f"  {engine} vs {reference[0]}: {first_difference(reference[1], output)}")
+                if result in ('failed', 'DIFFERS'):
+                    problems += 1
+                memory = f"{peak // 1024:>8}KB" if peak is not None else f"{'-':>10}"
+                print(f"{name:<20} {engine:<18} {result:<10} {best * 1000:>8.1f}ms {memory}")
+            for note in notes:
+                print(note)
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run programs on every available engine and compare their output and speed")
+    parser.add_argument('programs', nargs='*',
+                        help='Programs to run (default: the example programs)')
+    parser.add_argument('-e', '--engines', nargs='+', choices=ENGINES, default=ENGINES,
+                        help='Engines to compare (default: all available)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='Runs per engine and program; the fastest is reported (default: 3)')
+    parser.add_argument('-O', dest='opt_level', type=int, choices=[0, 1, 2, 3], default=0,
+                        help='Optimization level for the compiled engines')
+    args = parser.parse_args(argv)
+
+    engines = []
+    for engine in args.engines:
+        reason = unavailable(engine)
+        if reason:
+            print(f"Skipping {engine}: {reason}")
+        else:
+            engines.append(engine)
+
+    programs = args.programs or default_corpus()
+    if not programs:
+        parser.error("no programs given, and the example programs are only in a source checkout")
+    problems = bench_diff(programs, engines, max(1, args.repeat), args.opt_level)
+    if problems:
+        print(f"{problems} runs failed or disagreed with the reference")
+        sys.exit(1)
+    print(f"All engines agree on {len(programs)} programs")
+
+if __name__ == "__main__":
+    main()
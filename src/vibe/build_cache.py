@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/build_cache.py
+
+import os
+import glob
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+# External tools each backend runs; their versions are part of the cache key
+BACKEND_TOOLS = {
+    'native': ['as', 'gcc'],
+    'simple': ['as', 'ld'],
+    'llvm': ['opt', 'llc', 'gcc'],
+    'x86_64': ['as', 'ld'],
+}
+
+# Intermediate files a --keep-temp build copies next to the executable
+ARTIFACT_SUFFIXES = ['.s', '.ll', '.bc', '.o']
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'vibe')
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+def backend_tools(backend, options=None):
+    """The external tools a build with these options runs."""
+    tools = BACKEND_TOOLS.get(backend, [])
+    if options and options.get('integrated'):
+        # Assembled and linked in-process
+        return []
+    if options and options.get('freestanding'):
+        # Linked by ld on its own instead of the gcc driver
+        return [tool for tool in tools if tool != 'gcc'] + ['ld']
+    return tools
+
+def toolchain_version(backend, options=None):
+    """Describe the compiler sources and external tool versions used by a backend."""
+    digest = hashlib.sha256()
+
+    # The code generators themselves, as the modules of this package
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for filename in sorted(glob.glob(os.path.join(package_dir, '*.py'))):
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+
+    # First line of each tool's --version output
+    for tool in backend_tools(backend, options):
+        try:
+            result = subprocess.run([tool, '--version'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, check=False)
+            digest.update(result.stdout.split(b'\n', 1)[0])
+        except OSError:
+            digest.update(f"{tool} missing".encode())
+    return digest.hexdigest()
+
+class BuildCache:
+    """Content-addressed store of build artifacts with LRU eviction.
+
+    Each entry is a directory named by the hash of the source, backend,
+    options and toolchain version, plus the source's absolute path when
+    the build embeds it as debug info. Its mtime records the last use, and
+    evict() removes the least recently used entries once the cache grows
+    past max_size bytes.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_size=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source, backend, options, toolchain, path=None):
+        digest = hashlib.sha256()
+        digest.update(source)
+        if options.get('debug_info') and path:
+            # Debug info records where the source lives, so a copy elsewhere builds differently
+            digest.update(os.path.abspath(path).encode())
+        digest.update(backend.encode())
+        digest.update(repr(sorted(options.items())).encode())
+        digest.update(toolchain.encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def fetch(self, key, output_file, keep_temp=False):
+        """Copy a cached build to output_file; returns False on a miss."""
+        entry = self.entry_path(key)
+        executable = os.path.join(entry, 'program')
+        if not os.path.exists(executable):
+            self.misses += 1
+            return False
+
+        shutil.copy2(executable, output_file)
+        if keep_temp:
+            for suffix in ARTIFACT_SUFFIXES:
+                artifact = os.path.join(entry, 'program' + suffix)
+                if os.path.exists(artifact):
+                    shutil.copyfile(artifact, output_file + suffix)
+
+        # Mark as recently used
+        os.utime(entry)
+        self.hits += 1
+        return True
+
+    def store(self, key, output_file):
+        """Copy the executable and intermediate files of a fresh build into the cache."""
+        entry = self.entry_path(key)
+        if os.path.exists(entry):
+            return
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+
+        # Fill a private directory first so concurrent builds never see half an entry
+        staging = tempfile.mkdtemp(dir=os.path.dirname(entry))
+        try:
+            for suffix in ARTIFACT_SUFFIXES:
+                if os.path.exists(output_file + suffix):
+                    shutil.copyfile(output_file + suffix, os.path.join(staging, 'program' + suffix))
+            shutil.copy2(output_file, os.path.join(staging, 'program'))
+            os.rename(staging, entry)
+        except OSError:
+            # Another build stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def entries(self):
+        """Yield (mtime, size, path) for every cache entry."""
+        for entry in glob.glob(os.path.join(self.directory, '??', '*')):
+            size = 0
+            for name in os.listdir(entry):
+                size += os.path.getsize(os.path.join(entry, name))
+            yield os.path.getmtime(entry), size, entry
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_size."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
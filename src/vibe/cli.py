@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/cli.py
+
+# Entry point of the `vibe` command. Only sys is imported up front; each
+# subcommand imports its own modules when it runs, so `vibe help` loads
+# no compiler code and `vibe run` no backend.
+import sys
+
+USAGE = """\
+Vibe Programming Language
+Usage: vibe [command] [options] [file]
+
+Commands:
+  compile   Compile a .vpl file to executable (default if not specified)
+  run       Run a .vpl file using the interpreter
+  bench-diff  Run programs on every available engine, comparing output and speed
+  help      Show this help message
+
+Options for compile:
+  -o, --output NAME      Specify output name
+  -b, --backend TYPE     Compiler backend (native, simple, llvm, x86_64)
+  -v, --verbose          Show verbose output
+  --keep-temp            Copy intermediate files next to the output
+  -O0 .. -O3             Optimization level (-O1 and up enable the ARM64 peephole optimizer)
+  -g                     Emit source line debug info for perf, gdb and addr2line
+  --target TRIPLE        LLVM target triple (default: host)
+  --freestanding         Link native or llvm executables against a syscall runtime, not libc
+  --integrated-as        Build simple backend executables without as/ld
+  --size-report          Show section sizes and string literal bytes
+  --stats                Print a JSON static cost report of the generated code instead of building
+  --precompute           Run the program at build time; the executable just writes its output
+
+Options for run:
+  --jit                  Compile to x86-64 machine code in memory and run it
+  -O                     Evaluate repeated additions once (compiled engines always do)
+
+Options for bench-diff:
+  -e, --engines NAME...  Engines to compare (default: all available)
+  -r, --repeat N         Runs per engine; the fastest is reported
+
+Examples:
+  vibe compile program.vpl -o program
+  vibe run program.vpl
+  vibe run --jit program.vpl
+  vibe bench-diff programs/*.vpl"""
+
+def compile_command(args):
+    from .vibe_compiler import main
+    main(args)
+
+def run_command(args):
+    from .main import main
+    main(args)
+
+def bench_diff_command(args):
+    from .bench_diff import main
+    main(args)
+
+def help_command(args):
+    print(USAGE)
+
+COMMANDS = {
+    'compile': compile_command,
+    'run': run_command,
+    'bench-diff': bench_diff_command,
+    'help': help_command,
+}
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    if not args or args[0] in ('-h', '--help'):
+        help_command(args)
+        return
+    command = COMMANDS.get(args[0])
+    if command is None:
+        # Compile is the default command
+        command, args = compile_command, ['compile'] + args
+    command(args[1:])
+
+if __name__ == "__main__":
+    main()
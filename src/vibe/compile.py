@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/compile.py
+
+import sys
+import os
+import subprocess
+from .tokenizer import Lexer
+from .parser import Parser
+from .compiler import CodeGenerator
+from .pipeline import BuildDirectory, run_pipeline
+from .precompute import precompute_output, DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS
+
+def compile_file(input_filename, output_filename=None, opt_level=0, precompute=None, debug_info=False,
+                 keep_temp=False, freestanding=False):
+    # Default output filename is input filename without extension + ".o"
+    if output_filename is None:
+        output_filename = os.path.splitext(input_filename)[0]
+        
+    # Read source file
+    with open(input_filename, 'r') as f:
+        source = f.read()
+    
+    def generate(output):
+        compile_to_assembly(source, opt_level, output, precompute, input_filename if debug_info else None,
+                            freestanding)
+    
+    # Pipe the assembly straight into as, then link; keep_temp also writes it out
+    with BuildDirectory(output_filename, keep_temp) as build:
+        try:
+            print("Assembling and linking...")
+            # For ARM64 we'll use the gcc toolchain
+            object_filename = build.path('.o')
+            run_pipeline([["as", "-o", object_filename, "-"]], generate,
+                         [build.path('.s')] if keep_temp else None)
+            if freestanding:
+                # The syscall runtime needs no libc: a static executable without a dynamic loader
+                subprocess.run(["ld", "-static", "-o", output_filename, object_filename], check=True)
+            else:
+                subprocess.run(["gcc", "-o", output_filename, object_filename], check=True)
+            print(f"Compiled executable written to {output_filename}")
+            
+            # Make the file executable
+            os.chmod(output_filename, 0o755)
+        except subprocess.SubprocessError as e:
+            print(f"Compilation error: {e}")
+            sys.exit(1)
+
+def compile_to_assembly(source, opt_level=0, output=None, precompute=None, source_file=None, freestanding=False):
+    # Tokenize
+    lexer = Lexer(source)
+    tokens = lexer.tokenize()
+    
+    # Parse
+    parser = Parser(tokens)
+    ast = parser.parse()
+    
+    # Generate code, or with a precompute budget just the program's output if it fits
+    code_generator = CodeGenerator(opt_level, source_file, freestanding)
+    precomputed = precompute_output(ast, precompute) if precompute else None
+    if precomputed is not None:
+        return code_generator.generate_precomputed(precomputed, output)
+    assembly_code = code_generator.compile(ast, output)
+    
+    return assembly_code
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.compile <input_file> [output_file] [-O<level>] [--precompute] [-g] [--keep-temp] [--freestanding]")
+        sys.exit(1)
+    
+    input_filename = sys.argv[1]
+    output_filename = None
+    opt_level = 0
+    precompute = None
+    debug_info = False
+    keep_temp = False
+    freestanding = False
+    for arg in sys.argv[2:]:
+        if arg == '--precompute':
+            precompute = (DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS)
+        elif arg == '-g':
+            debug_info = True
+        elif arg == '--keep-temp':
+            keep_temp = True
+        elif arg == '--freestanding':
+            freestanding = True
+        elif arg.startswith('-O'):
+            opt_level = int(arg[2:] or 1)
+        else:
+            output_filename = arg
+    
+    compile_file(input_filename, output_filename, opt_level, precompute, debug_info, keep_temp, freestanding)
+
+if __name__ == "__main__":
+    main()
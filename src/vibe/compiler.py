@@ -0,0 +1,428 @@
+from .runtime import LINE_BUFFERED_ENV
+from .type_inference import NUM, STR
+from .ir import lower, signed, OPCODE_NAMES
+from .peephole import optimize
+from .literal_pool import LiteralPool
+from .output_sink import OutputSink, FLUSH_LINES
+from .precompute import ascii_directives
+from .debug_info import file_directive, loc_directive, annotate_functions, end_function
+from .simple_compiler import runtime_code, runtime_data, RUNTIME_FUNCTIONS
+
+# Helpers and entry point, given .type and .size so profilers can attribute samples
+FUNCTIONS = ('_print_value', '_print_number', '_start')
+
+# With --freestanding, simple_compiler's syscall runtime and the adapters in front of it
+FREESTANDING_FUNCTIONS = RUNTIME_FUNCTIONS[:-1] + ('_string_length',) + FUNCTIONS
+
+# printf conversion for each value type
+FORMATS = {NUM: "%lu", STR: "%s"}
+
+class CodeGenerator:
+    def __init__(self, opt_level=0, source_file=None, freestanding=False):
+        self.opt_level = opt_level
+        self.source_file = source_file      # set for -g: .loc directives for its lines
+        self.freestanding = freestanding    # link against the syscall runtime instead of libc
+        self.variables = {}
+        self.text_section = []
+        self.string_counter = 0
+        self.literals = LiteralPool(".LS{}")
+        self.concat_formats = {}
+        self.output = []
+        
+    def generate_string_label(self):
+        label = f".LC{self.string_counter}"
+        self.string_counter += 1
+        return label
+    
+    def push(self, temp):
+        """Make room in x0 for a new temporary, saving the one there in x19."""
+        if self.stack and self.joined[self.stack[-1]]:
+            # A piece of a JOIN waits on the machine stack
+            self.text_section.append("    str x0, [sp, #-16]!")
+        elif self.stack:
+            if len(self.stack) > 1 and not self.joined[self.stack[-2]]:
+                raise Exception("More than two temporaries live at once")
+            self.text_section.append("    mov x19, x0")  # Callee-saved, survives calls
+        self.stack.append(temp)
+    
+    def generate_CONST(self, dest, value, arg2):
+        self.push(dest)
+        self.formats[dest] = FORMATS[NUM]
+        value = signed(value)
+        if 0 <= value < 65536:
+            self.text_section.append(f"    mov x0, #{value}")
+        else:
+            self.text_section.append(f"    ldr x0, ={value}")
+    
+    def generate_STRING(self, dest, literal, arg2):
+        self.push(dest)
+        self.formats[dest] = FORMATS[STR]
+        # Literals are interned; their data is written with the data section
+        string_label = self.literals.symbol(self.program.literals[literal])
+        self.text_section.append(f"    adrp x0, {string_label}")
+        self.text_section.append(f"    add x0, x0, :lo12:{string_label}")
+    
+    def generate_LOAD(self, dest, slot, arg2):
+        self.push(dest)
+        self.formats[dest] = FORMATS[self.program.slots[slot][1]]
+        self.text_section.append(f"    ldr x0, [x29, #{self.variables[slot]}]")
+    
+    def generate_STORE(self, dest, slot, value):
+        # Store result in its stack slot
+        self.stack.pop()
+        self.text_section.append(f"    str x0, [x29, #{self.variables[slot]}]")
+    
+    def generate_ADD(self, dest, left, right):
+        # Handle numeric addition
+        del self.stack[-2:]
+        self.stack.append(dest)
+        self.formats[dest] = FORMATS[NUM]
+        self.text_section.append("    add x0, x19, x0")
+    
+    def generate_CONCAT(self, dest, left, right):
+        # We'll use C standard library's sprintf for simplicity, which also
+        # formats a number operand without a separate conversion
+        del self.stack[-2:]
+        self.stack.append(dest)
+        self.formats[dest] = FORMATS[STR]
+        self.generate_concat(self.formats.pop(left), self.formats.pop(right))
+    
+    def generate_concat(self, left_format, right_format):
+        # Left operand in x19, right in x0, result in x0
+        if self.freestanding:
+            self.generate_runtime_concat(left_format, right_format)
+            return
+        self.text_section.append("    mov x3, x0")  # Right operand
+        self.text_section.append("    mov x2, x19")  # Left operand
+        
+        # Allocate buffer for result (simplified)
+        buffer_label = self.generate_string_label()
+        self.sink.write_data([f"{buffer_label}:", "    .skip 256"])  # Allocate 256 bytes for result
+        
+        # sprintf(buffer, format, left, right)
+        format_label = self.concat_format(left_format, right_format)
+        self.text_section.append(f"    adrp x1, {format_label}")
+        self.text_section.append(f"    add x1, x1, :lo12:{format_label}")
+        self.text_section.append(f"    adrp x0, {buffer_label}")
+        self.text_section.append(f"    add x0, x0, :lo12:{buffer_label}")
+        self.text_section.append("    bl sprintf")
+        
+        # sprintf returns the length, so reload the buffer address
+        self.text_section.append(f"    adrp x0, {buffer_label}")
+        self.text_section.append(f"    add x0, x0, :lo12:{buffer_label}")
+    
+    def generate_JOIN(self, dest, first, count):
+        # Pairwise, as CONCAT does it: the pieces come back off the machine stack
+        # in order, each concatenated onto the result so far
+        pieces = self.program.join_pieces(first, count)
+        del self.stack[-count:]
+        self.stack.append(dest)
+        formats = [self.formats.pop(piece) for piece in pieces]
+        self.formats[dest] = FORMATS[STR]
+        self.text_section.append("    str x0, [sp, #-16]!")  # The last piece joins the others
+        self.add_to_sp("x22", 16 * count)                    # Above the first piece
+        self.text_section.append("    ldr x0, [x22, #-16]!")
+        left_format = formats[0]
+        for right_format in formats[1:]:
+            self.text_section.append("    mov x19, x0")
+            self.text_section.append("    ldr x0, [x22, #-16]!")
+            self.generate_concat(left_format, right_format)
+            left_format = FORMATS[STR]
+        self.add_to_sp("sp", 16 * count)
+    
+    def add_to_sp(self, register, value):
+        """register = sp + value; add only takes 12-bit immediates."""
+        if value <= 0xfff:
+            self.text_section.append(f"    add {register}, sp, #{value}")
+        else:
+            self.text_section.append(f"    ldr x9, ={value}")
+            self.text_section.append(f"    add {register}, sp, x9")
+    
+    def generate_runtime_concat(self, left_format, right_format):
+        # The runtime's string_concat takes both strings as a pointer and a length
+        self.text_section.append(f"    bl {self.runtime_string(right_format)}")
+        self.text_section.append("    mov x20, x0")  # Right operand, kept across the calls
+        self.text_section.append("    mov x21, x1")
+        self.text_section.append("    mov x0, x19")  # Left operand
+        self.text_section.append(f"    bl {self.runtime_string(left_format)}")
+        self.text_section.append("    mov x2, x20")
+        self.text_section.append("    mov x3, x21")
+        self.text_section.append("    bl string_concat")  # NUL-terminated, like the operands
+    
+    def runtime_string(self, value_format):
+        """The helper turning a value in x0 into a string pointer in x0 and length in x1."""
+        return "num_to_string" if value_format == FORMATS[NUM] else "_string_length"
+    
+    def generate_TO_STRING(self, dest, value, arg2):
+        # The number stays in x0; printf formats it where the string is used
+        self.stack[-1] = dest
+        self.formats[dest] = self.formats.pop(value)
+    
+    def generate_PRINT(self, dest, value, arg2):
+        # x0 contains the value to print; call printf with the format for its type
+        self.stack.pop()
+        if self.formats.pop(value) == FORMATS[NUM]:
+            self.text_section.append("    bl _print_number")
+        else:
+            self.text_section.append("    bl _print_value")
+    
+    def concat_format(self, left_format, right_format):
+        key = left_format + right_format
+        if key not in self.concat_formats:
+            label = f"concat_format_{len(self.concat_formats)}"
+            self.concat_formats[key] = label
+            self.sink.write_data([f"{label}:", f'    .string "{key}"'])
+        return self.concat_formats[key]
+    
+    def generate_header(self):
+        if self.freestanding:
+            self.generate_runtime_header()
+            return
+        self.output.append(".global _start")
+        self.output.append(".extern printf")  # External C library function
+        
+        # Define our helper functions
+        self.output.append("_print_value:")
+        self.output.append("    stp x29, x30, [sp, #-16]!")  # Save frame pointer and link register
+        self.output.append("    mov x29, sp")               # Set up frame pointer
+        
+        # Check if value in x0 is a string (implementation simplified)
+        self.output.append("    mov x1, x0")                # First argument to printf
+        self.output.append("    adrp x0, printf_format")
+        self.output.append("    add x0, x0, :lo12:printf_format")
+        self.output.append("    bl printf")
+        
+        self.output.append("    ldp x29, x30, [sp], #16")   # Restore frame and link register
+        self.output.append("    ret")
+        
+        self.output.append("_print_number:")
+        self.output.append("    stp x29, x30, [sp, #-16]!")
+        self.output.append("    mov x29, sp")
+        self.output.append("    mov x1, x0")                # Number to print
+        self.output.append("    adrp x0, number_format")
+        self.output.append("    add x0, x0, :lo12:number_format")
+        self.output.append("    bl printf")
+        self.output.append("    ldp x29, x30, [sp], #16")
+        self.output.append("    ret")
+    
+    def generate_runtime_header(self):
+        # simple_compiler's runtime, with the helpers the program calls on top of it
+        self.output.extend(runtime_code())
+        
+        # Length of the NUL-terminated string in x0, into x1
+        self.output.append("_string_length:")
+        self.output.append("    mov x1, x0")
+        self.output.append("_string_length_loop:")
+        self.output.append("    ldrb w2, [x1], #1")
+        self.output.append("    cbnz w2, _string_length_loop")
+        self.output.append("    sub x1, x1, x0")
+        self.output.append("    sub x1, x1, #1")            # Not counting the NUL
+        self.output.append("    ret")
+        
+        self.output.append("_print_value:")
+        self.output.append("    stp x29, x30, [sp, #-16]!")
+        self.output.append("    mov x29, sp")
+        self.output.append("    bl _string_length")
+        self.output.append("    ldp x29, x30, [sp], #16")
+        self.output.append("    b print_string")
+        
+        # Formatted in its frame, so printing a number takes nothing from the arena
+        self.output.append("_print_number:")
+        self.output.append("    stp x29, x30, [sp, #-48]!")
+        self.output.append("    mov x29, sp")
+        self.output.append("    add x1, sp, #16")
+        self.output.append("    bl format_number")
+        self.output.append("    mov x1, x0")
+        self.output.append("    add x0, sp, #16")
+        self.output.append("    bl print_string")
+        self.output.append("    ldp x29, x30, [sp], #48")
+        self.output.append("    ret")
+    
+    def generate_data_section(self):
+        # Written to the spool first; buffers and formats follow as the program needs them
+        self.output.append(".section .data")
+        if self.freestanding:
+            # No printf; the runtime's data follows the literals
+            return
+        self.output.append("printf_format:")
+        self.output.append('    .string "%s\\n"')
+        self.output.append("number_format:")
+        self.output.append('    .string "%lu\\n"')
+        self.output.append("line_buffered_env:")
+        self.output.append(f'    .string "{LINE_BUFFERED_ENV}"')
+    
+    def generate_literals(self):
+        # String literals, one per distinct value, byte for byte as the pool laid them out
+        for label, value in self.literals.stored.items():
+            self.output.append(f"{label}:")
+            self.output.extend(ascii_directives(value.encode('utf-8') + b'\0'))
+    
+    def allocate_variables(self, program):
+        # One stack slot per IR variable slot, so the frame size is known up front
+        for slot in range(len(program.slots)):
+            self.variables[slot] = slot * 8
+    
+    def stack_size(self):
+        stack_size = max(16, len(self.variables) * 8)
+        if stack_size % 16 != 0:  # Ensure 16-byte alignment
+            stack_size += 8
+        return stack_size
+    
+    def generate_program_entry(self):
+        self.output.append(".section .text")
+        self.output.append("_start:")
+        if self.freestanding:
+            # Find envp above argv and check whether stdout should be line buffered
+            self.output.append("    ldr x0, [sp]")              # argc
+            self.output.append("    add x0, x0, #2")
+            self.output.append("    add x0, sp, x0, lsl #3")    # envp = sp + 8 * (argc + 2)
+            self.output.append("    bl init_stdout")
+        self.output.append("    stp x29, x30, [sp, #-16]!")  # Save frame pointer and link register
+        self.output.append("    mov x29, sp")               # Set up frame pointer
+        
+        # Reserve stack space for variables
+        self.output.append(f"    sub sp, sp, #{self.stack_size()}")
+        if self.freestanding:
+            return
+        
+        # printf output is buffered by stdio; switch it to line buffering on request
+        self.output.append("    adrp x0, line_buffered_env")
+        self.output.append("    add x0, x0, :lo12:line_buffered_env")
+        self.output.append("    bl getenv")
+        self.output.append("    cbz x0, 1f")
+        self.output.append("    ldrb w1, [x0]")
+        self.output.append("    cbz w1, 1f")                # Empty value
+        self.output.append("    cmp w1, #'0'")
+        self.output.append("    b.eq 1f")
+        self.output.append("    adrp x0, :got:stdout")
+        self.output.append("    ldr x0, [x0, :got_lo12:stdout]")
+        self.output.append("    ldr x0, [x0]")
+        self.output.append("    mov x1, #0")                # Let stdio allocate the buffer
+        self.output.append("    mov x2, #1")                # _IOLBF
+        self.output.append("    mov x3, #0")
+        self.output.append("    bl setvbuf")
+        self.output.append("1:")
+    
+    def generate_program_exit(self):
+        # Clean up and exit
+        self.output.append(f"    add sp, sp, #{self.stack_size()}")
+        self.output.append("    ldp x29, x30, [sp], #16")  # Restore frame and link register
+        
+        if self.freestanding:
+            self.output.append("    bl flush_stdout")
+        else:
+            # Flush stdio buffers, since the exit syscall bypasses libc's exit handlers
+            self.output.append("    mov x0, #0")      # NULL flushes every stream
+            self.output.append("    bl fflush")
+        
+        # Exit system call
+        self.output.append("    mov x0, #0")      # Exit code 0
+        self.output.append("    mov x8, #93")     # exit syscall number for arm64
+        self.output.append("    svc #0")          # Make syscall
+        self.output.append(end_function("_start"))
+    
+    def compile(self, ast, output=None):
+        """Generate the program's assembly, writing it to output as it goes.
+
+        The program is written out every FLUSH_LINES lines, each window
+        optimized on its own at -O1. Data is spooled and follows the code.
+        Without output the assembly is returned.
+        """
+        return self.compile_ir(lower(ast), output)
+    
+    def compile_ir(self, program, output=None):
+        """Generate assembly for an IRProgram, as compile() does for an AST.
+
+        A statement's temporaries are a stack of at most two: the top one
+        in x0 and the one below it in x19, besides the pieces of a JOIN,
+        which wait on the machine stack.
+        """
+        self.program = program
+        self.joined = bytearray(len(program.temp_types))
+        for temp in program.pieces:
+            self.joined[temp] = 1
+        self.literals.collect(program)
+        self.allocate_variables(program)
+        self.stack = []
+        self.formats = {}       # temp -> printf conversion of its value
+        self.sink = OutputSink(output)
+        
+        self.generate_data_section()
+        self.sink.write_data(self.output)
+        self.output = []
+        
+        if self.source_file:
+            self.sink.write([file_directive(self.source_file)])
+        self.generate_header()
+        self.generate_program_entry()
+        self.sink.write(annotate_functions(self.output, FREESTANDING_FUNCTIONS if self.freestanding else FUNCTIONS))
+        self.output = []
+        
+        handlers = [getattr(self, f"generate_{name}") for name in OPCODE_NAMES]
+        current_line = 0
+        for op, dest, arg1, arg2, line in program.located_instructions():
+            if line != current_line and self.source_file:
+                # Attribute the statement's code to its source line
+                self.text_section.append(loc_directive(line))
+                current_line = line
+            handlers[op](dest, arg1, arg2)
+            if not self.stack and len(self.text_section) >= FLUSH_LINES:
+                self.flush()
+        self.flush()
+        
+        self.generate_program_exit()
+        self.sink.write(self.output)
+        self.output = []
+        
+        self.generate_literals()
+        if self.freestanding:
+            self.output.extend(runtime_data())
+        self.sink.write_data(self.output)
+        self.output = []
+        return self.sink.close()
+    
+    def generate_precomputed(self, data, output=None):
+        """Assembly for a program that only writes data, its output worked out at build time.
+
+        The bytes go straight to the write syscall, bypassing printf and
+        its buffering, in as few calls as the kernel allows.
+        """
+        sink = OutputSink(output)
+        sink.write([
+            ".global _start",
+            ".section .text",
+            "_start:",
+            "    adrp x1, precomputed_output",
+            "    add x1, x1, :lo12:precomputed_output",
+            "    adrp x2, precomputed_end",
+            "    add x2, x2, :lo12:precomputed_end",
+            "    sub x2, x2, x1",            # Bytes left to write
+            "precomputed_write:",
+            "    cbz x2, precomputed_exit",
+            "    mov x0, #1",                # stdout
+            "    mov x8, #64",               # write syscall number for arm64
+            "    svc #0",
+            "    cmp x0, #0",
+            "    b.le precomputed_fail",
+            "    add x1, x1, x0",            # Short write: continue after what was written
+            "    sub x2, x2, x0",
+            "    b precomputed_write",
+            "precomputed_exit:",
+            "    mov x0, #0",                # Exit code 0
+            "    mov x8, #93",               # exit syscall number for arm64
+            "    svc #0",
+            "precomputed_fail:",
+            "    mov x0, #1",
+            "    mov x8, #93",
+            "    svc #0",
+        ])
+        sink.write_data([".section .rodata", "precomputed_output:"] + ascii_directives(data) +
+                        ["precomputed_end:"])
+        return sink.close()
+    
+    def flush(self):
+        """Write out the program code generated so far."""
+        if self.opt_level > 0:
+            self.text_section = optimize(self.text_section)
+        self.sink.write(self.text_section)
+        self.text_section = []
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/cost_model.py
+
+import re
+import sys
+import json
+import contextlib
+from collections import Counter
+from .tokenizer import Lexer
+from .parser import Parser
+from .ir import lower, PRINT
+from .precompute import precompute_output
+
+# Instruction categories, in the order they are reported
+CATEGORIES = ('move', 'load', 'store', 'arithmetic', 'multiply', 'divide', 'branch', 'call', 'syscall', 'other')
+
+# System call numbers of each architecture; the report estimates write and mmap
+SYSCALL_NAMES = {
+    'arm64': {64: 'write', 93: 'exit', 222: 'mmap'},
+    'x86_64': {1: 'write', 9: 'mmap', 60: 'exit'},
+}
+REPORTED_SYSCALLS = ('write', 'mmap')
+
+# libc functions the libc builds call, and the system calls each may make
+LIBC_SYSCALLS = {
+    'write': ('write',), 'printf': ('write',), 'fwrite': ('write',), 'fputc': ('write',), 'fflush': ('write',),
+    'malloc': ('mmap',), 'realloc': ('mmap',),
+}
+
+# Sections data is counted in, and the bytes per item of the data directives
+DATA_SECTIONS = ('data', 'rodata', 'bss')
+DATA_DIRECTIVES = {'.byte': 1, '.short': 2, '.long': 4, '.quad': 8}
+
+ARM64_CATEGORIES = {
+    'mov': 'move', 'movz': 'move', 'movk': 'move', 'movn': 'move', 'adr': 'move', 'adrp': 'move',
+    'mul': 'multiply', 'madd': 'multiply', 'msub': 'multiply', 'umulh': 'multiply', 'smulh': 'multiply',
+    'udiv': 'divide', 'sdiv': 'divide',
+    'svc': 'syscall', 'bl': 'call', 'blr': 'call',
+    'b': 'branch', 'cbz': 'branch', 'cbnz': 'branch', 'tbz': 'branch', 'tbnz': 'branch', 'ret': 'branch',
+    'br': 'branch',
+}
+ARM64_ARITHMETIC = {'add', 'adds', 'sub', 'subs', 'cmp', 'cmn', 'tst', 'and', 'ands', 'orr', 'eor', 'bic',
+                    'lsl', 'lsr', 'asr', 'neg', 'mvn', 'csel', 'cset', 'csinc', 'ubfx', 'sbfx', 'clz'}
+
+X86_CATEGORIES = {
+    'lea': 'move', 'push': 'store', 'pop': 'load',
+    'mul': 'multiply', 'imul': 'multiply', 'div': 'divide', 'idiv': 'divide',
+    'syscall': 'syscall', 'call': 'call', 'jmp': 'branch', 'ret': 'branch',
+}
+X86_ARITHMETIC = {'add', 'sub', 'inc', 'dec', 'neg', 'not', 'cmp', 'test', 'and', 'or', 'xor', 'shl', 'shr',
+                  'sar', 'adc', 'sbb', 'bsr'}
+
+LLVM_CATEGORIES = {
+    'phi': 'move', 'extractvalue': 'move', 'insertvalue': 'move', 'bitcast': 'move', 'ptrtoint': 'move',
+    'inttoptr': 'move', 'trunc': 'move', 'zext': 'move', 'sext': 'move',
+    'load': 'load', 'store': 'store',
+    'add': 'arithmetic', 'sub': 'arithmetic', 'and': 'arithmetic', 'or': 'arithmetic', 'xor': 'arithmetic',
+    'shl': 'arithmetic', 'lshr': 'arithmetic', 'ashr': 'arithmetic', 'icmp': 'arithmetic',
+    'select': 'arithmetic', 'getelementptr': 'arithmetic',
+    'mul': 'multiply', 'udiv': 'divide', 'sdiv': 'divide', 'urem': 'divide', 'srem': 'divide',
+    'br': 'branch', 'switch': 'branch', 'ret': 'branch', 'unreachable': 'branch', 'call': 'call',
+}
+
+class Block:
+    """A straight-line run of instructions, entered at its start and left at its end."""
+    def __init__(self, label):
+        self.label = label
+        self.length = 0
+        self.events = []        # ('call', function) and ('syscall', name), in order
+        self.exit = None        # ('jump', label), ('branch',) or ('return',); None falls through
+
+class Function:
+    def __init__(self, name):
+        self.name = name
+        self.blocks = [Block(name)]
+        self.labels = {name: 0}
+        self.counts = Counter()
+
+class Listing:
+    """The functions and data of generated code, as the cost model sees them.
+
+    The parsers below feed it one line at a time: labels start blocks,
+    and an instruction after a branch starts one of its own. Calls do
+    not end a block.
+    """
+    def __init__(self, arch):
+        self.arch = arch
+        self.functions = {}
+        self.function = None
+        self.data = dict.fromkeys(DATA_SECTIONS, 0)
+
+    def begin(self, name):
+        self.function = self.functions[name] = Function(name)
+
+    def label(self, label):
+        if self.function is None:
+            self.begin(label)
+            return
+        blocks = self.function.blocks
+        if blocks[-1].length or blocks[-1].exit:
+            blocks.append(Block(label))
+        self.function.labels[label] = len(blocks) - 1
+
+    def instruction(self, category, event=None, exit=None):
+        if self.function is None:
+            self.begin('')
+        block = self.function.blocks[-1]
+        if block.exit:
+            # Named after the label it follows, in the report
+            block = Block(block.label)
+            self.function.blocks.append(block)
+        block.length += 1
+        self.function.counts[category] += 1
+        if event:
+            block.events.append(event)
+        block.exit = exit
+
+    def most_syscalls(self, name, memo):
+        """System calls a call of function name can make, counting each one it can reach once."""
+        if name not in memo:
+            memo[name] = Counter()     # Recursion adds nothing more
+            function = self.functions.get(name)
+            if function is None:
+                memo[name] = Counter(LIBC_SYSCALLS.get(name, ()))
+            else:
+                memo[name] = self.event_syscalls((event for block in function.blocks for event in block.events),
+                                                 self.most_syscalls, memo)
+        return memo[name]
+
+    def least_syscalls(self, name, memo):
+        """System calls every call of function name makes: those before its first conditional branch.
+
+        libc functions buffer and allocate as they see fit, so they are
+        never counted on to make one.
+        """
+        if name not in memo:
+            memo[name] = Counter()
+            function = self.functions.get(name)
+            if function is not None:
+                memo[name] = self.event_syscalls(self.entry_path(function), self.least_syscalls, memo)
+        return memo[name]
+
+    def entry_path(self, function):
+        """The events of the blocks run on every call, following jumps and fall-through."""
+        index = 0
+        seen = set()
+        while index is not None and index not in seen:
+            seen.add(index)
+            block = function.blocks[index]
+            yield from block.events
+            if block.exit is None:
+                index = index + 1 if index + 1 < len(function.blocks) else None
+            elif block.exit[0] == 'jump':
+                index = function.labels.get(block.exit[1])
+            else:
+                index = None
+
+    def event_syscalls(self, events, callee_syscalls, memo):
+        total = Counter()
+        for kind, target in events:
+            if kind == 'syscall':
+                total[target] += 1
+            else:
+                total.update(callee_syscalls(target, memo))
+        return total
+
+    def report(self, program_function, hollas):
+        """The cost report of the code, with program_function the one running the program's statements."""
+        program = self.functions.get(program_function) or Function(program_function)
+        runtime = Counter()
+        for function in self.functions.values():
+            if function is not program:
+                runtime.update(function.counts)
+
+        helper_calls = Counter(target for block in program.blocks for kind, target in block.events
+                               if kind == 'call')
+        least = self.least_syscalls(program.name, {})
+        most = self.most_syscalls(program.name, {})
+        longest = max(((block.length, function.name, block.label) for function in self.functions.values()
+                       for block in function.blocks), key=lambda block: block[0], default=(0, None, None))
+        per_holla = max(1, hollas)
+        return {
+            'hollas': hollas,
+            'instructions': {'program': category_counts(program.counts), 'runtime': category_counts(runtime)},
+            'helper_calls': dict(sorted(helper_calls.items())),
+            'syscalls_per_holla': {name: {'min': round(least[name] / per_holla, 3),
+                                          'max': round(most[name] / per_holla, 3)}
+                                   for name in REPORTED_SYSCALLS},
+            'data_bytes': dict(self.data),
+            'longest_block': {'instructions': longest[0], 'function': longest[1], 'label': longest[2]},
+        }
+
+def category_counts(counts):
+    result = {'total': sum(counts.values())}
+    result.update((category, counts[category]) for category in CATEGORIES)
+    return result
+
+def string_bytes(body):
+    """Bytes an assembler string literal's body stands for, escapes taken as one byte."""
+    return len(re.sub(r'\\(?:[0-7]{1,3}|x[0-9a-fA-F]+|.)', 'x', body).encode('utf-8'))
+
+def assembly_section(directive, operands):
+    """The section a .text, .data, .bss or .section directive switches to."""
+    name = (operands.split(',')[0].strip() if directive == '.section' else directive).lstrip('.')
+    for section in ('text',) + DATA_SECTIONS:
+        if name == section or name.startswith(section + '.'):
+            return section
+    return None
+
+def parse_assembly(lines, arch):
+    """A Listing of ARM64 or x86-64 (AT&T syntax) assembly.
+
+    Functions are the labels named by .type directives, called or global.
+    """
+    lines = list(lines)
+    functions = set()
+    for line in lines:
+        match = re.match(r'\s*(?:\.type\s+([\w.$]+)|\.globa?l\s+([\w.$]+)|(?:bl|call)\s+([\w.$]+)\s*(?:$|//|#))', line)
+        if match:
+            functions.add(next(name for name in match.groups() if name))
+
+    classify = classify_arm64 if arch == 'arm64' else classify_x86
+    comment = '//' if arch == 'arm64' else '#'
+    listing = Listing(arch)
+    section = 'text'
+    offsets = dict.fromkeys(DATA_SECTIONS, 0)
+    number = None           # System call number last loaded in this block
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+        label = re.match(r'([\w.$]+):$', text)
+        if label:
+            if section == 'text' and label.group(1) in functions:
+                listing.begin(label.group(1))
+            elif section == 'text':
+                listing.label(label.group(1))
+            number = None
+            continue
+        if text.startswith('.'):
+            directive, _, operands = text.partition(' ')
+            operands = operands.strip()
+            if directive in ('.text', '.data', '.bss', '.section'):
+                section = assembly_section(directive, operands)
+            elif section in offsets:
+                offsets[section] = data_directive(directive, operands, offsets[section])
+            continue
+        if section != 'text':
+            continue
+        text = text.split(comment)[0].strip()
+        if not text:
+            continue
+        mnemonic, _, operands = text.partition(' ')
+        operands = [operand.strip() for operand in re.split(r',(?![^(\[]*[)\]])', operands) if operand.strip()]
+        loaded = syscall_number(arch, mnemonic, operands)
+        if loaded is not None:
+            number = loaded
+        category, event, exit = classify(mnemonic, operands, functions, listing.function)
+        if category == 'syscall':
+            event = ('syscall', SYSCALL_NAMES[arch].get(number))
+        listing.instruction(category, event, exit)
+    listing.data.update(offsets)
+    return listing
+
+def data_directive(directive, operands, offset):
+    """Offset in a data section after a directive."""
+    if directive == '.balign':
+        alignment = int(operands.split(',')[0])
+        return -(-offset // alignment) * alignment
+    if directive in ('.skip', '.space', '.zero'):
+        return offset + int(operands.split(',')[0])
+    if directive in ('.string', '.asciz', '.ascii'):
+        size = string_bytes(operands[1:-1])
+        return offset + size + (directive != '.ascii')
+    if directive in DATA_DIRECTIVES:
+        return offset + DATA_DIRECTIVES[directive] * len(operands.split(','))
+    return offset
+
+def syscall_number(arch, mnemonic, operands):
+    """The number a mov into the system call number register loads, if it is one."""
+    if mnemonic != 'mov' or len(operands) != 2:
+        return None
+    if arch == 'arm64' and operands[0] in ('x8', 'w8') and operands[1].startswith('#'):
+        return int(operands[1][1:], 0)
+    if arch == 'x86_64' and operands[1] in ('%eax', '%rax') and operands[0].startswith('$'):
+        return int(operands[0][1:], 0)
+    return None
+
+def transfer(target, functions, function):
+    """The call event and exit of an unconditional branch to target: a jump, or a tail call."""
+    if target in functions and function is not None and target != function.name:
+        return ('call', target), ('return',)
+    return None, ('jump', target)
+
+def classify_arm64(mnemonic, operands, functions, function):
+    """(category, event, exit) of an ARM64 instruction."""
+    category = ARM64_CATEGORIES.get(mnemonic)
+    if mnemonic.startswith('b.') or mnemonic in ('cbz', 'cbnz', 'tbz', 'tbnz'):
+        return 'branch', None, ('branch',)
+    if mnemonic == 'b':
+        return ('branch',) + transfer(operands[0], functions, function)
+    if mnemonic in ('ret', 'br'):
+        return 'branch', None, ('return',)
+    if mnemonic == 'bl':
+        return 'call', ('call', operands[0]), None
+    if category:
+        return category, None, None
+    if mnemonic in ARM64_ARITHMETIC:
+        return 'arithmetic', None, None
+    if mnemonic.startswith('ld'):
+        return 'load', None, None
+    if mnemonic.startswith('st'):
+        return 'store', None, None
+    return 'other', None, None
+
+def classify_x86(mnemonic, operands, functions, function):
+    """(category, event, exit) of an x86-64 instruction in AT&T syntax."""
+    if mnemonic == 'jmp':
+        return ('branch',) + transfer(operands[0], functions, function)
+    if mnemonic.startswith('j'):
+        return 'branch', None, ('branch',)
+    if mnemonic == 'ret':
+        return 'branch', None, ('return',)
+    if mnemonic == 'call':
+        return 'call', ('call', operands[0]), None
+    if mnemonic in X86_CATEGORIES:
+        return X86_CATEGORIES[mnemonic], None, None
+    if mnemonic.startswith(('mov', 'cmov')):
+        # AT&T order: source first, and memory operands have parentheses
+        if '(' in operands[0]:
+            return 'load', None, None
+        if '(' in operands[-1] or not operands[-1].startswith('%'):
+            return 'store', None, None
+        return 'move', None, None
+    # Operand size suffixes: shlq is shl
+    base = mnemonic[:-1] if mnemonic not in X86_ARITHMETIC and mnemonic[-1:] in 'bwlq' else mnemonic
+    if base in X86_CATEGORIES:
+        return X86_CATEGORIES[base], None, None
+    if base in X86_ARITHMETIC or mnemonic.startswith('set'):
+        return 'arithmetic', None, None
+    return 'other', None, None
+
+def llvm_type_size(text, types):
+    """(size, alignment, rest) of the LLVM type at the start of text."""
+    text = text.lstrip()
+    if text.startswith('['):
+        count, rest = text[1:].split(' x ', 1)
+        size, alignment, rest = llvm_type_size(rest, types)
+        return int(count) * size, alignment, rest.lstrip()[1:]
+    if text.startswith('{'):
+        size, alignment, rest = 0, 1, text[1:]
+        while not rest.lstrip().startswith('}'):
+            field, field_alignment, rest = llvm_type_size(rest, types)
+            size = -(-size // field_alignment) * field_alignment + field
+            alignment = max(alignment, field_alignment)
+            rest = rest.lstrip().lstrip(',')
+        return -(-size // alignment) * alignment, alignment, rest.lstrip()[1:]
+    match = re.match(r'(ptr|i\d+|%[\w.]+)(\**)', text)
+    name, pointers = match.groups()
+    if pointers or name == 'ptr':
+        return 8, 8, text[match.end():]
+    if name.startswith('%'):
+        size, alignment = types[name]
+    else:
+        size = alignment = max(1, int(name[1:]) // 8)
+    return size, alignment, text[match.end():]
+
+def parse_llvm(lines):
+    """A Listing of an LLVM module: the functions it defines and its global variables."""
+    listing = None
+    types = {}
+    for line in lines:
+        text = line.strip()
+        if text.startswith('target triple'):
+            arch = text.split('"')[1].split('-')[0]
+            listing = Listing('arm64' if arch == 'aarch64' else arch)
+        elif re.match(r'%[\w.]+ = type ', text):
+            name, _, body = text.partition(' = type ')
+            size, alignment, _ = llvm_type_size(body, types)
+            types[name] = (size, alignment)
+        elif text.startswith('define '):
+            listing.begin(re.search(r'@([\w.$]+)\(', text).group(1))
+        elif text == '}':
+            listing.function = None
+        elif text.startswith('@'):
+            llvm_global(listing, text, types)
+        elif listing is not None and listing.function is not None:
+            llvm_line(listing, text)
+    return listing
+
+def llvm_global(listing, text, types):
+    match = re.match(r'@[\w.$"]+ = ([\w ]*?)\b(global|constant) (.*)$', text)
+    if not match or 'external' in match.group(1).split():
+        return
+    size, _, initializer = llvm_type_size(match.group(3), types)
+    if match.group(2) == 'constant':
+        section = 'rodata'
+    elif re.match(r'\s*(zeroinitializer|0|null|false)\b', initializer):
+        section = 'bss'
+    else:
+        section = 'data'
+    listing.data[section] += size
+
+def llvm_line(listing, text):
+    label = re.match(r'([\w.$]+):$', text)
+    if label:
+        listing.label(label.group(1))
+        return
+    opcode = re.match(r'(?:%[\w.$]+ = )?(\w+)', text).group(1)
+    category = LLVM_CATEGORIES.get(opcode, 'other')
+    event = exit = None
+    if opcode == 'call':
+        syscall = re.search(r'asm sideeffect .*?\(i64 (\d+)', text)
+        if syscall:
+            category = 'syscall'
+            event = ('syscall', SYSCALL_NAMES[listing.arch].get(int(syscall.group(1))))
+        else:
+            event = ('call', re.search(r'@([\w.$]+)\(', text).group(1))
+    elif opcode == 'br':
+        jump = re.match(r'br label %([\w.$]+)', text)
+        exit = ('jump', jump.group(1)) if jump else ('branch',)
+    elif opcode in ('ret', 'unreachable'):
+        exit = ('return',)
+    listing.instruction(category, event, exit)
+
+def generate_code(ast, program, backend, options):
+    """The assembly or LLVM IR a backend generates for a program, as vibe compile would build it."""
+    opt_level = options.get('opt_level', 0)
+    freestanding = options.get('freestanding', False)
+    if backend == 'simple':
+        from .simple_compiler import ARMCodeGenerator
+        generator = ARMCodeGenerator(opt_level)
+        generate = generator.generate_ir
+    elif backend == 'native':
+        from .compiler import CodeGenerator
+        generator = CodeGenerator(opt_level, freestanding=freestanding)
+        generate = generator.compile_ir
+    elif backend == 'x86_64':
+        from .x86_compiler import X86CodeGenerator
+        generator = X86CodeGenerator()
+        generate = generator.generate_ir
+    else:
+        from .llvm_compiler import LLVMCompiler
+        generator = LLVMCompiler(options.get('target'), freestanding=freestanding)
+        generate = generator.compile_ir
+    precomputed = None
+    if options.get('precompute'):
+        # Its progress message goes to stderr, keeping stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            precomputed = precompute_output(ast, options['precompute'])
+    if precomputed is not None:
+        return generator.generate_precomputed(precomputed)
+    return generate(program)
+
+def cost_report(source, backend, options):
+    """Static cost report of the code source compiles to, as a dict ready for JSON.
+
+    Nothing is assembled or run. Instructions are counted by category in
+    the program's own code and in the runtime helpers; helper calls are
+    the call sites in the program's code. The system calls per holla are
+    a range: min counts those the program's code makes on every run
+    before any conditional branch, max every site it can reach, once
+    each, so buffered output and allocation show as 0 to 1. LLVM IR is
+    reported as generated, before opt and llc.
+    """
+    ast = Parser(Lexer(source).tokenize()).parse()
+    program = lower(ast)
+    code = generate_code(ast, program, backend, options).splitlines()
+    if backend == 'llvm':
+        listing = parse_llvm(code)
+        entry = 'main'
+    else:
+        listing = parse_assembly(code, 'x86_64' if backend == 'x86_64' else 'arm64')
+        entry = '_start'
+    report = {'backend': backend, 'opt_level': options.get('opt_level', 0)}
+    report.update(listing.report(entry, sum(1 for op in program.ops if op == PRINT)))
+    return report
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.cost_model <input_file> [simple|native|llvm|x86_64] [-O<level>] [--freestanding]")
+        sys.exit(1)
+
+    backend = 'simple'
+    options = {}
+    for arg in sys.argv[2:]:
+        if arg == '--freestanding':
+            options['freestanding'] = True
+        elif arg.startswith('-O'):
+            options['opt_level'] = int(arg[2:] or 1)
+        else:
+            backend = arg
+    with open(sys.argv[1], 'r') as f:
+        print(json.dumps(cost_report(f.read(), backend, options), indent=2))
+
+if __name__ == "__main__":
+    main()
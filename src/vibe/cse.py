@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/cse.py
+
+import sys
+from .tokenizer import Token, Lexer
+from .parser import Parser, BinOp, Num, String, Var, Assign, HollaStmt
+from .type_inference import node_line
+
+# Names of the variables holding reused values; identifiers cannot start with '.'
+HIDDEN_PREFIX = '.cse'
+
+# Value numbers of additions are keyed by their operands' numbers packed into one
+# int, which unlike a tuple is not tracked by the garbage collector
+NUMBER_BITS = 32
+
+class CommonSubexpressions:
+    """Evaluates additions repeated across statements once, for every engine.
+
+    Expressions have no side effects, so an addition repeated with the same
+    operands has the same value as long as no variable it reads has been
+    reassigned. Every expression gets a value number from the numbers of
+    its operands; a variable's number is the number of the value last
+    assigned to it, so reassigning a variable invalidates every expression
+    that read it.
+
+    A repeated addition is replaced by a variable: one the program assigned
+    the value to and has not reassigned since, or else a hidden variable
+    assigned where the addition is first evaluated, in a statement inserted
+    before the one it is in. Only the statements that change are rebuilt;
+    the rest are shared with the original program, which is left as it was.
+    """
+    def __init__(self):
+        self.count = 0
+        self.additions = {}         # packed operand numbers -> value number
+        self.nums = {}              # number literal -> value number
+        self.strings = {}           # string literal -> value number
+        self.var_numbers = {}       # variable -> value number of its value
+        self.holders = {}           # value number -> a variable holding it
+        self.first = {}             # value number -> addition first evaluating it
+        self.first_index = {}       # value number -> index of that addition's statement
+        self.replaced = {}          # id of an addition -> variable to read instead
+        self.hoisted = {}           # id of an addition -> hidden variable to assign it to
+        self.changed = set()        # indexes of the statements to rebuild
+        self.reused = 0
+        self.saved = 0
+
+    def eliminate(self, ast):
+        """The program with repeated additions replaced by variables."""
+        if not isinstance(ast, list):
+            return ast
+        for index, statement in enumerate(ast):
+            self.analyze_statement(index, statement)
+        if not self.changed:
+            return ast
+        statements = []
+        for index, statement in enumerate(ast):
+            if index in self.changed:
+                statements.extend(self.rewrite_statement(statement))
+            else:
+                statements.append(statement)
+        return statements
+
+    def new_number(self):
+        self.count += 1
+        return self.count
+
+    def operand_number(self, node):
+        """Value number of an operand that is not an addition of the chain."""
+        node_type = type(node)
+        if node_type is Var:
+            number = self.var_numbers.get(node.value)
+            if number is None:
+                # Not assigned yet, which every engine reports when it is read
+                number = self.var_numbers[node.value] = self.new_number()
+            return number
+        if node_type is String:
+            table = self.strings
+        elif node_type is Num:
+            table = self.nums
+        else:
+            # Nested expressions the parser never builds, such as a + (b + c), are left alone
+            return self.new_number()
+        number = table.get(node.value)
+        if number is None:
+            number = table[node.value] = self.new_number()
+        return number
+
+    def analyze_statement(self, index, node):
+        if isinstance(node, Assign):
+            number = self.analyze_expression(index, node.right)
+            # The statement's own reads saw the old value, so reassign only now
+            var_name = node.left.value
+            previous = self.var_numbers.get(var_name)
+            if self.holders.get(previous) == var_name:
+                del self.holders[previous]
+            self.var_numbers[var_name] = number
+            # The first holder is kept; a value can be held by more than one variable
+            self.holders.setdefault(number, var_name)
+        elif isinstance(node, HollaStmt):
+            self.analyze_expression(index, node.expr)
+
+    def analyze_expression(self, index, node):
+        """Value number of an expression, deciding which of its additions are reused."""
+        # Additions nest to the left, a + b + c being (a + b) + c, so walk the chain
+        chain = []
+        while type(node) is BinOp and node.op.type == 'PLUS':
+            chain.append(node)
+            node = node.left
+        if not chain:
+            return self.operand_number(node)
+        numbers = [0] * len(chain)
+        number = self.operand_number(node)
+        for depth in range(len(chain) - 1, -1, -1):
+            key = number << NUMBER_BITS | self.operand_number(chain[depth].right)
+            number = self.additions.get(key)
+            if number is None:
+                number = self.additions[key] = self.new_number()
+            numbers[depth] = number
+
+        # The outermost addition with a value still available replaces the rest of the chain
+        for depth, addition in enumerate(chain):
+            number = numbers[depth]
+            name = self.holders.get(number)
+            if name is None and number in self.first:
+                # Computed before but no longer held: keep it from where it was computed
+                name = self.holders[number] = f"{HIDDEN_PREFIX}{len(self.hoisted)}"
+                self.hoisted[id(self.first[number])] = name
+                self.changed.add(self.first_index[number])
+            if name is not None:
+                self.replaced[id(addition)] = name
+                self.changed.add(index)
+                self.reused += 1
+                self.saved += len(chain) - depth
+                break
+            self.first[number] = addition
+            self.first_index[number] = index
+        return numbers[0]
+
+    def rewrite_statement(self, node):
+        """The statements replacing one: its hoisted additions, then itself."""
+        hoisted = []
+        if isinstance(node, Assign):
+            node = Assign(node.left, self.rewrite(node.right, hoisted))
+        elif isinstance(node, HollaStmt):
+            node = HollaStmt(self.rewrite(node.expr, hoisted))
+        hoisted.append(node)
+        return hoisted
+
+    def rewrite(self, node, hoisted):
+        """Copy of an expression reading the variables chosen for its additions."""
+        chain = []
+        while type(node) is BinOp and node.op.type == 'PLUS':
+            chain.append(node)
+            if id(node) in self.replaced:
+                break
+            node = node.left
+        result = node
+        if chain and id(chain[-1]) in self.replaced:
+            result = read_var(self.replaced[id(chain[-1])], chain.pop())
+        for addition in reversed(chain):
+            expression = addition
+            if result is not addition.left:
+                expression = BinOp(result, addition.op, addition.right)
+            name = self.hoisted.get(id(addition))
+            if name is None:
+                result = expression
+            else:
+                hoisted.append(Assign(read_var(name, addition), expression))
+                result = read_var(name, addition)
+        return result
+
+    def report(self):
+        return (f"{self.reused} repeated expressions reused, {self.saved} evaluations saved, "
+                f"{len(self.hoisted)} hidden variables")
+
+def read_var(name, node):
+    """A read of variable name standing in for node, on node's line."""
+    return Var(Token('IDENTIFIER', name, node_line(node)))
+
+def eliminate_common_subexpressions(ast):
+    """A parsed program with repeated additions evaluated once."""
+    return CommonSubexpressions().eliminate(ast)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.cse <input_file> [<input_file> ...]")
+        sys.exit(1)
+
+    for input_filename in sys.argv[1:]:
+        with open(input_filename, 'r') as f:
+            source = f.read()
+        cse = CommonSubexpressions()
+        cse.eliminate(Parser(Lexer(source).tokenize()).parse())
+        print(f"{input_filename}: {cse.report()}")
+
+if __name__ == "__main__":
+    main()
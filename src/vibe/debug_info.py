@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/debug_info.py
+
+import os
+
+# File number the .loc directives refer to; programs are a single source file
+SOURCE_FILE_NUMBER = 1
+
+def file_directive(source_file):
+    """The .file directive naming the source file, by absolute path so tools can find it."""
+    path = os.path.abspath(source_file).replace('\\', '\\\\').replace('"', '\\"')
+    return f'    .file {SOURCE_FILE_NUMBER} "{path}"'
+
+def loc_directive(line):
+    """The .loc directive attributing the code that follows to a source line."""
+    return f"    .loc {SOURCE_FILE_NUMBER} {line}"
+
+def annotate_functions(lines, functions):
+    """Copy of assembly lines with .type and .size for each function label in functions.
+
+    A function runs until the label of the next one. The last function is
+    left open, since the program's code follows it; close it with
+    end_function once that code is written.
+    """
+    result = []
+    current = None
+    for line in lines:
+        label = line[:-1] if line.endswith(':') else None
+        if label in functions:
+            if current:
+                result.append(end_function(current))
+            result.append(f"    .type {label}, %function")
+            current = label
+        result.append(line)
+    return result
+
+def end_function(name):
+    """The .size directive closing a function annotated by annotate_functions."""
+    return f"    .size {name}, .-{name}"
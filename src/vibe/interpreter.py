@@ -1,12 +1,22 @@
 class Interpreter:
-    def __init__(self):
+    def __init__(self, cse=False):
         self.variables = {}
+        # Evaluate additions repeated across statements once; the pass costs
+        # more than it saves unless the strings being added are long
+        self.cse = cse
     
     def visit_BinOp(self, node):
-        if node.op.type == 'PLUS':
-            return self.visit(node.left) + self.visit(node.right)
-        else:
-            raise Exception(f"Unknown operator: {node.op.type}")
+        # A chain of + nests down the left; walk it with a loop so long ones don't recurse
+        operands = []
+        while type(node).__name__ == 'BinOp':
+            if node.op.type != 'PLUS':
+                raise Exception(f"Unknown operator: {node.op.type}")
+            operands.append(node.right)
+            node = node.left
+        result = self.visit(node)
+        for operand in reversed(operands):
+            result = result + self.visit(operand)
+        return result
     
     def visit_Num(self, node):
         return node.value
@@ -41,6 +51,9 @@ class Interpreter:
     def interpret(self, tree):
         if isinstance(tree, list):  # Handle multiple statements
             result = None
+            if self.cse:
+                from .cse import eliminate_common_subexpressions
+                tree = eliminate_common_subexpressions(tree)
             for statement in tree:
                 result = self.visit(statement)
             return result
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/ir.py
+
+import sys
+from array import array
+from itertools import compress
+from .tokenizer import Lexer
+from .parser import Parser, BinOp, Num, String, Var, Assign, HollaStmt
+from .type_inference import infer_types, node_line, NUM, STR, WORD_MASK
+from .cse import CommonSubexpressions
+
+# Opcodes. An instruction is (op, dest, arg1, arg2):
+#   CONST      t, value       t = a number
+#   STRING     t, literal     t = a literal from the program's literal table
+#   LOAD       t, slot        t = a variable slot
+#   STORE      -, slot, x     variable slot = x
+#   ADD        t, x, y        t = x + y on numbers
+#   CONCAT     t, x, y        t = x + y on strings
+#   TO_STRING  t, x           t = decimal string of number x
+#   PRINT      -, x           print string x and a newline
+#   JOIN       t, first, n    t = the n strings pieces[first:first + n], concatenated
+CONST, STRING, LOAD, STORE, ADD, CONCAT, TO_STRING, PRINT, JOIN = range(9)
+OPCODE_NAMES = ['CONST', 'STRING', 'LOAD', 'STORE', 'ADD', 'CONCAT', 'TO_STRING', 'PRINT', 'JOIN']
+
+# A chain of concatenations a + b + c + ... is one JOIN once it has this many pieces, so
+# the result is allocated once and each piece copied once instead of once per +
+JOIN_PIECES = 3
+
+# A temporary marked owned (shown as t! in dumps) holds the last reference to a string
+# the runtime allocated: nothing reads that string after the instruction consuming it,
+# so the instruction may reuse its storage or release it.
+
+# Which of arg1 and arg2 are temporaries, for the instructions that read any
+OPERANDS = {STORE: (2,), ADD: (1, 2), CONCAT: (1, 2), TO_STRING: (1,), PRINT: (1,)}
+
+# Temporary and slot types, stored as one byte each
+TYPES = [NUM, STR]
+TYPE_CODES = {NUM: 0, STR: 1}
+
+NO_TEMP = -1
+
+def signed(value):
+    """The signed 64-bit number a CONST instruction's unsigned word holds."""
+    return value - (1 << 64) if value >> 63 else value
+
+class IRProgram:
+    """Three-address form of a typed program, shared by the code generators.
+
+    Instructions live in parallel arrays rather than one object each, and
+    refer to temporaries, variable slots and literals by number. Every
+    temporary is defined once, by one statement, and used once, by the
+    same statement; a statement's instructions are in evaluation order, so
+    its temporaries are consumed last-defined-first and a backend can keep
+    them on a stack. A variable gets one slot per type it is assigned, as
+    a variable can change type when it is reassigned.
+    """
+    def __init__(self):
+        self.ops = array('B')
+        self.dests = array('l')
+        self.arg1 = array('Q')
+        self.arg2 = array('Q')
+        self.lines = array('l')         # source line of each instruction
+        self.temp_types = array('B')
+        self.owned = bytearray()        # temp -> 1 if its consumer owns its string
+        self.pieces = array('l')        # the temporaries each JOIN reads, one list after another
+        self.slots = []                 # slot -> (variable name, type)
+        self.slot_numbers = {}
+        self.literals = []              # literal number -> string value
+        self.literal_numbers = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def emit(self, op, dest=NO_TEMP, arg1=0, arg2=0, line=0):
+        self.ops.append(op)
+        self.dests.append(dest)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.lines.append(line)
+        return dest
+
+    def new_temp(self, value_type):
+        self.temp_types.append(TYPE_CODES[value_type])
+        self.owned.append(0)
+        return len(self.temp_types) - 1
+
+    def keep(self, live):
+        """Drop the instructions whose entry in live is 0, in place."""
+        for column in (self.ops, self.dests, self.arg1, self.arg2, self.lines):
+            column[:] = array(column.typecode, compress(column, live))
+
+    def temp_type(self, temp):
+        return TYPES[self.temp_types[temp]]
+
+    def join_pieces(self, first, count):
+        """The temporaries a JOIN concatenates, in order."""
+        return self.pieces[first:first + count]
+
+    def slot(self, name, value_type):
+        key = (name, value_type)
+        if key not in self.slot_numbers:
+            self.slot_numbers[key] = len(self.slots)
+            self.slots.append(key)
+        return self.slot_numbers[key]
+
+    def literal(self, value):
+        if value not in self.literal_numbers:
+            self.literal_numbers[value] = len(self.literals)
+            self.literals.append(value)
+        return self.literal_numbers[value]
+
+    def instructions(self):
+        """(op, dest, arg1, arg2) for every instruction, in order."""
+        return zip(self.ops, self.dests, self.arg1, self.arg2)
+
+    def located_instructions(self):
+        """(op, dest, arg1, arg2, source line) for every instruction, in order."""
+        return zip(self.ops, self.dests, self.arg1, self.arg2, self.lines)
+
+    def temp_name(self, temp):
+        return f"t{temp}!" if self.owned[temp] else f"t{temp}"
+
+    def format_instruction(self, op, dest, arg1, arg2):
+        name = OPCODE_NAMES[op].lower()
+        t = self.temp_name
+        if op == CONST:
+            return f"t{dest} = {name} {arg1}"
+        if op == STRING:
+            return f"t{dest} = {name} #{arg1} {self.literals[arg1]!r}"
+        if op == LOAD:
+            return f"t{dest} = {name} {self.slot_name(arg1)}"
+        if op == STORE:
+            return f"{name} {self.slot_name(arg1)}, {t(arg2)}"
+        if op in (ADD, CONCAT):
+            return f"t{dest} = {name} {t(arg1)}, {t(arg2)}"
+        if op == TO_STRING:
+            return f"t{dest} = {name} {t(arg1)}"
+        if op == JOIN:
+            return f"t{dest} = {name} {', '.join(map(t, self.join_pieces(arg1, arg2)))}"
+        return f"{name} {t(arg1)}"
+
+    def slot_name(self, slot):
+        name, value_type = self.slots[slot]
+        return f"{name}:{value_type}"
+
+    def dump(self):
+        """Readable listing of the program, for --dump-ir."""
+        lines = [f"; {len(self)} instructions, {len(self.temp_types)} temporaries, "
+                 f"{len(self.slots)} slots, {len(self.literals)} literals"]
+        for index, instruction in enumerate(self.instructions()):
+            lines.append(f"{index:6}  {self.format_instruction(*instruction):<40} ; line {self.lines[index]}")
+        return '\n'.join(lines)
+
+class Lowering:
+    """Translates a typed AST into an IRProgram."""
+    def __init__(self):
+        self.program = IRProgram()
+
+    def lower(self, ast):
+        program = self.program
+        for node in (ast if isinstance(ast, list) else [ast]):
+            # A statement is one source line, so its instructions share the line
+            if isinstance(node, Assign):
+                line = node.left.token.line
+                value = self.lower_expression(node.right, line)
+                slot = program.slot(node.left.value, node.right.value_type)
+                program.emit(STORE, NO_TEMP, slot, value, line)
+            elif isinstance(node, HollaStmt):
+                line = node_line(node.expr)
+                value = self.to_string(self.lower_expression(node.expr, line), line)
+                program.emit(PRINT, NO_TEMP, value, 0, line)
+            else:
+                raise Exception(f"Unsupported node type: {type(node).__name__}")
+        return program
+
+    def lower_expression(self, node, line):
+        program = self.program
+        node_type = type(node)
+        if node_type is Num:
+            return program.emit(CONST, program.new_temp(NUM), node.value & WORD_MASK, 0, line)
+        if node_type is String:
+            return program.emit(STRING, program.new_temp(STR), program.literal(node.value), 0, line)
+        if node_type is Var:
+            slot = program.slot(node.value, node.value_type)
+            return program.emit(LOAD, program.new_temp(node.value_type), slot, 0, line)
+        if node_type is BinOp:
+            if node.value_type == NUM:
+                left = self.lower_expression(node.left, line)
+                right = self.lower_expression(node.right, line)
+                return program.emit(ADD, program.new_temp(NUM), left, right, line)
+            # + is left associative, so a chain's pieces hang off its left spine
+            operands = []
+            while type(node) is BinOp and node.value_type == STR:
+                operands.append(node.right)
+                node = node.left
+            operands.append(node)
+            pieces = [self.to_string(self.lower_expression(operand, line), line)
+                      for operand in reversed(operands)]
+            if len(pieces) < JOIN_PIECES:
+                return program.emit(CONCAT, program.new_temp(STR), pieces[0], pieces[1], line)
+            first = len(program.pieces)
+            program.pieces.extend(pieces)
+            return program.emit(JOIN, program.new_temp(STR), first, len(pieces), line)
+        raise Exception(f"Unsupported expression node type: {node_type.__name__}")
+
+    def to_string(self, temp, line):
+        # Numbers the type inference pass could not fold are converted at run time
+        if self.program.temp_types[temp] == TYPE_CODES[STR]:
+            return temp
+        return self.program.emit(TO_STRING, self.program.new_temp(STR), temp, 0, line)
+
+def fold_constants(program):
+    """Propagate numbers stored in variables into later loads and fold additions of them.
+
+    Returns the number of instructions changed.
+    """
+    constants = {}      # slot -> number
+    values = {}         # temp -> number
+    changed = 0
+    ops, dests, arg1, arg2 = program.ops, program.dests, program.arg1, program.arg2
+    for index in range(len(program)):
+        op = ops[index]
+        if op == CONST:
+            values[dests[index]] = arg1[index]
+        elif op == LOAD and arg1[index] in constants:
+            ops[index] = CONST
+            arg1[index] = constants[arg1[index]]
+            values[dests[index]] = arg1[index]
+            changed += 1
+        elif op == ADD and arg1[index] in values and arg2[index] in values:
+            # The operands stay behind as dead instructions for remove_dead_code
+            ops[index] = CONST
+            arg1[index] = (values[arg1[index]] + values[arg2[index]]) & WORD_MASK
+            values[dests[index]] = arg1[index]
+            changed += 1
+        elif op == STORE:
+            if arg2[index] in values:
+                constants[arg1[index]] = values[arg2[index]]
+            else:
+                constants.pop(arg1[index], None)
+    return changed
+
+def remove_dead_code(program):
+    """Drop stores that are overwritten or never loaded, and every unused instruction.
+
+    Returns the number of instructions removed.
+    """
+    ops, dests, arg1, arg2 = program.ops, program.dests, program.arg1, program.arg2
+    live = bytearray(len(program))
+    used = bytearray(len(program.temp_types))
+    loaded = set()      # slots read before their next store, walking backwards
+    for index in range(len(program) - 1, -1, -1):
+        op = ops[index]
+        if op == STORE:
+            slot = arg1[index]
+            if slot not in loaded:
+                continue
+            loaded.discard(slot)
+            used[arg2[index]] = 1
+        elif op == PRINT:
+            used[arg1[index]] = 1
+        elif not used[dests[index]]:
+            continue
+        elif op == LOAD:
+            loaded.add(arg1[index])
+        elif op == TO_STRING:
+            used[arg1[index]] = 1
+        elif op == ADD or op == CONCAT:
+            used[arg1[index]] = 1
+            used[arg2[index]] = 1
+        elif op == JOIN:
+            for temp in program.join_pieces(arg1[index], arg2[index]):
+                used[temp] = 1
+        live[index] = 1
+
+    removed = len(program) - sum(live)
+    if removed:
+        program.keep(live)
+    return removed
+
+def mark_owned_strings(program):
+    """Mark the temporaries that read a runtime-allocated string for the last time.
+
+    Every CONCAT, JOIN and TO_STRING allocates a string, which variables
+    and temporaries can then share. The last CONCAT, JOIN or PRINT to read
+    it owns it: the string is not read again, through any variable, so its
+    storage can be reused for the result or released. A string read by
+    several operands of one instruction is owned by the first of them.
+    Returns the number of strings.
+    """
+    ops, dests, arg1, arg2 = program.ops, program.dests, program.arg1, program.arg2
+    strings = {}        # temp -> index of the instruction that allocated its string
+    held = {}           # slot -> the same, for the string a variable holds
+    last_reads = {}     # allocating instruction -> temp of the last read
+    for index in range(len(program)):
+        op = ops[index]
+        if op == LOAD:
+            if arg1[index] in held:
+                strings[dests[index]] = held[arg1[index]]
+        elif op == STORE:
+            if arg2[index] in strings:
+                held[arg1[index]] = strings.pop(arg2[index])
+            else:
+                held.pop(arg1[index], None)
+        elif op == PRINT:
+            if arg1[index] in strings:
+                last_reads[strings.pop(arg1[index])] = arg1[index]
+        elif op == CONCAT or op == JOIN or op == TO_STRING:
+            if op == CONCAT:
+                operands = (arg1[index], arg2[index])
+            elif op == JOIN:
+                operands = program.join_pieces(arg1[index], arg2[index])
+            else:
+                operands = ()
+            # The first operand last, so it wins when several read the same string
+            for temp in reversed(operands):
+                if temp in strings:
+                    last_reads[strings.pop(temp)] = temp
+            strings[dests[index]] = index
+    for temp in last_reads.values():
+        program.owned[temp] = 1
+    return len(last_reads)
+
+def optimize(program):
+    """The passes every backend's code benefits from, run once on the IR."""
+    fold_constants(program)
+    remove_dead_code(program)
+    mark_owned_strings(program)
+    return program
+
+def lower(ast, cse=None):
+    """Type a parsed program and lower it to optimized IR.
+
+    Repeated additions are evaluated once first, recording what that saved
+    in cse when a CommonSubexpressions is passed.
+    """
+    ast = (cse or CommonSubexpressions()).eliminate(ast)
+    infer_types(ast)
+    return optimize(Lowering().lower(ast))
+
+def dump_ir(input_filename):
+    """The optimized IR of a source file, as text."""
+    with open(input_filename, 'r') as f:
+        source = f.read()
+    cse = CommonSubexpressions()
+    program = lower(Parser(Lexer(source).tokenize()).parse(), cse)
+    return f"; {cse.report()}\n{program.dump()}"
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.ir <input_file> [<input_file> ...]")
+        sys.exit(1)
+
+    for input_filename in sys.argv[1:]:
+        print(f"; {input_filename}")
+        print(dump_ir(input_filename))
+
+if __name__ == "__main__":
+    main()
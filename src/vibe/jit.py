@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/jit.py
+
+import sys
+import os
+import mmap
+import ctypes
+import struct
+import platform
+from .tokenizer import Lexer
+from .parser import Parser
+from .runtime import ARENA_CHUNK_SIZE, OUTPUT_BUFFER_SIZE, LINE_BUFFERED_ENV
+from .runtime import DIGIT_PAIRS, POWERS_OF_TEN, DIVIDE_BY_100, NUMBER_MAX_LENGTH
+from .type_inference import NUM
+from .ir import lower, OPCODE_NAMES
+
+# x86-64 register numbers
+RAX, RCX, RDX, RBX, RSP, RBP, RSI, RDI = range(8)
+R8, R9, R10, R11, R12, R13, R14, R15 = range(8, 16)
+
+# Condition codes for jcc
+CC_E, CC_NE, CC_BE, CC_A, CC_LE = 0x4, 0x5, 0x6, 0x7, 0xE
+
+# Layout of the fixed part of the data area
+ARENA_PTR, ARENA_END, ARENA_CHUNK, OUT_LEN, LINE_BUFFERED, VARIABLES = 0, 8, 16, 24, 32, 40
+
+class X86Assembler:
+    """Encodes the handful of x86-64 instructions the JIT needs into bytes.
+
+    Memory operands are always [base + disp32]; data addresses are loaded
+    as 64-bit immediates since the data area is allocated before encoding.
+    """
+    def __init__(self):
+        self.code = bytearray()
+        self.labels = {}
+        self.fixups = []
+
+    def rex(self, w, reg, rm):
+        return 0x40 | (w << 3) | ((reg >> 3) << 2) | (rm >> 3)
+
+    def modrm_reg(self, reg, rm):
+        self.code.append(0xC0 | ((reg & 7) << 3) | (rm & 7))
+
+    def modrm_mem(self, reg, base, disp):
+        self.code.append(0x80 | ((reg & 7) << 3) | (base & 7))
+        if base & 7 == RSP:
+            self.code.append(0x24)  # SIB: base only
+        self.code += struct.pack('<i', disp)
+
+    def label(self, name):
+        self.labels[name] = len(self.code)
+
+    def rel32(self, name):
+        self.fixups.append((len(self.code), name))
+        self.code += b'\0\0\0\0'
+
+    def resolve(self):
+        for offset, name in self.fixups:
+            struct.pack_into('<i', self.code, offset, self.labels[name] - (offset + 4))
+        return bytes(self.code)
+
+    # Moves
+    def mov(self, dst, src):
+        self.code += bytes([self.rex(1, src, dst), 0x89])
+        self.modrm_reg(src, dst)
+
+    def load(self, dst, base, disp=0):
+        self.code += bytes([self.rex(1, dst, base), 0x8B])
+        self.modrm_mem(dst, base, disp)
+
+    def store(self, base, disp, src):
+        self.code += bytes([self.rex(1, src, base), 0x89])
+        self.modrm_mem(src, base, disp)
+
+    def load_byte(self, dst, base, disp=0):
+        self.code += bytes([self.rex(1, dst, base), 0x0F, 0xB6])
+        self.modrm_mem(dst, base, disp)
+
+    def store_byte(self, base, disp, src):
+        self.code += bytes([self.rex(0, src, base), 0x88])
+        self.modrm_mem(src, base, disp)
+
+    def load_word(self, dst, base, disp=0):
+        self.code += bytes([self.rex(1, dst, base), 0x0F, 0xB7])
+        self.modrm_mem(dst, base, disp)
+
+    def store_word(self, base, disp, src):
+        self.code += bytes([0x66, self.rex(0, src, base), 0x89])
+        self.modrm_mem(src, base, disp)
+
+    def lea(self, dst, base, disp):
+        self.code += bytes([self.rex(1, dst, base), 0x8D])
+        self.modrm_mem(dst, base, disp)
+
+    def movabs(self, reg, value):
+        self.code += bytes([self.rex(1, 0, reg), 0xB8 + (reg & 7)])
+        self.code += struct.pack('<Q', value & 0xFFFFFFFFFFFFFFFF)
+
+    def mov_imm(self, reg, value):
+        # 32-bit immediate, zero extended
+        if reg >= 8:
+            self.code.append(0x41)
+        self.code.append(0xB8 + (reg & 7))
+        self.code += struct.pack('<I', value)
+
+    # Arithmetic
+    def alu(self, opcode, dst, src):
+        self.code += bytes([self.rex(1, src, dst), opcode])
+        self.modrm_reg(src, dst)
+
+    def add(self, dst, src):
+        self.alu(0x01, dst, src)
+
+    def sub(self, dst, src):
+        self.alu(0x29, dst, src)
+
+    def cmp(self, dst, src):
+        self.alu(0x39, dst, src)
+
+    def test(self, dst, src):
+        self.alu(0x85, dst, src)
+
+    def alu_imm(self, extension, reg, value):
+        self.code += bytes([self.rex(1, 0, reg), 0x81])
+        self.modrm_reg(extension, reg)
+        self.code += struct.pack('<i', value)
+
+    def add_imm(self, reg, value):
+        self.alu_imm(0, reg, value)
+
+    def and_imm(self, reg, value):
+        self.alu_imm(4, reg, value)
+
+    def or_imm(self, reg, value):
+        self.alu_imm(1, reg, value)
+
+    def cmp_imm(self, reg, value):
+        self.alu_imm(7, reg, value)
+
+    def imul_imm(self, dst, src, value):
+        self.code += bytes([self.rex(1, dst, src), 0x69])
+        self.modrm_reg(dst, src)
+        self.code += struct.pack('<i', value)
+
+    def shl1(self, reg):
+        self.code += bytes([self.rex(1, 0, reg), 0xD1])
+        self.modrm_reg(4, reg)
+
+    def shift_imm(self, extension, reg, count):
+        self.code += bytes([self.rex(1, 0, reg), 0xC1])
+        self.modrm_reg(extension, reg)
+        self.code.append(count)
+
+    def shl_imm(self, reg, count):
+        self.shift_imm(4, reg, count)
+
+    def shr_imm(self, reg, count):
+        self.shift_imm(5, reg, count)
+
+    def unary(self, extension, reg):
+        self.code += bytes([self.rex(1, 0, reg), 0xF7])
+        self.modrm_reg(extension, reg)
+
+    def mul(self, reg):
+        # rdx:rax = rax * reg, unsigned
+        self.unary(4, reg)
+
+    def div(self, reg):
+        self.unary(6, reg)
+
+    def bsr(self, dst, src):
+        self.code += bytes([self.rex(1, dst, src), 0x0F, 0xBD])
+        self.modrm_reg(dst, src)
+
+    def cmovb(self, dst, src):
+        self.code += bytes([self.rex(1, dst, src), 0x0F, 0x42])
+        self.modrm_reg(dst, src)
+
+    # Stack and control flow
+    def push(self, reg):
+        if reg >= 8:
+            self.code.append(0x41)
+        self.code.append(0x50 + (reg & 7))
+
+    def pop(self, reg):
+        if reg >= 8:
+            self.code.append(0x41)
+        self.code.append(0x58 + (reg & 7))
+
+    def call(self, name):
+        self.code.append(0xE8)
+        self.rel32(name)
+
+    def jmp(self, name):
+        self.code.append(0xE9)
+        self.rel32(name)
+
+    def jcc(self, condition, name):
+        self.code += bytes([0x0F, 0x80 + condition])
+        self.rel32(name)
+
+    def ret(self):
+        self.code.append(0xC3)
+
+    def syscall(self):
+        self.code += b'\x0F\x05'
+
+    def rep_movsb(self):
+        self.code += b'\xF3\xA4'
+
+class JITCompiler:
+    """Lowers a program's IR straight to x86-64 machine code.
+
+    The generated code and runtime follow X86CodeGenerator: strings are a
+    pointer in rax with the length in rdx, results come from a bump arena,
+    and output is buffered and written to fd 1 when full or at the end.
+    """
+    def __init__(self):
+        self.asm = X86Assembler()
+        self.variables = {}
+        self.data = None
+        self.data_address = 0
+
+    def allocate_data(self, program):
+        # Variables and literals must be laid out before any code is encoded
+        for slot in range(len(program.slots)):
+            self.variables[slot] = VARIABLES + 16 * slot
+        self.string_literals = [value.encode('utf-8') for value in program.literals]
+        literal_offset = VARIABLES + 16 * len(self.variables)
+        self.literal_offsets = []
+        for literal in self.string_literals:
+            self.literal_offsets.append(literal_offset)
+            literal_offset += len(literal) + 1
+        # format_number's tables
+        self.powers_offset = (literal_offset + 7) & ~7
+        self.digit_pairs_offset = self.powers_offset + 8 * len(POWERS_OF_TEN)
+        self.out_buf_offset = (self.digit_pairs_offset + len(DIGIT_PAIRS) + 15) & ~15
+        size = self.out_buf_offset + OUTPUT_BUFFER_SIZE
+
+        self.data = mmap.mmap(-1, size, prot=mmap.PROT_READ | mmap.PROT_WRITE)
+        self.data_address = ctypes.addressof(ctypes.c_char.from_buffer(self.data))
+        struct.pack_into('<Q', self.data, ARENA_CHUNK, ARENA_CHUNK_SIZE)
+        line_buffered = os.environ.get(LINE_BUFFERED_ENV, '')
+        struct.pack_into('<Q', self.data, LINE_BUFFERED, 1 if line_buffered not in ('', '0') else 0)
+        for offset, literal in zip(self.literal_offsets, self.string_literals):
+            self.data[offset:offset + len(literal)] = literal
+        struct.pack_into(f'<{len(POWERS_OF_TEN)}Q', self.data, self.powers_offset, *POWERS_OF_TEN)
+        self.data[self.digit_pairs_offset:self.digit_pairs_offset + len(DIGIT_PAIRS)] = DIGIT_PAIRS.encode()
+
+    def data_pointer(self, reg, offset):
+        self.asm.movabs(reg, self.data_address + offset)
+
+    def compile(self, ast):
+        return self.compile_ir(lower(ast))
+
+    def compile_ir(self, program):
+        """Machine code for an IRProgram.
+
+        As in X86CodeGenerator, a statement's top temporary is in rax (and
+        rdx) and the ones below it are on the machine stack.
+        """
+        self.program = program
+        self.stack = []
+        self.allocate_data(program)
+
+        # Entry point, called from Python with the C calling convention
+        self.asm.push(RBX)
+        handlers = [getattr(self, f"generate_{name}") for name in OPCODE_NAMES]
+        for op, dest, arg1, arg2 in program.instructions():
+            handlers[op](dest, arg1, arg2)
+        self.asm.call('flush_stdout')
+        self.asm.pop(RBX)
+        self.asm.ret()
+
+        self.generate_runtime()
+        return self.asm.resolve()
+
+    def push(self, temp):
+        # Make room in rax and rdx for a new temporary
+        if self.stack:
+            self.asm.push(RAX)
+            if self.program.temp_type(self.stack[-1]) != NUM:
+                self.asm.push(RDX)
+        self.stack.append(temp)
+
+    def generate_CONST(self, dest, value, arg2):
+        self.push(dest)
+        self.asm.movabs(RAX, value)
+
+    def generate_STRING(self, dest, literal, arg2):
+        self.push(dest)
+        self.data_pointer(RAX, self.literal_offsets[literal])
+        self.asm.mov_imm(RDX, len(self.string_literals[literal]))
+
+    def generate_LOAD(self, dest, slot, arg2):
+        self.push(dest)
+        self.data_pointer(RCX, self.variables[slot])
+        self.asm.load(RAX, RCX, 0)
+        if self.program.slots[slot][1] != NUM:
+            self.asm.load(RDX, RCX, 8)
+
+    def generate_STORE(self, dest, slot, value):
+        self.stack.pop()
+        self.data_pointer(RCX, self.variables[slot])
+        self.asm.store(RCX, 0, RAX)
+        if self.program.slots[slot][1] != NUM:
+            self.asm.store(RCX, 8, RDX)
+
+    def generate_ADD(self, dest, left, right):
+        # Unboxed integer addition
+        del self.stack[-2:]
+        self.asm.pop(RDI)
+        self.asm.add(RAX, RDI)
+        self.stack.append(dest)
+
+    def generate_CONCAT(self, dest, left, right):
+        del self.stack[-2:]
+        self.asm.mov(RCX, RDX)
+        self.asm.mov(RDX, RAX)
+        self.asm.pop(RSI)
+        self.asm.pop(RDI)
+        self.asm.call('string_concat')
+        self.stack.append(dest)
+
+    def generate_TO_STRING(self, dest, value, arg2):
+        self.stack[-1] = dest
+        self.asm.mov(RDI, RAX)
+        self.asm.call('num_to_string')
+
+    def generate_PRINT(self, dest, value, arg2):
+        self.stack.pop()
+        self.asm.mov(RDI, RAX)
+        self.asm.mov(RSI, RDX)
+        self.asm.call('print_string')
+
+    def generate_JOIN(self, dest, first, count):
+        # The pieces are pushed (length, pointer) pairs once the last one joins them
+        del self.stack[-count:]
+        self.asm.push(RAX)
+        self.asm.push(RDX)
+        self.asm.mov(RDI, RSP)
+        self.asm.mov_imm(RSI, count)
+        self.asm.call('string_concat_n')
+        self.asm.add_imm(RSP, 16 * count)
+        self.stack.append(dest)
+
+    def generate_runtime(self):
+        a = self.asm
+
+        # arena_alloc: rdi = size -> rax = 16-byte aligned slice
+        a.label('arena_alloc')
+        a.add_imm(RDI, 15)
+        a.and_imm(RDI, -16)
+        self.data_pointer(R9, 0)
+        a.load(RAX, R9, ARENA_PTR)
+        a.lea(RDX, RAX, 0)
+        a.add(RDX, RDI)
+        a.load(RCX, R9, ARENA_END)
+        a.cmp(RDX, RCX)
+        a.jcc(CC_A, 'arena_grow')
+        a.store(R9, ARENA_PTR, RDX)
+        a.ret()
+        a.label('arena_grow')
+        a.load(RSI, R9, ARENA_CHUNK)
+        a.cmp(RSI, RDI)
+        a.cmovb(RSI, RDI)
+        a.load(RCX, R9, ARENA_CHUNK)
+        a.shl1(RCX)
+        a.store(R9, ARENA_CHUNK, RCX)
+        a.push(RDI)
+        a.push(RSI)
+        a.mov_imm(RAX, 9)           # mmap
+        a.mov_imm(RDI, 0)
+        a.mov_imm(RDX, 3)           # PROT_READ | PROT_WRITE
+        a.mov_imm(R10, 0x22)        # MAP_PRIVATE | MAP_ANONYMOUS
+        a.movabs(R8, -1)
+        a.mov_imm(R9, 0)
+        a.syscall()
+        a.pop(RSI)
+        a.pop(RDI)
+        self.data_pointer(R9, 0)
+        a.lea(RDX, RAX, 0)
+        a.add(RDX, RSI)
+        a.store(R9, ARENA_END, RDX)
+        a.lea(RDX, RAX, 0)
+        a.add(RDX, RDI)
+        a.store(R9, ARENA_PTR, RDX)
+        a.ret()
+
+        # format_number: rdi = unsigned number, rsi = buffer of 20 bytes -> rax = length;
+        # writes the digits from the end, two at a time from the pairs table
+        a.label('format_number')
+        a.mov(R8, RSI)
+        a.mov(RAX, RDI)
+        a.mov(RCX, RAX)
+        a.or_imm(RCX, 1)            # Same digit count; 0 has one digit too
+        a.bsr(RDX, RCX)
+        a.add_imm(RDX, 1)           # Bit length
+        a.imul_imm(RDX, RDX, 1233)  # log10(2) * 4096
+        a.shr_imm(RDX, 12)
+        self.data_pointer(R9, self.powers_offset)
+        a.mov(R10, RDX)
+        a.shl_imm(R10, 3)
+        a.add(R10, R9)
+        a.load(R10, R10, 0)
+        a.lea(R11, RDX, 1)
+        a.cmp(RCX, R10)
+        a.cmovb(R11, RDX)           # Digit count
+        a.add(R8, R11)              # The digits end here
+        a.mov(R11, R8)
+        self.data_pointer(R9, self.digit_pairs_offset)
+        a.movabs(R10, DIVIDE_BY_100)
+        a.label('format_number_pairs')
+        a.cmp_imm(RAX, 99)
+        a.jcc(CC_BE, 'format_number_last')
+        a.mov(RDI, RAX)
+        a.shr_imm(RAX, 2)
+        a.mul(R10)
+        a.mov(RAX, RDX)
+        a.shr_imm(RAX, 2)           # rax = rdi / 100
+        a.imul_imm(RDX, RAX, 100)
+        a.sub(RDI, RDX)             # rdi = rdi % 100
+        a.shl1(RDI)
+        a.add(RDI, R9)
+        a.load_word(RDX, RDI, 0)
+        a.add_imm(R8, -2)
+        a.store_word(R8, 0, RDX)
+        a.jmp('format_number_pairs')
+        a.label('format_number_last')
+        a.cmp_imm(RAX, 9)
+        a.jcc(CC_BE, 'format_number_digit')
+        a.shl1(RAX)
+        a.add(RAX, R9)
+        a.load_word(RDX, RAX, 0)
+        a.store_word(R8, -2, RDX)
+        a.jmp('format_number_done')
+        a.label('format_number_digit')
+        a.add_imm(RAX, ord('0'))
+        a.store_byte(R8, -1, RAX)
+        a.label('format_number_done')
+        a.mov(RAX, R11)
+        a.sub(RAX, RSI)
+        a.ret()
+
+        # num_to_string: rdi = number -> rax = string, rdx = length; formatted into an
+        # arena slice that is then cut down to what the digits use
+        a.label('num_to_string')
+        a.push(RDI)
+        a.mov_imm(RDI, NUMBER_MAX_LENGTH + 1)
+        a.call('arena_alloc')
+        a.pop(RDI)
+        a.mov(RSI, RAX)
+        a.call('format_number')
+        a.mov(RDX, RAX)
+        a.lea(RCX, RSI, 0)
+        a.add(RCX, RDX)
+        a.mov_imm(RAX, 0)
+        a.store_byte(RCX, 0, RAX)
+        a.add_imm(RCX, 16)
+        a.and_imm(RCX, -16)
+        self.data_pointer(R9, 0)
+        a.store(R9, ARENA_PTR, RCX)
+        a.mov(RAX, RSI)
+        a.ret()
+
+        # flush_stdout: write the whole output buffer to fd 1
+        a.label('flush_stdout')
+        self.data_pointer(RSI, self.out_buf_offset)
+        self.data_pointer(R9, 0)
+        a.load(RDX, R9, OUT_LEN)
+        a.label('flush_stdout_loop')
+        a.test(RDX, RDX)
+        a.jcc(CC_LE, 'flush_stdout_done')
+        a.mov_imm(RAX, 1)           # write
+        a.mov_imm(RDI, 1)           # stdout
+        a.syscall()
+        a.test(RAX, RAX)
+        a.jcc(CC_LE, 'flush_stdout_done')
+        a.add(RSI, RAX)
+        a.sub(RDX, RAX)
+        a.jmp('flush_stdout_loop')
+        a.label('flush_stdout_done')
+        a.mov_imm(RAX, 0)
+        self.data_pointer(R9, 0)
+        a.store(R9, OUT_LEN, RAX)
+        a.ret()
+
+        # print_string: rdi = string, rsi = length; buffers the string and a newline
+        a.label('print_string')
+        a.push(RBX)
+        a.push(R12)
+        a.mov(RBX, RDI)
+        a.mov(R12, RSI)
+        self.data_pointer(R9, 0)
+        a.load(RCX, R9, OUT_LEN)
+        a.add(RCX, R12)
+        a.add_imm(RCX, 1)
+        a.cmp_imm(RCX, OUTPUT_BUFFER_SIZE)
+        a.jcc(CC_BE, 'print_string_buffer')
+        a.call('flush_stdout')
+        a.lea(RCX, R12, 1)
+        a.cmp_imm(RCX, OUTPUT_BUFFER_SIZE)
+        a.jcc(CC_BE, 'print_string_buffer')
+        a.mov_imm(RAX, 1)           # too large: write directly
+        a.mov_imm(RDI, 1)
+        a.mov(RSI, RBX)
+        a.mov(RDX, R12)
+        a.syscall()
+        a.mov_imm(R12, 0)
+        a.label('print_string_buffer')
+        self.data_pointer(R9, 0)
+        self.data_pointer(RDI, self.out_buf_offset)
+        a.load(RAX, R9, OUT_LEN)
+        a.add(RDI, RAX)
+        a.mov(RSI, RBX)
+        a.mov(RCX, R12)
+        a.rep_movsb()
+        a.mov_imm(RAX, 10)          # newline
+        a.store_byte(RDI, 0, RAX)
+        a.add_imm(RDI, 1)
+        self.data_pointer(RAX, self.out_buf_offset)
+        a.sub(RDI, RAX)
+        a.store(R9, OUT_LEN, RDI)
+        a.load(RAX, R9, LINE_BUFFERED)
+        a.test(RAX, RAX)
+        a.jcc(CC_E, 'print_string_done')
+        a.call('flush_stdout')
+        a.label('print_string_done')
+        a.pop(R12)
+        a.pop(RBX)
+        a.ret()
+
+        # string_concat: (rdi, rsi) + (rdx, rcx) -> rax = string, rdx = length
+        a.label('string_concat')
+        a.push(RBX)
+        a.push(R12)
+        a.push(R13)
+        a.push(R14)
+        a.mov(RBX, RDI)
+        a.mov(R12, RSI)
+        a.mov(R13, RDX)
+        a.mov(R14, RCX)
+        a.lea(RDI, R12, 1)
+        a.add(RDI, R14)
+        a.call('arena_alloc')
+        a.mov(RDI, RAX)
+        a.mov(RSI, RBX)
+        a.mov(RCX, R12)
+        a.rep_movsb()
+        a.mov(RSI, R13)
+        a.mov(RCX, R14)
+        a.rep_movsb()
+        a.mov_imm(RDX, 0)
+        a.store_byte(RDI, 0, RDX)
+        a.lea(RDX, R12, 0)
+        a.add(RDX, R14)
+        a.pop(R14)
+        a.pop(R13)
+        a.pop(R12)
+        a.pop(RBX)
+        a.ret()
+
+        # string_concat_n: rdi = (length, pointer) pairs, the last string's first,
+        # rsi = how many -> rax = string, rdx = length; allocates and copies once
+        a.label('string_concat_n')
+        a.push(RBX)
+        a.push(R12)
+        a.push(R13)
+        a.mov(RBX, RDI)
+        a.mov(RCX, RDI)
+        a.mov_imm(R13, 0)
+        a.label('string_concat_n_measure')
+        a.load(RAX, RCX, 0)
+        a.add(R13, RAX)
+        a.add_imm(RCX, 16)
+        a.add_imm(RSI, -1)
+        a.test(RSI, RSI)
+        a.jcc(CC_NE, 'string_concat_n_measure')
+        a.mov(R12, RCX)             # End of the pairs; the first string's is below
+        a.lea(RDI, R13, 1)
+        a.call('arena_alloc')
+        a.mov(RDI, RAX)
+        a.label('string_concat_n_copy')
+        a.cmp(R12, RBX)
+        a.jcc(CC_BE, 'string_concat_n_done')
+        a.add_imm(R12, -16)
+        a.load(RCX, R12, 0)
+        a.load(RSI, R12, 8)
+        a.rep_movsb()
+        a.jmp('string_concat_n_copy')
+        a.label('string_concat_n_done')
+        a.mov_imm(RDX, 0)
+        a.store_byte(RDI, 0, RDX)
+        a.mov(RDX, R13)
+        a.pop(R13)
+        a.pop(R12)
+        a.pop(RBX)
+        a.ret()
+
+def load_code(code):
+    """Copy machine code into an executable mapping and return (mapping, function)."""
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.mprotect.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+    size = (len(code) + mmap.PAGESIZE - 1) & ~(mmap.PAGESIZE - 1)
+    region = mmap.mmap(-1, size, prot=mmap.PROT_READ | mmap.PROT_WRITE)
+    region.write(code)
+    address = ctypes.addressof(ctypes.c_char.from_buffer(region))
+    if libc.mprotect(address, size, mmap.PROT_READ | mmap.PROT_EXEC) != 0:
+        raise OSError(ctypes.get_errno(), "mprotect failed")
+    return region, ctypes.CFUNCTYPE(None)(address)
+
+def unsupported_host():
+    """Why this host cannot run the JIT's code, or None when it can."""
+    if platform.machine().lower() not in ('x86_64', 'amd64') or platform.system() != 'Linux':
+        return f"the JIT needs an x86-64 Linux host, this is {platform.machine()} {platform.system()}"
+    return None
+
+def run(source):
+    """Compile source to machine code in memory and run it."""
+    # The code uses Linux system calls and is mapped executable in this process
+    problem = unsupported_host()
+    if problem:
+        raise Exception(problem)
+
+    lexer = Lexer(source)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    ast = parser.parse()
+
+    compiler = JITCompiler()
+    code = compiler.compile(ast)
+    region, function = load_code(code)
+
+    # Anything Python has buffered must come out before the program's output
+    sys.stdout.flush()
+    function()
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.jit <input_file>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r') as f:
+        run(f.read())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/literal_pool.py
+
+import sys
+from .tokenizer import Lexer
+from .parser import Parser
+from .ir import lower, STRING
+
+class LiteralPool:
+    """String literals of a program, each stored once.
+
+    Every distinct value gets a single label. A value that is the tail of a
+    longer one (" World" in "Hello World") has no storage of its own and is
+    referenced as an offset into the longer value's, which ends in the same
+    NUL terminator. collect() gathers the literals of an IR program up
+    front so suffixes are known before any code referencing them is emitted.
+
+    With intern=False every use gets a label and a copy of its own, for
+    measuring what interning saves.
+    """
+    def __init__(self, label_format, intern=True):
+        self.label_format = label_format
+        self.intern = intern
+        self.values = {}        # value -> (label, offset) once placed
+        self.stored = {}        # label -> value, for literals with storage of their own
+        self.occurrences = 0
+        self.occurrence_bytes = 0
+        self.pending = []
+
+    def collect(self, program):
+        """Gather the literals every STRING instruction of an IRProgram uses, and lay the pool out."""
+        for op, value in zip(program.ops, program.arg1):
+            if op == STRING:
+                literal = program.literals[value]
+                self.occurrences += 1
+                self.occurrence_bytes += len(literal.encode('utf-8')) + 1
+                if literal not in self.values:
+                    self.values[literal] = None
+                    self.pending.append(literal)
+        if self.intern:
+            self.layout()
+
+    def layout(self):
+        """Store the longest strings and point their suffixes into them."""
+        # A string is a suffix of another exactly when, reversed, it is a prefix;
+        # in sorted order of the reversed bytes it is then a prefix of its successor
+        order = sorted(((value.encode('utf-8')[::-1], value) for value in self.pending), reverse=True)
+        host = None
+        for reversed_bytes, value in order:
+            if host is None or not host[0].startswith(reversed_bytes):
+                host = (reversed_bytes, self.new_label(value))
+                self.values[value] = (host[1], 0)
+            else:
+                self.values[value] = (host[1], len(host[0]) - len(reversed_bytes))
+        self.pending = []
+
+    def new_label(self, value):
+        label = self.label_format.format(len(self.stored))
+        self.stored[label] = value
+        return label
+
+    def reference(self, value):
+        """(label, byte offset) of a literal."""
+        if not self.intern:
+            return self.new_label(value), 0
+        if self.values.get(value) is None:
+            # Not seen by collect(): give it storage of its own
+            self.values[value] = (self.new_label(value), 0)
+        return self.values[value]
+
+    def symbol(self, value):
+        """Assembler expression for the address of a literal."""
+        label, offset = self.reference(value)
+        return f"{label}+{offset}" if offset else label
+
+    def stored_bytes(self):
+        return sum(len(value.encode('utf-8')) + 1 for value in self.stored.values())
+
+    def report(self):
+        distinct = len(self.values)
+        merged = distinct - len(self.stored) if self.intern else 0
+        return (f"{self.occurrences} string literal uses, {distinct} distinct values "
+                f"({merged} stored inside a longer one): {self.stored_bytes()} literal bytes, "
+                f"{self.occurrence_bytes} with one copy per use")
+
+def literal_report(source):
+    """Describe the literal pool a program compiles to."""
+    pool = LiteralPool('.LC{}')
+    pool.collect(lower(Parser(Lexer(source).tokenize()).parse()))
+    return pool.report()
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.literal_pool <input_file> [<input_file> ...]")
+        sys.exit(1)
+
+    for input_filename in sys.argv[1:]:
+        with open(input_filename, 'r') as f:
+            print(f"{input_filename}: {literal_report(f.read())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1145 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/llvm_compiler.py
+
+import sys
+import os
+import shutil
+import platform
+import subprocess
+from .tokenizer import Lexer
+from .parser import Parser
+from .runtime import ARENA_CHUNK_SIZE, OUTPUT_BUFFER_SIZE, LINE_BUFFERED_ENV
+from .runtime import DIGIT_PAIRS, POWERS_OF_TEN, DIVIDE_BY_100, NUMBER_MAX_LENGTH
+from .type_inference import NUM
+from .ir import lower, signed, OPCODE_NAMES, JOIN
+from .literal_pool import LiteralPool
+from .output_sink import OutputSink, FLUSH_LINES
+from .pipeline import BuildDirectory, run_pipeline
+from .precompute import precompute_output, DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS
+
+# Strings are passed around as a pointer plus a length, so nothing needs strlen
+STRING_TYPE = "%vibe.str"
+
+def llvm_string_constant(value):
+    """Return the escaped LLVM c"..." body and byte length (without the NUL) of value."""
+    data = value.encode('utf-8')
+    escaped = ''.join(chr(b) if 32 <= b < 127 and b not in (34, 92) else f"\\{b:02X}" for b in data)
+    return escaped + "\\00", len(data)
+
+# Data layouts for the targets we know; llc fills in others from the triple
+DATA_LAYOUTS = {
+    'aarch64': "e-m:e-i8:8:32-i16:16:32-i64:64-i128:128-n32:64-S128",
+    'x86_64': "e-m:e-p270:32:32-p271:32:32-p272:64:64-i64:64-f80:128-n8:16:32:64-S128",
+}
+
+def host_target_triple():
+    """Return the LLVM target triple of the machine we're running on."""
+    machine = platform.machine().lower()
+    arch = {'amd64': 'x86_64', 'arm64': 'aarch64'}.get(machine, machine)
+    if platform.system() == 'Darwin':
+        return f"{arch}-apple-darwin"
+    return f"{arch}-unknown-linux-gnu"
+
+# How --freestanding executables make system calls on each architecture: the instruction,
+# the register for the call number then the arguments, what the kernel clobbers, the call
+# numbers, and the _start that hands vibe_start the initial stack pointer
+FREESTANDING_TARGETS = {
+    'x86_64': {
+        'instruction': "syscall",
+        'registers': ['rax', 'rdi', 'rsi', 'rdx', 'r10', 'r8', 'r9'],
+        'result': 'rax',
+        'clobbers': ['rcx', 'r11'],
+        'numbers': {'write': 1, 'mmap': 9, 'exit': 60},
+        'start': ["xor %ebp, %ebp", "mov %rsp, %rdi", "call vibe_start"],
+    },
+    'aarch64': {
+        'instruction': "svc #0",
+        'registers': ['x8', 'x0', 'x1', 'x2', 'x3', 'x4', 'x5'],
+        'result': 'x0',
+        'clobbers': [],
+        'numbers': {'write': 64, 'mmap': 222, 'exit': 93},
+        'start': ["mov x29, #0", "mov x0, sp", "bl vibe_start"],
+    },
+}
+
+# Metadata numbers of the debug info every -g module has; source line locations follow
+DEBUG_CU, DEBUG_FILE, DEBUG_MAIN, DEBUG_MAIN_TYPE, DEBUG_NO_TYPES, DEBUG_DWARF, DEBUG_VERSION = range(7)
+
+def llvm_metadata_string(value):
+    """A metadata string literal, escaping what LLVM's parser would read differently."""
+    escaped = ''.join(c if 32 <= ord(c) < 127 and c not in '"\\' else ''.join(f"\\{b:02X}" for b in c.encode('utf-8'))
+                      for c in value)
+    return f'"{escaped}"'
+
+class LLVMCompiler:
+    def __init__(self, target=None, source_file=None, freestanding=False):
+        self.target = target or host_target_triple()
+        self.source_file = source_file      # set for -g: !dbg locations for its lines
+        self.freestanding = None            # syscall conventions, with --freestanding
+        if freestanding:
+            arch = self.target.split('-')[0]
+            if arch not in FREESTANDING_TARGETS:
+                raise Exception(f"--freestanding supports {' and '.join(FREESTANDING_TARGETS)} targets, not {self.target}")
+            self.freestanding = FREESTANDING_TARGETS[arch]
+        self.llvm_code = []
+        self.literals = LiteralPool("@.str.{}")
+        self.variables = {}
+        self.registers = {}
+        self.reg_counter = 0
+    
+    def get_new_register(self):
+        reg = f"%r{self.reg_counter}"
+        self.reg_counter += 1
+        return reg
+    
+    def emit(self, line):
+        self.llvm_code.append(line)
+    
+    def emit_global(self, line):
+        # Globals are spooled separately and placed after the functions
+        self.sink.write_data([line])
+    
+    def llvm_type(self, value_type):
+        # Numbers are unboxed 64-bit integers
+        return "i64" if value_type == NUM else STRING_TYPE
+    
+    def compile(self, ast, output=None):
+        """Generate the module's IR, writing it to output as it goes.
+
+        @main is written out every FLUSH_LINES lines, and globals are
+        spooled to follow the functions. Without output the IR is returned.
+        """
+        return self.compile_ir(lower(ast), output)
+    
+    def compile_ir(self, program, output=None):
+        """Generate the module's IR for an IRProgram, as compile() does for an AST.
+
+        Temporaries map to the SSA register or constant holding their value.
+        """
+        self.program = program
+        self.literals.collect(program)
+        self.values = {}        # temp -> LLVM operand
+        self.sink = OutputSink(output)
+        self.sink.write(self.module_header())
+        
+        # Begin main function
+        self.location = ""
+        if self.source_file:
+            self.generate_debug_info()
+            self.emit(f"define i32 @main() !dbg !{DEBUG_MAIN} {{")
+            self.location = self.debug_location(0)
+        else:
+            self.emit("define i32 @main() {")
+        self.emit("entry:")
+        
+        # Every JOIN passes its pieces in one array, as long as the longest JOIN
+        self.join_capacity = max((arg2 for op, _, _, arg2 in program.instructions() if op == JOIN), default=0)
+        if self.join_capacity:
+            self.emit(f"    %pieces = alloca [{self.join_capacity} x {STRING_TYPE}]")
+        self.emit(f"    call void @init_stdout(){self.location}")
+        
+        # One method per opcode
+        handlers = [getattr(self, f"compile_{name}") for name in OPCODE_NAMES]
+        current_line = 0
+        for op, dest, arg1, arg2, line in program.located_instructions():
+            if not self.source_file:
+                handlers[op](dest, arg1, arg2)
+            else:
+                # Attach the statement's source line to each instruction generated for it
+                if line != current_line:
+                    self.location = self.debug_location(line)
+                    current_line = line
+                start = len(self.llvm_code)
+                handlers[op](dest, arg1, arg2)
+                for index in range(start, len(self.llvm_code)):
+                    self.llvm_code[index] += self.location
+            if not self.values and len(self.llvm_code) >= FLUSH_LINES:
+                self.flush()
+        
+        # Return from main
+        if self.source_file:
+            self.location = self.debug_location(0)
+        if self.freestanding:
+            # Nothing flushes the runtime's buffer on exit but the program itself
+            self.emit(f"    call void @flush_stdout(){self.location}")
+        self.emit(f"    ret i32 0{self.location}")
+        self.emit("}")
+        
+        # Helper functions for string operations
+        self.generate_string_helpers()
+        self.flush()
+        
+        # String constants, one per distinct value (NUL terminated, but the length is carried)
+        for global_str, value in self.literals.stored.items():
+            escaped_str, length = llvm_string_constant(value)
+            self.emit_global(f"{global_str} = private unnamed_addr constant [{length + 1} x i8] c\"{escaped_str}\", align 1")
+        
+        return self.sink.close()
+    
+    def module_header(self):
+        header = ["; ModuleID = 'vibe_program'"]
+        arch = self.target.split('-')[0]
+        if arch in DATA_LAYOUTS:
+            header.append(f"target datalayout = \"{DATA_LAYOUTS[arch]}\"")
+        header.append(f"target triple = \"{self.target}\"")
+        
+        # String type: data pointer and length in bytes
+        header.append(f"{STRING_TYPE} = type {{ i8*, i64 }}")
+        return header
+    
+    def generate_debug_info(self):
+        """Metadata describing the source file and @main, for -g.
+
+        Only line tables are emitted: perf, gdb and addr2line can map
+        addresses in @main to source lines. The runtime helpers have no
+        debug info of their own but keep their symbol names and sizes.
+        """
+        path = os.path.abspath(self.source_file)
+        self.debug_locations = {}
+        self.next_metadata = DEBUG_VERSION + 1
+        self.emit_global(f"!llvm.dbg.cu = !{{!{DEBUG_CU}}}")
+        self.emit_global(f"!llvm.module.flags = !{{!{DEBUG_DWARF}, !{DEBUG_VERSION}}}")
+        self.emit_global(f"!{DEBUG_CU} = distinct !DICompileUnit(language: DW_LANG_C, file: !{DEBUG_FILE}, "
+                         f"producer: \"vibe\", isOptimized: false, runtimeVersion: 0, emissionKind: LineTablesOnly)")
+        self.emit_global(f"!{DEBUG_FILE} = !DIFile(filename: {llvm_metadata_string(os.path.basename(path))}, "
+                         f"directory: {llvm_metadata_string(os.path.dirname(path))})")
+        self.emit_global(f"!{DEBUG_MAIN} = distinct !DISubprogram(name: \"main\", scope: !{DEBUG_FILE}, "
+                         f"file: !{DEBUG_FILE}, line: 1, type: !{DEBUG_MAIN_TYPE}, scopeLine: 1, "
+                         f"spFlags: DISPFlagDefinition, unit: !{DEBUG_CU})")
+        self.emit_global(f"!{DEBUG_MAIN_TYPE} = !DISubroutineType(types: !{DEBUG_NO_TYPES})")
+        self.emit_global(f"!{DEBUG_NO_TYPES} = !{{}}")
+        self.emit_global(f"!{DEBUG_DWARF} = !{{i32 7, !\"Dwarf Version\", i32 4}}")
+        self.emit_global(f"!{DEBUG_VERSION} = !{{i32 2, !\"Debug Info Version\", i32 3}}")
+    
+    def debug_location(self, line):
+        """The !dbg suffix for an instruction in @main from a source line (0 for none)."""
+        if line not in self.debug_locations:
+            self.debug_locations[line] = self.next_metadata
+            self.emit_global(f"!{self.next_metadata} = !DILocation(line: {line}, scope: !{DEBUG_MAIN})")
+            self.next_metadata += 1
+        return f", !dbg !{self.debug_locations[line]}"
+    
+    def generate_precomputed(self, data, output=None):
+        """IR for a program that only writes data, its output worked out at build time.
+
+        @main hands the bytes straight to write(), bypassing stdio, and
+        calls it again only after a short write. With --freestanding
+        write() is the system call itself.
+        """
+        escaped, length = llvm_string_constant(data.decode('utf-8'))
+        array = f"[{length + 1} x i8]"
+        if self.freestanding:
+            # write() is the only system call the program makes
+            runtime = []
+            self.generate_freestanding_start(runtime.append, runtime.append)
+            runtime += [
+                "define i64 @write(i32 %fd, i8* %data, i64 %count) {",
+                "entry:",
+                "    %descriptor = sext i32 %fd to i64",
+                f"    %written = {self.syscall('write', 'i64 %descriptor', 'i8* %data', 'i64 %count')}",
+                "    ret i64 %written",
+                "}",
+            ]
+        else:
+            runtime = ["declare i64 @write(i32, i8*, i64)"]
+        sink = OutputSink(output)
+        sink.write(self.module_header() + runtime + [
+            f"@.output = private unnamed_addr constant {array} c\"{escaped}\", align 1",
+            "define i32 @main() {",
+            "entry:",
+            "    br label %loop",
+            "loop:",
+            "    %written = phi i64 [ 0, %entry ], [ %next, %write ]",
+            f"    %remaining = sub i64 {length}, %written",
+            "    %done = icmp eq i64 %remaining, 0",
+            "    br i1 %done, label %exit, label %write",
+            "write:",
+            f"    %ptr = getelementptr inbounds {array}, {array}* @.output, i64 0, i64 %written",
+            "    %count = call i64 @write(i32 1, i8* %ptr, i64 %remaining)",
+            "    %next = add i64 %written, %count",
+            "    %failed = icmp sle i64 %count, 0",
+            "    br i1 %failed, label %fail, label %loop",
+            "exit:",
+            "    ret i32 0",
+            "fail:",
+            "    ret i32 1",
+            "}",
+        ])
+        return sink.close()
+    
+    def flush(self):
+        """Write out the IR generated so far."""
+        self.sink.write(self.llvm_code)
+        self.llvm_code = []
+    
+    def compile_CONST(self, dest, value, arg2):
+        self.values[dest] = str(signed(value))
+    
+    def compile_STRING(self, dest, literal, arg2):
+        self.values[dest] = self.compile_string_constant(self.program.literals[literal])
+    
+    def compile_string_constant(self, value):
+        # Suffixes of another literal point into its constant
+        global_str, offset = self.literals.reference(value)
+        str_type = f"[{len(self.literals.stored[global_str].encode('utf-8')) + 1} x i8]"
+        
+        # The string value is a constant: pointer to the data and its length
+        pointer = f"getelementptr inbounds ({str_type}, {str_type}* {global_str}, i64 0, i64 {offset})"
+        return f"{{ i8* {pointer}, i64 {len(value.encode('utf-8'))} }}"
+    
+    def compile_LOAD(self, dest, slot, arg2):
+        var_name, value_type = self.program.slots[slot]
+        if slot not in self.variables:
+            raise Exception(f"Undefined variable: {var_name}")
+        
+        value_type = self.llvm_type(value_type)
+        load_reg = self.get_new_register()
+        self.emit(f"    {load_reg} = load {value_type}, {value_type}* {self.variables[slot]}")
+        self.values[dest] = load_reg
+    
+    def compile_STORE(self, dest, slot, value):
+        value_type = self.llvm_type(self.program.slots[slot][1])
+        
+        # Allocate a slot per variable and type, since a variable can be reassigned another type
+        if slot not in self.variables:
+            var_reg = self.get_new_register()
+            self.emit(f"    {var_reg} = alloca {value_type}")
+            self.variables[slot] = var_reg
+        
+        # Store value
+        self.emit(f"    store {value_type} {self.values.pop(value)}, {value_type}* {self.variables[slot]}")
+    
+    def compile_ADD(self, dest, left, right):
+        # Integer addition; type inference proved both sides are numbers
+        result_reg = self.get_new_register()
+        self.emit(f"    {result_reg} = add i64 {self.values.pop(left)}, {self.values.pop(right)}")
+        self.values[dest] = result_reg
+    
+    def compile_CONCAT(self, dest, left, right):
+        # Call string concatenation function
+        result_reg = self.get_new_register()
+        operands = f"{STRING_TYPE} {self.values.pop(left)}, {STRING_TYPE} {self.values.pop(right)}"
+        owned = self.program.owned[left] | self.program.owned[right] << 1
+        if owned:
+            # Operands read for the last time lend their storage to the result
+            self.emit(f"    {result_reg} = call {STRING_TYPE} @concat_owned_strings({operands}, i64 {owned})")
+        else:
+            self.emit(f"    {result_reg} = call {STRING_TYPE} @concat_strings({operands})")
+        self.values[dest] = result_reg
+    
+    def compile_TO_STRING(self, dest, value, arg2):
+        result_reg = self.get_new_register()
+        self.emit(f"    {result_reg} = call {STRING_TYPE} @num_to_string(i64 {self.values.pop(value)})")
+        self.values[dest] = result_reg
+    
+    def compile_PRINT(self, dest, value, arg2):
+        # Print the string and a newline
+        string = self.values.pop(value)
+        self.emit(f"    call void @print_string({STRING_TYPE} {string})")
+        if self.program.owned[value]:
+            # Nothing reads the string again
+            self.emit(f"    call void @release_string({STRING_TYPE} {string})")
+    
+    def compile_JOIN(self, dest, first, count):
+        pieces = self.program.join_pieces(first, count)
+        strings = [self.values.pop(piece) for piece in pieces]
+        array_type = f"[{self.join_capacity} x {STRING_TYPE}]"
+        slots = []
+        for index, string in enumerate(strings):
+            slot = self.get_new_register()
+            self.emit(f"    {slot} = getelementptr inbounds {array_type}, {array_type}* %pieces, i64 0, i64 {index}")
+            self.emit(f"    store {STRING_TYPE} {string}, {STRING_TYPE}* {slot}")
+            slots.append(slot)
+        result_reg = self.get_new_register()
+        self.emit(f"    {result_reg} = call {STRING_TYPE} @concat_n_strings({STRING_TYPE}* {slots[0]}, i64 {count}, "
+                  f"i64 {self.program.owned[pieces[0]]})")
+        if not self.freestanding:
+            # The other pieces nothing reads again are freed; in an arena they are
+            # below the result, and only the last allocation can be given back
+            for piece, string in zip(pieces[1:], strings[1:]):
+                if self.program.owned[piece]:
+                    self.emit(f"    call void @release_string({STRING_TYPE} {string})")
+        self.values[dest] = result_reg
+    
+    def generate_string_helpers(self):
+        # Output and allocation come from libc, or with --freestanding from a syscall runtime
+        if self.freestanding:
+            self.generate_freestanding_runtime()
+            allocator = "@arena_alloc"
+        else:
+            self.generate_stdio_helpers()
+            allocator = "@malloc"
+        
+        self.generate_number_formatting()
+        
+        # Number to decimal string, formatted straight into an allocation of its own
+        self.emit(f"define {STRING_TYPE} @num_to_string(i64 %value) {{")
+        self.emit("entry:")
+        self.emit(f"    %buffer = call i8* {allocator}(i64 {NUMBER_MAX_LENGTH + 1})")
+        self.emit("    %length = call i64 @format_number(i64 %value, i8* %buffer)")
+        self.emit("    %nul = getelementptr i8, i8* %buffer, i64 %length")
+        self.emit("    store i8 0, i8* %nul")
+        if self.freestanding:
+            # Cut the slice down to what the digits use, so the string can be released
+            # or extended like any other; nothing was allocated since
+            self.emit("    %nul_int = ptrtoint i8* %nul to i64")
+            self.emit("    %end_rounded = add i64 %nul_int, 16")
+            self.emit("    %end = and i64 %end_rounded, -16")
+            self.emit("    %top = inttoptr i64 %end to i8*")
+            self.emit("    store i8* %top, i8** @vibe.arena_ptr")
+        self.emit(f"    %result0 = insertvalue {STRING_TYPE} undef, i8* %buffer, 0")
+        self.emit(f"    %result = insertvalue {STRING_TYPE} %result0, i64 %length, 1")
+        self.emit(f"    ret {STRING_TYPE} %result")
+        self.emit("}")
+        
+        # String concatenation function
+        self.emit(f"define {STRING_TYPE} @concat_strings({STRING_TYPE} %str1, {STRING_TYPE} %str2) {{")
+        self.emit("entry:")
+        
+        # Both lengths are already known
+        self.emit(f"    %ptr1 = extractvalue {STRING_TYPE} %str1, 0")
+        self.emit(f"    %len1 = extractvalue {STRING_TYPE} %str1, 1")
+        self.emit(f"    %ptr2 = extractvalue {STRING_TYPE} %str2, 0")
+        self.emit(f"    %len2 = extractvalue {STRING_TYPE} %str2, 1")
+        
+        # Calculate total length needed
+        self.emit("    %total_len = add i64 %len1, %len2")
+        self.emit("    %buf_len = add i64 %total_len, 1")  # +1 for null terminator
+        
+        # Allocate buffer for the result
+        self.emit(f"    %buffer = call i8* {allocator}(i64 %buf_len)")
+        
+        # Copy both strings with memcpy
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %buffer, i8* %ptr1, i64 %len1, i1 false)")
+        self.emit("    %buffer_end = getelementptr i8, i8* %buffer, i64 %len1")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %buffer_end, i8* %ptr2, i64 %len2, i1 false)")
+        
+        # Add null terminator
+        self.emit("    %nul = getelementptr i8, i8* %buffer, i64 %total_len")
+        self.emit("    store i8 0, i8* %nul")
+        
+        # Return buffer and its length
+        self.emit(f"    %result0 = insertvalue {STRING_TYPE} undef, i8* %buffer, 0")
+        self.emit(f"    %result = insertvalue {STRING_TYPE} %result0, i64 %total_len, 1")
+        self.emit(f"    ret {STRING_TYPE} %result")
+        self.emit("}")
+        
+        self.generate_join_helper(allocator)
+        if self.freestanding:
+            self.generate_arena_reuse_helpers()
+        else:
+            self.generate_malloc_reuse_helpers()
+        
+        self.emit("declare void @llvm.memcpy.p0i8.p0i8.i64(i8*, i8*, i64, i1)")
+        self.emit("declare void @llvm.memmove.p0i8.p0i8.i64(i8*, i8*, i64, i1)")
+    
+    def generate_number_formatting(self):
+        """@format_number, writing an unsigned number in decimal to a buffer of 20 bytes.
+
+        As in simple_compiler's runtime, the digit count comes from the bit
+        length and a table of powers of ten, and the digits are written from
+        the end two at a time: the quotient by 100 from a multiply by its
+        reciprocal, the pair from a table. Returns the length.
+        """
+        powers = ', '.join(f"i64 {signed(power)}" for power in POWERS_OF_TEN)
+        self.emit_global(f"@vibe.powers_of_ten = private unnamed_addr constant [{len(POWERS_OF_TEN)} x i64] [{powers}]")
+        self.emit_global(f"@vibe.digit_pairs = private unnamed_addr constant [{len(DIGIT_PAIRS)} x i8] "
+                         f"c\"{DIGIT_PAIRS}\", align 2")
+        pairs_type = f"[{len(DIGIT_PAIRS)} x i8]"
+        powers_type = f"[{len(POWERS_OF_TEN)} x i64]"
+        
+        self.emit("define i64 @format_number(i64 %value, i8* %buffer) {")
+        self.emit("entry:")
+        self.emit("    %odd = or i64 %value, 1")               # Same digit count; 0 has one digit too
+        self.emit("    %zeros = call i64 @llvm.ctlz.i64(i64 %odd, i1 true)")
+        self.emit("    %bits = sub i64 64, %zeros")
+        self.emit("    %scaled = mul i64 %bits, 1233")     # log10(2) * 4096
+        self.emit("    %estimate = lshr i64 %scaled, 12")
+        self.emit(f"    %power_slot = getelementptr {powers_type}, {powers_type}* @vibe.powers_of_ten, "
+                  "i64 0, i64 %estimate")
+        self.emit("    %power = load i64, i64* %power_slot")
+        self.emit("    %reached = icmp uge i64 %odd, %power")
+        self.emit("    %extra = zext i1 %reached to i64")
+        self.emit("    %length = add i64 %estimate, %extra")
+        self.emit("    br label %pairs")
+        self.emit("pairs:")
+        self.emit("    %x = phi i64 [ %value, %entry ], [ %quotient, %pair ]")
+        self.emit("    %end = phi i64 [ %length, %entry ], [ %pair_at, %pair ]")
+        self.emit("    %more = icmp uge i64 %x, 100")
+        self.emit("    br i1 %more, label %pair, label %last")
+        self.emit("pair:")
+        self.emit("    %quarter = lshr i64 %x, 2")
+        self.emit("    %wide = zext i64 %quarter to i128")
+        self.emit(f"    %product = mul i128 %wide, {DIVIDE_BY_100}")
+        self.emit("    %high = lshr i128 %product, 64")
+        self.emit("    %high64 = trunc i128 %high to i64")
+        self.emit("    %quotient = lshr i64 %high64, 2")   # %x / 100
+        self.emit("    %hundreds = mul i64 %quotient, 100")
+        self.emit("    %remainder = sub i64 %x, %hundreds")
+        self.emit("    %pair_at = sub i64 %end, 2")
+        self.emit_pair_copy("pair", "%remainder", "%pair_at", pairs_type)
+        self.emit("    br label %pairs")
+        self.emit("last:")
+        self.emit("    %two = icmp uge i64 %x, 10")
+        self.emit("    br i1 %two, label %last_pair, label %last_digit")
+        self.emit("last_pair:")
+        self.emit("    %last_at = sub i64 %end, 2")
+        self.emit_pair_copy("last", "%x", "%last_at", pairs_type)
+        self.emit("    br label %done")
+        self.emit("last_digit:")
+        self.emit("    %ascii = add i64 %x, 48")
+        self.emit("    %char = trunc i64 %ascii to i8")
+        self.emit("    %digit_at = sub i64 %end, 1")
+        self.emit("    %digit_slot = getelementptr i8, i8* %buffer, i64 %digit_at")
+        self.emit("    store i8 %char, i8* %digit_slot")
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    ret i64 %length")
+        self.emit("}")
+        self.emit("declare i64 @llvm.ctlz.i64(i64, i1)")
+    
+    def emit_pair_copy(self, prefix, value, offset, pairs_type):
+        """Copy the two digits of value, below 100, from the pairs table to offset in %buffer."""
+        self.emit(f"    %{prefix}_index = shl i64 {value}, 1")
+        self.emit(f"    %{prefix}_source = getelementptr {pairs_type}, {pairs_type}* @vibe.digit_pairs, "
+                  f"i64 0, i64 %{prefix}_index")
+        self.emit(f"    %{prefix}_source16 = bitcast i8* %{prefix}_source to i16*")
+        self.emit(f"    %{prefix}_digits = load i16, i16* %{prefix}_source16, align 2")
+        self.emit(f"    %{prefix}_target = getelementptr i8, i8* %buffer, i64 {offset}")
+        self.emit(f"    %{prefix}_target16 = bitcast i8* %{prefix}_target to i16*")
+        self.emit(f"    store i16 %{prefix}_digits, i16* %{prefix}_target16, align 1")
+    
+    def generate_join_helper(self, allocator):
+        """@concat_n_strings, concatenating an array of strings at once.
+
+        The lengths are added up, the result allocated once and each string
+        copied once. When the third argument is set nothing reads the first
+        string again, and it is extended instead: with realloc, or in the
+        arena when it is the last allocation.
+        """
+        self.emit(f"define {STRING_TYPE} @concat_n_strings({STRING_TYPE}* %pieces, i64 %count, i64 %owned) {{")
+        self.emit("entry:")
+        self.emit("    br label %measure")
+        self.emit("measure:")
+        self.emit("    %i = phi i64 [ 0, %entry ], [ %i_next, %measure ]")
+        self.emit("    %sum = phi i64 [ 0, %entry ], [ %total_len, %measure ]")
+        self.emit(f"    %len_ptr = getelementptr {STRING_TYPE}, {STRING_TYPE}* %pieces, i64 %i, i32 1")
+        self.emit("    %len = load i64, i64* %len_ptr")
+        self.emit("    %total_len = add i64 %sum, %len")
+        self.emit("    %i_next = add i64 %i, 1")
+        self.emit("    %more = icmp ult i64 %i_next, %count")
+        self.emit("    br i1 %more, label %measure, label %allocate")
+        self.emit("allocate:")
+        self.emit("    %buf_len = add i64 %total_len, 1")
+        self.emit(f"    %first_ptr = getelementptr {STRING_TYPE}, {STRING_TYPE}* %pieces, i64 0, i32 0")
+        self.emit("    %first = load i8*, i8** %first_ptr")
+        self.emit(f"    %first_len_ptr = getelementptr {STRING_TYPE}, {STRING_TYPE}* %pieces, i64 0, i32 1")
+        self.emit("    %first_len = load i64, i64* %first_len_ptr")
+        self.emit("    %first_owned = icmp ne i64 %owned, 0")
+        if self.freestanding:
+            self.emit("    %padded = add i64 %total_len, 16")
+            self.emit("    %size = and i64 %padded, -16")
+            self.emit("    %top = load i8*, i8** @vibe.arena_ptr")
+            self.emit("    %top_int = ptrtoint i8* %top to i64")
+            self.emit("    %limit = load i8*, i8** @vibe.arena_end")
+            self.emit("    %limit_int = ptrtoint i8* %limit to i64")
+            self.emit("    %first_int = ptrtoint i8* %first to i64")
+            self.emit("    %first_end_padded = add i64 %first_int, %first_len")
+            self.emit("    %first_end_rounded = add i64 %first_end_padded, 16")
+            self.emit("    %first_end = and i64 %first_end_rounded, -16")
+            self.emit("    %first_at_top = icmp eq i64 %first_end, %top_int")
+            self.emit("    %extend_end = add i64 %first_int, %size")
+            self.emit("    %extend_fits = icmp ule i64 %extend_end, %limit_int")
+            self.emit("    %first_last = and i1 %first_owned, %first_at_top")
+            self.emit("    %can_extend = and i1 %first_last, %extend_fits")
+            self.emit("    br i1 %can_extend, label %extend, label %fresh")
+            self.emit("extend:")
+            self.emit("    %extend_top = getelementptr i8, i8* %first, i64 %size")
+            self.emit("    store i8* %extend_top, i8** @vibe.arena_ptr")
+            extended = "%first"
+        else:
+            self.emit("    br i1 %first_owned, label %extend, label %fresh")
+            self.emit("extend:")
+            self.emit("    %extended = call i8* @realloc(i8* %first, i64 %buf_len)")
+            extended = "%extended"
+        self.emit("    br label %copy_rest")
+        self.emit("fresh:")
+        self.emit(f"    %allocated = call i8* {allocator}(i64 %buf_len)")
+        self.emit("    br label %copy_rest")
+        self.emit("copy_rest:")
+        self.emit(f"    %buffer = phi i8* [ {extended}, %extend ], [ %allocated, %fresh ]")
+        self.emit("    %in_place = phi i1 [ true, %extend ], [ false, %fresh ]")
+        self.emit("    %start = phi i64 [ 1, %extend ], [ 0, %fresh ]")
+        self.emit("    %start_at = phi i64 [ %first_len, %extend ], [ 0, %fresh ]")
+        self.emit("    br label %copy_check")
+        self.emit("copy_check:")
+        self.emit("    %j = phi i64 [ %start, %copy_rest ], [ %j_next, %copy ]")
+        self.emit("    %at = phi i64 [ %start_at, %copy_rest ], [ %at_next, %copy ]")
+        self.emit("    %left = icmp ult i64 %j, %count")
+        self.emit("    br i1 %left, label %copy, label %done")
+        self.emit("copy:")
+        self.emit(f"    %ptr_ptr = getelementptr {STRING_TYPE}, {STRING_TYPE}* %pieces, i64 %j, i32 0")
+        self.emit("    %ptr = load i8*, i8** %ptr_ptr")
+        self.emit(f"    %piece_len_ptr = getelementptr {STRING_TYPE}, {STRING_TYPE}* %pieces, i64 %j, i32 1")
+        self.emit("    %piece_len = load i64, i64* %piece_len_ptr")
+        # x + "," + x reads the first string again; realloc may have moved it
+        self.emit("    %is_first = icmp eq i8* %ptr, %first")
+        self.emit("    %moved = and i1 %is_first, %in_place")
+        self.emit("    %source = select i1 %moved, i8* %buffer, i8* %ptr")
+        self.emit("    %copy_to = getelementptr i8, i8* %buffer, i64 %at")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %copy_to, i8* %source, i64 %piece_len, i1 false)")
+        self.emit("    %at_next = add i64 %at, %piece_len")
+        self.emit("    %j_next = add i64 %j, 1")
+        self.emit("    br label %copy_check")
+        self.emit("done:")
+        self.emit("    %nul = getelementptr i8, i8* %buffer, i64 %total_len")
+        self.emit("    store i8 0, i8* %nul")
+        self.emit(f"    %result0 = insertvalue {STRING_TYPE} undef, i8* %buffer, 0")
+        self.emit(f"    %result = insertvalue {STRING_TYPE} %result0, i64 %total_len, 1")
+        self.emit(f"    ret {STRING_TYPE} %result")
+        self.emit("}")
+    
+    def generate_malloc_reuse_helpers(self):
+        """@concat_owned_strings and @release_string on malloc'd strings.
+
+        The third argument of @concat_owned_strings has bit 0 set when the
+        left string is not read again and bit 1 for the right one. An owned
+        left string is grown with realloc and the right one appended, an
+        owned right one grown and the left one moved in front of it; owned
+        strings left over are freed.
+        """
+        self.emit(f"define {STRING_TYPE} @concat_owned_strings({STRING_TYPE} %str1, {STRING_TYPE} %str2, i64 %owned) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr1 = extractvalue {STRING_TYPE} %str1, 0")
+        self.emit(f"    %len1 = extractvalue {STRING_TYPE} %str1, 1")
+        self.emit(f"    %ptr2 = extractvalue {STRING_TYPE} %str2, 0")
+        self.emit(f"    %len2 = extractvalue {STRING_TYPE} %str2, 1")
+        self.emit("    %total_len = add i64 %len1, %len2")
+        self.emit("    %buf_len = add i64 %total_len, 1")
+        self.emit("    %left_bit = and i64 %owned, 1")
+        self.emit("    %left_owned = icmp ne i64 %left_bit, 0")
+        self.emit("    br i1 %left_owned, label %append, label %prepend")
+        self.emit("append:")
+        # x + x reads the left string twice; realloc may move it
+        self.emit("    %same = icmp eq i8* %ptr2, %ptr1")
+        self.emit("    %appended = call i8* @realloc(i8* %ptr1, i64 %buf_len)")
+        self.emit("    %source = select i1 %same, i8* %appended, i8* %ptr2")
+        self.emit("    %append_at = getelementptr i8, i8* %appended, i64 %len1")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %append_at, i8* %source, i64 %len2, i1 false)")
+        self.emit("    %right_bit = and i64 %owned, 2")
+        self.emit("    %right_owned = icmp ne i64 %right_bit, 0")
+        self.emit("    br i1 %right_owned, label %free_right, label %done")
+        self.emit("free_right:")
+        self.emit("    call void @free(i8* %ptr2)")
+        self.emit("    br label %done")
+        self.emit("prepend:")
+        self.emit("    %prepended = call i8* @realloc(i8* %ptr2, i64 %buf_len)")
+        self.emit("    %move_to = getelementptr i8, i8* %prepended, i64 %len1")
+        self.emit("    call void @llvm.memmove.p0i8.p0i8.i64(i8* %move_to, i8* %prepended, i64 %len2, i1 false)")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %prepended, i8* %ptr1, i64 %len1, i1 false)")
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    %buffer = phi i8* [ %appended, %append ], [ %appended, %free_right ], [ %prepended, %prepend ]")
+        self.emit("    %nul = getelementptr i8, i8* %buffer, i64 %total_len")
+        self.emit("    store i8 0, i8* %nul")
+        self.emit(f"    %result0 = insertvalue {STRING_TYPE} undef, i8* %buffer, 0")
+        self.emit(f"    %result = insertvalue {STRING_TYPE} %result0, i64 %total_len, 1")
+        self.emit(f"    ret {STRING_TYPE} %result")
+        self.emit("}")
+        
+        self.emit(f"define void @release_string({STRING_TYPE} %str) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr = extractvalue {STRING_TYPE} %str, 0")
+        self.emit("    call void @free(i8* %ptr)")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        self.emit("declare i8* @realloc(i8*, i64)")
+        self.emit("declare void @free(i8*)")
+    
+    def generate_arena_reuse_helpers(self):
+        """@concat_owned_strings and @release_string on arena strings, for --freestanding.
+
+        As in simple_compiler's runtime, a string takes up its length plus
+        the NUL rounded up to 16 bytes from its start, and only the last
+        allocation can be given back. An owned left string is extended in
+        place when it is last (or only an owned right string is above it),
+        otherwise an owned right string that is last is moved up and the
+        left one copied in front of it.
+        """
+        self.emit(f"define {STRING_TYPE} @concat_owned_strings({STRING_TYPE} %str1, {STRING_TYPE} %str2, i64 %owned) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr1 = extractvalue {STRING_TYPE} %str1, 0")
+        self.emit(f"    %len1 = extractvalue {STRING_TYPE} %str1, 1")
+        self.emit(f"    %ptr2 = extractvalue {STRING_TYPE} %str2, 0")
+        self.emit(f"    %len2 = extractvalue {STRING_TYPE} %str2, 1")
+        self.emit("    %total_len = add i64 %len1, %len2")
+        self.emit("    %padded = add i64 %total_len, 16")
+        self.emit("    %size = and i64 %padded, -16")      # Slice the result needs
+        self.emit("    %top = load i8*, i8** @vibe.arena_ptr")
+        self.emit("    %top_int = ptrtoint i8* %top to i64")
+        self.emit("    %limit = load i8*, i8** @vibe.arena_end")
+        self.emit("    %limit_int = ptrtoint i8* %limit to i64")
+        self.emit("    %ptr1_int = ptrtoint i8* %ptr1 to i64")
+        self.emit("    %ptr2_int = ptrtoint i8* %ptr2 to i64")
+        self.emit("    %end1_padded = add i64 %ptr1_int, %len1")
+        self.emit("    %end1_rounded = add i64 %end1_padded, 16")
+        self.emit("    %end1 = and i64 %end1_rounded, -16")
+        self.emit("    %end2_padded = add i64 %ptr2_int, %len2")
+        self.emit("    %end2_rounded = add i64 %end2_padded, 16")
+        self.emit("    %end2 = and i64 %end2_rounded, -16")
+        self.emit("    %left_bit = and i64 %owned, 1")
+        self.emit("    %left_owned = icmp ne i64 %left_bit, 0")
+        self.emit("    %right_bit = and i64 %owned, 2")
+        self.emit("    %right_owned = icmp ne i64 %right_bit, 0")
+        self.emit("    %right_at_top = icmp eq i64 %end2, %top_int")
+        self.emit("    %right_last = and i1 %right_owned, %right_at_top")
+        self.emit("    %free_top = select i1 %right_last, i64 %ptr2_int, i64 %top_int")
+        self.emit("    %left_at_top = icmp eq i64 %end1, %free_top")
+        self.emit("    %left_last = and i1 %left_owned, %left_at_top")
+        self.emit("    %append_end = add i64 %ptr1_int, %size")
+        self.emit("    %append_fits = icmp ule i64 %append_end, %limit_int")
+        self.emit("    %can_append = and i1 %left_last, %append_fits")
+        self.emit("    br i1 %can_append, label %append, label %try_prepend")
+        self.emit("append:")
+        self.emit("    %append_top = getelementptr i8, i8* %ptr1, i64 %size")
+        self.emit("    store i8* %append_top, i8** @vibe.arena_ptr")
+        self.emit("    %append_at = getelementptr i8, i8* %ptr1, i64 %len1")
+        # The right string may be the one just above, overlapping the destination
+        self.emit("    call void @llvm.memmove.p0i8.p0i8.i64(i8* %append_at, i8* %ptr2, i64 %len2, i1 false)")
+        self.emit("    br label %done")
+        self.emit("try_prepend:")
+        self.emit("    %prepend_end = add i64 %ptr2_int, %size")
+        self.emit("    %prepend_fits = icmp ule i64 %prepend_end, %limit_int")
+        self.emit("    %can_prepend = and i1 %right_last, %prepend_fits")
+        self.emit("    br i1 %can_prepend, label %prepend, label %copy")
+        self.emit("prepend:")
+        self.emit("    %prepend_top = getelementptr i8, i8* %ptr2, i64 %size")
+        self.emit("    store i8* %prepend_top, i8** @vibe.arena_ptr")
+        self.emit("    %move_to = getelementptr i8, i8* %ptr2, i64 %len1")
+        self.emit("    call void @llvm.memmove.p0i8.p0i8.i64(i8* %move_to, i8* %ptr2, i64 %len2, i1 false)")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %ptr2, i8* %ptr1, i64 %len1, i1 false)")
+        self.emit("    br label %done")
+        self.emit("copy:")
+        self.emit(f"    %copied = call {STRING_TYPE} @concat_strings({STRING_TYPE} %str1, {STRING_TYPE} %str2)")
+        self.emit(f"    ret {STRING_TYPE} %copied")
+        self.emit("done:")
+        self.emit("    %buffer = phi i8* [ %ptr1, %append ], [ %ptr2, %prepend ]")
+        self.emit("    %nul = getelementptr i8, i8* %buffer, i64 %total_len")
+        self.emit("    store i8 0, i8* %nul")
+        self.emit(f"    %result0 = insertvalue {STRING_TYPE} undef, i8* %buffer, 0")
+        self.emit(f"    %result = insertvalue {STRING_TYPE} %result0, i64 %total_len, 1")
+        self.emit(f"    ret {STRING_TYPE} %result")
+        self.emit("}")
+        
+        # Give a string back when it is the last thing allocated
+        self.emit(f"define void @release_string({STRING_TYPE} %str) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr = extractvalue {STRING_TYPE} %str, 0")
+        self.emit(f"    %len = extractvalue {STRING_TYPE} %str, 1")
+        self.emit("    %ptr_int = ptrtoint i8* %ptr to i64")
+        self.emit("    %end_padded = add i64 %ptr_int, %len")
+        self.emit("    %end_rounded = add i64 %end_padded, 16")
+        self.emit("    %end = and i64 %end_rounded, -16")
+        self.emit("    %top = load i8*, i8** @vibe.arena_ptr")
+        self.emit("    %top_int = ptrtoint i8* %top to i64")
+        self.emit("    %last = icmp eq i64 %end, %top_int")
+        self.emit("    br i1 %last, label %release, label %done")
+        self.emit("release:")
+        self.emit("    store i8* %ptr, i8** @vibe.arena_ptr")
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    ret void")
+        self.emit("}")
+    
+    def generate_stdio_helpers(self):
+        # stdout is fully buffered by stdio when piped; line buffer it on request
+        env_name, env_length = llvm_string_constant(LINE_BUFFERED_ENV)
+        env_type = f"[{env_length + 1} x i8]"
+        self.emit_global(f"@.str.line_buffered_env = private unnamed_addr constant {env_type} c\"{env_name}\", align 1")
+        self.emit("define void @init_stdout() {")
+        self.emit("entry:")
+        self.emit(f"    %value = call i8* @getenv(i8* getelementptr inbounds ({env_type}, {env_type}* @.str.line_buffered_env, i64 0, i64 0))")
+        self.emit("    %unset = icmp eq i8* %value, null")
+        self.emit("    br i1 %unset, label %done, label %check")
+        self.emit("check:")
+        self.emit("    %first = load i8, i8* %value")
+        self.emit("    %empty = icmp eq i8 %first, 0")
+        self.emit("    %zero = icmp eq i8 %first, 48")  # '0'
+        self.emit("    %off = or i1 %empty, %zero")
+        self.emit("    br i1 %off, label %done, label %enable")
+        self.emit("enable:")
+        self.emit("    %out = load i8*, i8** @stdout")
+        self.emit("    call i32 @setvbuf(i8* %out, i8* null, i32 1, i64 0)")  # _IOLBF
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        # Print function: one fwrite of the known length, then a newline
+        self.emit(f"define void @print_string({STRING_TYPE} %str) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr = extractvalue {STRING_TYPE} %str, 0")
+        self.emit(f"    %len = extractvalue {STRING_TYPE} %str, 1")
+        self.emit("    %out = load i8*, i8** @stdout")
+        self.emit("    call i64 @fwrite(i8* %ptr, i64 1, i64 %len, i8* %out)")
+        self.emit("    call i32 @fputc(i32 10, i8* %out)")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        # External C functions
+        self.emit_global("@stdout = external global i8*")
+        self.emit("declare i64 @fwrite(i8*, i64, i64, i8*)")
+        self.emit("declare i32 @fputc(i32, i8*)")
+        self.emit("declare i8* @getenv(i8*)")
+        self.emit("declare i32 @setvbuf(i8*, i8*, i32, i64)")
+        self.emit("declare i8* @malloc(i64)")
+    
+    def syscall(self, name, *arguments):
+        """Inline assembly calling system call name with arguments, typed operands such as "i64 %n".
+
+        Only used with --freestanding; the result is the kernel's i64 return value.
+        """
+        conventions = self.freestanding
+        registers = conventions['registers'][:len(arguments) + 1]
+        constraints = [f"={{{conventions['result']}}}"] + [f"{{{register}}}" for register in registers]
+        constraints += [f"~{{{register}}}" for register in conventions['clobbers']] + ["~{memory}"]
+        operands = [f"i64 {conventions['numbers'][name]}"] + list(arguments)
+        return (f"call i64 asm sideeffect \"{conventions['instruction']}\", \"{','.join(constraints)}\""
+                f"({', '.join(operands)})")
+    
+    def generate_freestanding_start(self, emit, emit_global):
+        """_start, which passes the initial stack to vibe_start, and vibe_start, which runs @main.
+
+        vibe_start records where the environment is, then exits with
+        @main's status, so the executable needs no C runtime at all.
+        """
+        for line in [".text", ".globl _start", "_start:"] + self.freestanding['start']:
+            emit_global(f"module asm \"{line}\"")
+        emit_global("@vibe.envp = internal global i8** null")
+        emit("define void @vibe_start(i64* %sp) noreturn nounwind {")
+        emit("entry:")
+        emit("    %argc = load i64, i64* %sp")
+        emit("    %skip = add i64 %argc, 2")          # argc itself, argv and its NULL
+        emit("    %envp_words = getelementptr i64, i64* %sp, i64 %skip")
+        emit("    %envp = bitcast i64* %envp_words to i8**")
+        emit("    store i8** %envp, i8*** @vibe.envp")
+        emit("    %status = call i32 @main()")
+        emit("    %code = sext i32 %status to i64")
+        emit(f"    %ignored = {self.syscall('exit', 'i64 %code')}")
+        emit("    unreachable")
+        emit("}")
+    
+    def generate_freestanding_runtime(self):
+        """Output buffering and an arena allocator on raw syscalls, for --freestanding.
+
+        Modeled on simple_compiler's runtime: print_string appends to a
+        buffer written out when full, after each line with line buffering
+        on, and by @main before it returns; arena_alloc hands out slices of
+        mmap'd chunks that double in size.
+        """
+        buffer_type = f"[{OUTPUT_BUFFER_SIZE} x i8]"
+        buffer = f"getelementptr inbounds ({buffer_type}, {buffer_type}* @vibe.out_buf, i64 0, i64 0)"
+        self.generate_freestanding_start(self.emit, self.emit_global)
+        self.emit_global(f"@vibe.out_buf = internal global {buffer_type} zeroinitializer, align 16")
+        self.emit_global("@vibe.out_len = internal global i64 0")
+        self.emit_global("@vibe.line_buffered = internal global i1 false")
+        self.emit_global("@vibe.arena_ptr = internal global i8* null")
+        self.emit_global("@vibe.arena_end = internal global i8* null")
+        self.emit_global(f"@vibe.arena_chunk = internal global i64 {ARENA_CHUNK_SIZE}")
+        
+        # Scan the environment for VIBE_LINE_BUFFERED set to anything but 0
+        env_name, env_length = llvm_string_constant(LINE_BUFFERED_ENV + "=")
+        env_type = f"[{env_length + 1} x i8]"
+        self.emit_global(f"@.str.line_buffered_env = private unnamed_addr constant {env_type} c\"{env_name}\", align 1")
+        self.emit("define void @init_stdout() {")
+        self.emit("entry:")
+        self.emit("    %envp = load i8**, i8*** @vibe.envp")
+        self.emit("    br label %next")
+        self.emit("next:")
+        self.emit("    %slot = phi i8** [ %envp, %entry ], [ %following, %advance ]")
+        self.emit("    %variable = load i8*, i8** %slot")
+        self.emit("    %end = icmp eq i8* %variable, null")
+        self.emit("    br i1 %end, label %done, label %compare")
+        self.emit("compare:")
+        self.emit("    %i = phi i64 [ 0, %next ], [ %i_next, %same ]")
+        self.emit(f"    %name_ptr = getelementptr inbounds {env_type}, {env_type}* @.str.line_buffered_env, i64 0, i64 %i")
+        self.emit("    %name_char = load i8, i8* %name_ptr")
+        self.emit("    %matched = icmp eq i8 %name_char, 0")   # Whole name matched
+        self.emit("    br i1 %matched, label %value, label %check")
+        self.emit("check:")
+        self.emit("    %char_ptr = getelementptr i8, i8* %variable, i64 %i")
+        self.emit("    %char = load i8, i8* %char_ptr")
+        self.emit("    %equal = icmp eq i8 %char, %name_char")
+        self.emit("    br i1 %equal, label %same, label %advance")
+        self.emit("same:")
+        self.emit("    %i_next = add i64 %i, 1")
+        self.emit("    br label %compare")
+        self.emit("advance:")
+        self.emit("    %following = getelementptr i8*, i8** %slot, i64 1")
+        self.emit("    br label %next")
+        self.emit("value:")
+        self.emit("    %value_ptr = getelementptr i8, i8* %variable, i64 %i")
+        self.emit("    %first = load i8, i8* %value_ptr")
+        self.emit("    %empty = icmp eq i8 %first, 0")
+        self.emit("    %zero = icmp eq i8 %first, 48")  # '0'
+        self.emit("    %off = or i1 %empty, %zero")
+        self.emit("    br i1 %off, label %advance, label %enable")
+        self.emit("enable:")
+        self.emit("    store i1 true, i1* @vibe.line_buffered")
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        # Write all of a buffer to stdout, after short writes too; gives up on errors
+        self.emit("define void @write_all(i8* %data, i64 %length) {")
+        self.emit("entry:")
+        self.emit("    br label %loop")
+        self.emit("loop:")
+        self.emit("    %ptr = phi i8* [ %data, %entry ], [ %rest, %wrote ]")
+        self.emit("    %left = phi i64 [ %length, %entry ], [ %remaining, %wrote ]")
+        self.emit("    %finished = icmp sle i64 %left, 0")
+        self.emit("    br i1 %finished, label %done, label %write")
+        self.emit("write:")
+        self.emit(f"    %written = {self.syscall('write', 'i64 1', 'i8* %ptr', 'i64 %left')}")
+        self.emit("    %failed = icmp sle i64 %written, 0")
+        self.emit("    br i1 %failed, label %done, label %wrote")
+        self.emit("wrote:")
+        self.emit("    %rest = getelementptr i8, i8* %ptr, i64 %written")
+        self.emit("    %remaining = sub i64 %left, %written")
+        self.emit("    br label %loop")
+        self.emit("done:")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        self.emit("define void @flush_stdout() {")
+        self.emit("entry:")
+        self.emit("    %length = load i64, i64* @vibe.out_len")
+        self.emit(f"    call void @write_all(i8* {buffer}, i64 %length)")
+        self.emit("    store i64 0, i64* @vibe.out_len")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        # Print function: append the string and a newline to the buffer
+        self.emit(f"define void @print_string({STRING_TYPE} %str) {{")
+        self.emit("entry:")
+        self.emit(f"    %ptr = extractvalue {STRING_TYPE} %str, 0")
+        self.emit(f"    %len = extractvalue {STRING_TYPE} %str, 1")
+        self.emit("    %needed = add i64 %len, 1")
+        self.emit("    %used = load i64, i64* @vibe.out_len")
+        self.emit("    %total = add i64 %used, %needed")
+        self.emit(f"    %fits = icmp ule i64 %total, {OUTPUT_BUFFER_SIZE}")
+        self.emit("    br i1 %fits, label %append, label %flush")
+        self.emit("flush:")
+        self.emit("    call void @flush_stdout()")
+        self.emit(f"    %fits_empty = icmp ule i64 %needed, {OUTPUT_BUFFER_SIZE}")
+        self.emit("    br i1 %fits_empty, label %append, label %direct")
+        self.emit("direct:")
+        self.emit("    call void @write_all(i8* %ptr, i64 %len)")   # Too large to buffer
+        self.emit("    br label %append")
+        self.emit("append:")
+        self.emit("    %copy_len = phi i64 [ %len, %entry ], [ %len, %flush ], [ 0, %direct ]")
+        self.emit("    %start = load i64, i64* @vibe.out_len")
+        self.emit(f"    %dest = getelementptr inbounds {buffer_type}, {buffer_type}* @vibe.out_buf, i64 0, i64 %start")
+        self.emit("    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %dest, i8* %ptr, i64 %copy_len, i1 false)")
+        self.emit("    %newline_at = add i64 %start, %copy_len")
+        self.emit(f"    %newline = getelementptr inbounds {buffer_type}, {buffer_type}* @vibe.out_buf, i64 0, i64 %newline_at")
+        self.emit("    store i8 10, i8* %newline")
+        self.emit("    %new_len = add i64 %newline_at, 1")
+        self.emit("    store i64 %new_len, i64* @vibe.out_len")
+        self.emit("    %line = load i1, i1* @vibe.line_buffered")
+        self.emit("    br i1 %line, label %flush_line, label %done")
+        self.emit("flush_line:")
+        self.emit("    call void @flush_stdout()")
+        self.emit("    br label %done")
+        self.emit("done:")
+        self.emit("    ret void")
+        self.emit("}")
+        
+        # Bump allocator: 16-byte aligned slices of mmap'd chunks, never freed
+        self.emit("define i8* @arena_alloc(i64 %size) {")
+        self.emit("entry:")
+        self.emit("    %padded = add i64 %size, 15")
+        self.emit("    %rounded = and i64 %padded, -16")
+        self.emit("    %ptr = load i8*, i8** @vibe.arena_ptr")
+        self.emit("    %end = load i8*, i8** @vibe.arena_end")
+        self.emit("    %ptr_int = ptrtoint i8* %ptr to i64")
+        self.emit("    %end_int = ptrtoint i8* %end to i64")
+        self.emit("    %available = sub i64 %end_int, %ptr_int")
+        self.emit("    %fits = icmp ule i64 %rounded, %available")
+        self.emit("    br i1 %fits, label %bump, label %grow")
+        self.emit("bump:")
+        self.emit("    %next = getelementptr i8, i8* %ptr, i64 %rounded")
+        self.emit("    store i8* %next, i8** @vibe.arena_ptr")
+        self.emit("    ret i8* %ptr")
+        self.emit("grow:")
+        self.emit("    %chunk = load i64, i64* @vibe.arena_chunk")
+        self.emit("    %doubled = shl i64 %chunk, 1")
+        self.emit("    store i64 %doubled, i64* @vibe.arena_chunk")
+        self.emit("    %large = icmp ugt i64 %rounded, %chunk")
+        self.emit("    %length = select i1 %large, i64 %rounded, i64 %chunk")
+        # PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS
+        self.emit(f"    %mapped = {self.syscall('mmap', 'i64 0', 'i64 %length', 'i64 3', 'i64 34', 'i64 -1', 'i64 0')}")
+        self.emit("    %base = inttoptr i64 %mapped to i8*")
+        self.emit("    %new_ptr = getelementptr i8, i8* %base, i64 %rounded")
+        self.emit("    %new_end = getelementptr i8, i8* %base, i64 %length")
+        self.emit("    store i8* %new_ptr, i8** @vibe.arena_ptr")
+        self.emit("    store i8* %new_end, i8** @vibe.arena_end")
+        self.emit("    ret i8* %base")
+        self.emit("}")
+        
+        # llvm.memcpy may become a call to memcpy; no-builtins keeps this loop from becoming one too
+        self.emit("define i8* @memcpy(i8* %dest, i8* %src, i64 %count) \"no-builtins\" {")
+        self.emit("entry:")
+        self.emit("    br label %loop")
+        self.emit("loop:")
+        self.emit("    %i = phi i64 [ 0, %entry ], [ %i_next, %copy ]")
+        self.emit("    %more = icmp ult i64 %i, %count")
+        self.emit("    br i1 %more, label %copy, label %done")
+        self.emit("copy:")
+        self.emit("    %from = getelementptr i8, i8* %src, i64 %i")
+        self.emit("    %byte = load i8, i8* %from")
+        self.emit("    %to = getelementptr i8, i8* %dest, i64 %i")
+        self.emit("    store i8 %byte, i8* %to")
+        self.emit("    %i_next = add i64 %i, 1")
+        self.emit("    br label %loop")
+        self.emit("done:")
+        self.emit("    ret i8* %dest")
+        self.emit("}")
+        
+        # llvm.memmove likewise; copies backwards when the destination is above the source
+        self.emit("define i8* @memmove(i8* %dest, i8* %src, i64 %count) \"no-builtins\" {")
+        self.emit("entry:")
+        self.emit("    %dest_int = ptrtoint i8* %dest to i64")
+        self.emit("    %src_int = ptrtoint i8* %src to i64")
+        self.emit("    %forwards = icmp ule i64 %dest_int, %src_int")
+        self.emit("    br i1 %forwards, label %forward, label %backward")
+        self.emit("forward:")
+        self.emit("    %copied = call i8* @memcpy(i8* %dest, i8* %src, i64 %count)")
+        self.emit("    ret i8* %dest")
+        self.emit("backward:")
+        self.emit("    %i = phi i64 [ %count, %entry ], [ %i_next, %copy ]")
+        self.emit("    %more = icmp ne i64 %i, 0")
+        self.emit("    br i1 %more, label %copy, label %done")
+        self.emit("copy:")
+        self.emit("    %i_next = sub i64 %i, 1")
+        self.emit("    %from = getelementptr i8, i8* %src, i64 %i_next")
+        self.emit("    %byte = load i8, i8* %from")
+        self.emit("    %to = getelementptr i8, i8* %dest, i64 %i_next")
+        self.emit("    store i8 %byte, i8* %to")
+        self.emit("    br label %backward")
+        self.emit("done:")
+        self.emit("    ret i8* %dest")
+        self.emit("}")
+
+def compile_file(input_filename, output_filename=None, opt_level=0, target=None, precompute=None,
+                 debug_info=False, keep_temp=False, freestanding=False):
+    # Default output filename is input filename without extension
+    if output_filename is None:
+        output_filename = os.path.splitext(input_filename)[0]
+    
+    host = host_target_triple()
+    target = target or host
+    
+    # Read source file
+    with open(input_filename, 'r') as f:
+        source = f.read()
+    
+    # Tokenize
+    lexer = Lexer(source)
+    tokens = lexer.tokenize()
+    
+    # Parse
+    parser = Parser(tokens)
+    ast = parser.parse()
+    
+    precomputed = precompute_output(ast, precompute) if precompute else None
+    try:
+        compiler = LLVMCompiler(target, input_filename if debug_info else None, freestanding)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    def generate(output):
+        if precomputed is not None:
+            compiler.generate_precomputed(precomputed, output)
+        else:
+            compiler.compile(ast, output)
+    
+    # Compile using LLVM tools
+    try:
+        # Check if LLVM tools are available
+        if shutil.which("llc") is None:
+            print("Error: LLVM compiler tools are not installed or not in PATH")
+            print("Please install the LLVM toolchain for your system")
+            sys.exit(1)
+    
+        with BuildDirectory(output_filename, keep_temp) as build:
+            # The IR is piped through opt and llc as it is generated; keep_temp
+            # runs them on files instead so the .ll and .bc can be kept
+            object_filename = build.path('.o')
+            # Freestanding executables are static and not position independent
+            relocation_model = "static" if freestanding else "pic"
+            commands = [["llc", f"-O{opt_level}", f"-mtriple={target}", f"-relocation-model={relocation_model}",
+                         "-filetype=obj", "-o", object_filename, "-"]]
+            files = [build.path('.ll')]
+            if opt_level > 0:
+                # Run the optimization pipeline before code generation
+                print(f"Optimizing LLVM IR (-O{opt_level})...")
+                commands.insert(0, ["opt", f"-O{opt_level}", "-o", "-", "-"])
+                files.append(build.path('.bc'))
+            
+            print("Compiling LLVM IR to object file...")
+            run_pipeline(commands, generate, files if keep_temp else None)
+            
+            print("Linking...")
+            if freestanding:
+                # No libc or dynamic loader: ld links the object on its own
+                linker = "ld" if target == host else f"{target.split('-')[0]}-linux-gnu-ld"
+                subprocess.run([linker, "-static", "-o", output_filename, object_filename], check=True)
+            else:
+                # Cross targets need the matching gcc driver, e.g. aarch64-linux-gnu-gcc
+                linker = "gcc" if target == host else f"{target.split('-')[0]}-linux-gnu-gcc"
+                subprocess.run([linker, "-o", output_filename, object_filename], check=True)
+        
+        print(f"Executable created: {output_filename}")
+        
+        # Make the file executable
+        os.chmod(output_filename, 0o755)
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"Compilation error: {e}")
+        sys.exit(1)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.llvm_compiler <input_file> [output_file] [-O0..-O3] [--precompute] [-g] [--keep-temp] [--freestanding]")
+        sys.exit(1)
+    
+    input_filename = sys.argv[1]
+    output_filename = None
+    opt_level = 0
+    precompute = None
+    debug_info = False
+    keep_temp = False
+    freestanding = False
+    
+    for arg in sys.argv[2:]:
+        if arg in ('-O0', '-O1', '-O2', '-O3'):
+            opt_level = int(arg[2])
+        elif arg == '--precompute':
+            precompute = (DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS)
+        elif arg == '-g':
+            debug_info = True
+        elif arg == '--keep-temp':
+            keep_temp = True
+        elif arg == '--freestanding':
+            freestanding = True
+        elif output_filename is None:
+            output_filename = arg
+    
+    compile_file(input_filename, output_filename, opt_level, precompute=precompute, debug_info=debug_info,
+                 keep_temp=keep_temp, freestanding=freestanding)
+
+if __name__ == "__main__":
+    main()
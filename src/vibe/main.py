@@ -0,0 +1,72 @@
+import sys
+from .tokenizer import Lexer
+from .parser import Parser
+from .interpreter import Interpreter
+
+def run_file(filename, jit=False, quiet=False, cse=False):
+    with open(filename, 'r') as f:
+        source = f.read()
+    if jit:
+        # Compile to x86-64 machine code in memory and run it directly
+        from .jit import run as run_jit
+        try:
+            run_jit(source)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif quiet:
+        run_quiet(source, cse)
+    else:
+        run(source, cse)
+
+def run_quiet(source, cse=False):
+    """Interpret source printing only the program's own output."""
+    try:
+        Interpreter(cse).interpret(Parser(Lexer(source).tokenize()).parse())
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def run(source, cse=False):
+    try:
+        print("Tokenizing source...")
+        lexer = Lexer(source)
+        tokens = lexer.tokenize()
+        for token in tokens:
+            print(f"  {token}")
+        
+        print("Parsing tokens...")
+        parser = Parser(tokens)
+        ast = parser.parse()
+        print(f"AST: {type(ast)}")
+        
+        print("Interpreting AST...")
+        interpreter = Interpreter(cse)
+        result = interpreter.interpret(ast)
+        print(f"Result: {result}")
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        print(f"Error: {e}")
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    jit = '--jit' in args
+    if jit:
+        args.remove('--jit')
+    quiet = '--quiet' in args
+    if quiet:
+        args.remove('--quiet')
+    # -O evaluates repeated additions once, as the compiled engines always do
+    cse = '-O' in args
+    if cse:
+        args.remove('-O')
+    if args:
+        run_file(args[0], jit, quiet, cse)
+    else:
+        # Interactive REPL mode, keeping variables between entries
+        from .repl import repl
+        repl()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/output_sink.py
+
+import io
+import shutil
+import tempfile
+from .pipeline import temp_root
+
+# Generated lines held in memory before they are written out
+FLUSH_LINES = 4096
+
+class OutputSink:
+    """Buffered destination for generated assembly or IR.
+
+    Code lines are written to output as soon as the generator hands them
+    over. Data lines are spooled to a temporary file and appended after
+    the code by close(), because a program's data is only complete once
+    all of its code has been generated. The spool lives under temp_root(),
+    in memory where the system has a RAM-backed temp directory. Neither is kept in memory, so
+    compiling a bigger program does not take more memory for its output.
+    Without an output file the result is collected in a string instead.
+    """
+    def __init__(self, output=None):
+        self.output = output if output is not None else io.StringIO()
+        self.data = tempfile.TemporaryFile('w+', encoding='utf-8', dir=temp_root())
+
+    def write(self, lines):
+        for line in lines:
+            self.output.write(line)
+            self.output.write('\n')
+
+    def write_data(self, lines):
+        for line in lines:
+            self.data.write(line)
+            self.data.write('\n')
+
+    def close(self):
+        """Append the spooled data; returns the text when there is no output file."""
+        self.data.seek(0)
+        shutil.copyfileobj(self.data, self.output)
+        self.data.close()
+        if isinstance(self.output, io.StringIO):
+            return self.output.getvalue()
+        return None
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/peephole.py
+
+import re
+
+# Registers a bl may clobber under the AArch64 calling convention
+CALL_CLOBBERED = {f"x{i}" for i in range(19)} | {'x30'}
+CALL_ARGUMENTS = {f"x{i}" for i in range(8)}
+SYSCALL_ARGUMENTS = {f"x{i}" for i in range(9)}
+ALL_REGISTERS = {f"x{i}" for i in range(31)}
+
+# Instructions with no effect besides writing their destination registers
+PURE = {'mov', 'adrp', 'add', 'sub', 'ldr', 'ldp'}
+
+REGISTER_PATTERN = re.compile(r'^[xw](\d+)$')
+
+def register(operand):
+    """Canonical x-register name of an operand, or None for sp/zr/immediates."""
+    match = REGISTER_PATTERN.match(operand.strip().lower())
+    if not match or int(match.group(1)) > 30:
+        return None
+    return f"x{match.group(1)}"
+
+def rename(operand, new):
+    """Rename a register operand, keeping its w/x width."""
+    return operand.strip()[0] + new[1:]
+
+class Instruction:
+    """One parsed assembly line; comments and labels are kept but never analysed."""
+    def __init__(self, line):
+        self.line = line
+        text = line.split('//')[0].strip()
+        self.mnemonic = None
+        self.operands = []
+        if not text or text.startswith('.'):
+            return
+        if text.endswith(':'):
+            self.mnemonic = ':'
+            return
+        parts = text.split(None, 1)
+        self.mnemonic = parts[0].lower()
+        if len(parts) > 1:
+            self.operands = split_operands(parts[1])
+
+    def render(self):
+        if self.operands:
+            self.line = f"    {self.mnemonic} {', '.join(self.operands)}"
+        else:
+            self.line = f"    {self.mnemonic}"
+        return self
+
+    @property
+    def is_code(self):
+        return self.mnemonic is not None
+
+    def address(self):
+        """(base register, offset, writeback) of a memory operand."""
+        for i, operand in enumerate(self.operands):
+            if operand.startswith('['):
+                inner = operand.rstrip('!')[1:-1].split(',')
+                base = inner[0].strip()
+                offset = inner[1].strip() if len(inner) > 1 else '#0'
+                writeback = operand.endswith('!') or i + 1 < len(self.operands)
+                return base, offset, writeback
+        return None
+
+    def reads(self):
+        m = self.mnemonic
+        ops = self.operands
+        if m == 'bl':
+            return set(CALL_ARGUMENTS)
+        if m == 'svc':
+            return set(SYSCALL_ARGUMENTS)
+        if m in ('ldr', 'ldp', 'ldrb'):
+            address = self.address()
+            return {register(address[0])} - {None} if address else set()
+        if m in ('str', 'stp', 'strb'):
+            count = 2 if m == 'stp' else 1
+            values = {register(op) for op in ops[:count]}
+            return (values | {register(self.address()[0])}) - {None}
+        if m in ('mov', 'adrp'):
+            return {register(ops[1])} - {None}
+        if m in ('add', 'sub', 'cmp'):
+            return {register(op) for op in (ops[1:] if m != 'cmp' else ops)} - {None}
+        return set(ALL_REGISTERS)
+
+    def writes(self):
+        m = self.mnemonic
+        ops = self.operands
+        if m == 'bl':
+            return set(CALL_CLOBBERED)
+        if m == 'svc':
+            return {'x0'}
+        if m in ('mov', 'adrp', 'add', 'sub', 'ldr', 'ldrb'):
+            written = {register(ops[0])}
+        elif m == 'ldp':
+            written = {register(ops[0]), register(ops[1])}
+        elif m in ('str', 'stp', 'strb', 'cmp'):
+            written = set()
+        else:
+            return set(ALL_REGISTERS)
+        address = self.address() if m in ('ldr', 'ldp', 'ldrb', 'str', 'stp', 'strb') else None
+        if address and address[2]:
+            written.add(register(address[0]))
+        return written - {None}
+
+    @property
+    def is_barrier(self):
+        """Labels, branches and anything unrecognised end a basic block."""
+        return self.mnemonic not in PURE | {'str', 'stp', 'strb', 'ldrb', 'bl', 'svc', 'cmp'}
+
+def split_operands(text):
+    operands = []
+    depth = 0
+    current = ''
+    for char in text:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        if char == ',' and depth == 0:
+            operands.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        operands.append(current.strip())
+    return operands
+
+class PeepholeOptimizer:
+    """Local cleanups over the AArch64 line lists emitted by the code generators.
+
+    Works one basic block at a time and repeats until nothing changes:
+    - forward_values: skip re-materialising an address, immediate or copy a
+      register already holds, and forward a variable's stored registers to
+      later loads
+    - coalesce_moves: compute a value straight into the register a following
+      mov copies it to
+    - remove_dead: drop side-effect free instructions whose results are unused
+    """
+    def __init__(self, lines):
+        self.code = [Instruction(line) for line in lines]
+
+    def instructions(self):
+        return [i for i in self.code if i.is_code]
+
+    def delete(self, instruction):
+        self.code.remove(instruction)
+
+    def forward_values(self):
+        changed = False
+        values = {}
+        memory = {}
+        code = self.instructions()
+        index = 0
+        while index < len(code):
+            ins = code[index]
+            index += 1
+            if ins.is_barrier:
+                values.clear()
+                memory.clear()
+                continue
+            m, ops = ins.mnemonic, ins.operands
+            known = None
+            dest = register(ops[0]) if ops else None
+
+            if m == 'adrp':
+                symbol = ops[1]
+                nxt = code[index] if index < len(code) else None
+                pairs_with_add = (nxt is not None and nxt.mnemonic == 'add' and register(nxt.operands[0]) == dest
+                                  and register(nxt.operands[1]) == dest and nxt.operands[2] == f":lo12:{symbol}")
+                if values.get(dest) == ('addr', symbol) and pairs_with_add:
+                    self.delete(ins)
+                    self.delete(nxt)
+                    index += 1
+                    changed = True
+                    continue
+                if values.get(dest) == ('page', symbol):
+                    self.delete(ins)
+                    changed = True
+                    continue
+                known = ('page', symbol)
+            elif m == 'add' and values.get(dest, (None,))[0] == 'page' and register(ops[1]) == dest \
+                    and ops[2] == f":lo12:{values[dest][1]}":
+                known = ('addr', values[dest][1])
+            elif m == 'mov' and ops[1].startswith('#') and dest:
+                if values.get(dest) == ('imm', ops[1]):
+                    self.delete(ins)
+                    changed = True
+                    continue
+                known = ('imm', ops[1])
+            elif m == 'mov' and dest and register(ops[1]) and ops[0][0] == ops[1][0] == 'x':
+                source = register(ops[1])
+                if values.get(dest) == ('reg', source) or values.get(source) == ('reg', dest):
+                    # Copying a register back to where its value came from
+                    self.delete(ins)
+                    changed = True
+                    continue
+                known = ('reg', source)
+            elif m in ('ldr', 'ldp'):
+                moves = self.forward_load(ins, memory.get(self.memory_key(ins, values)))
+                if moves is not None:
+                    # Copy the registers that were stored there instead of reloading
+                    position = self.code.index(ins)
+                    self.delete(ins)
+                    index -= 1
+                    code.pop(index)
+                    for offset, (target, source) in enumerate(moves):
+                        move = Instruction(f"    mov {target}, {source}")
+                        self.code.insert(position + offset, move)
+                        code.insert(index + offset, move)
+                    changed = True
+                    continue
+
+            # Registers written here no longer hold what we knew about them
+            for written in ins.writes():
+                values.pop(written, None)
+                for copy in [r for r, value in values.items() if value == ('reg', written)]:
+                    del values[copy]
+                for key in [k for k, stored in memory.items() if k[0] == written
+                            or written in (register(op) for op in stored)]:
+                    del memory[key]
+            if known:
+                values[dest] = known
+
+            if m in ('bl', 'svc', 'strb'):
+                # Calls and byte stores may write any variable
+                memory.clear()
+            elif m in ('str', 'stp', 'ldr', 'ldp'):
+                key = self.memory_key(ins, values)
+                if key is None:
+                    if m in ('str', 'stp'):
+                        memory.clear()
+                    continue
+                if m in ('str', 'stp'):
+                    for other in [k for k in memory if k[0] == key[0]]:
+                        del memory[other]
+                count = 2 if m in ('stp', 'ldp') else 1
+                memory[key] = tuple(ops[:count])
+        return changed
+
+    def forward_load(self, ins, stored):
+        """Moves that replace a load from memory whose stored registers are still live."""
+        if stored is None:
+            return None
+        targets = ins.operands[:2 if ins.mnemonic == 'ldp' else 1]
+        if len(targets) != len(stored) or any(t[0] != s[0] for t, s in zip(targets, stored)):
+            return None
+        moves = [(t, s) for t, s in zip(targets, stored) if register(t) != register(s)]
+        if len(moves) == 2 and register(moves[0][0]) == register(moves[1][1]):
+            # The first move would overwrite the second's source
+            return None
+        return moves
+
+    def memory_key(self, ins, values):
+        """Identify the memory a load or store touches: a symbol, or the frame pointer."""
+        address = ins.address()
+        if not address or address[2]:
+            return None
+        base = register(address[0])
+        if values.get(base, (None,))[0] == 'addr':
+            return (values[base][1], address[1])
+        if base == 'x29':
+            return ('x29', address[1])
+        return None
+
+    def live_after(self, code, index, reg):
+        """Is reg read before being overwritten, from code[index] to the end of the block?"""
+        for ins in code[index:]:
+            if ins.is_barrier or reg in ins.reads():
+                return True
+            if reg in ins.writes():
+                return False
+        return True
+
+    def coalesce_moves(self):
+        changed = False
+        code = self.instructions()
+        i = 0
+        while i < len(code):
+            ins = code[i]
+            i += 1
+            if ins.mnemonic != 'mov' or ins.operands[1].startswith('#'):
+                continue
+            dest, source = register(ins.operands[0]), register(ins.operands[1])
+            if not dest or not source:
+                continue
+            if dest == source and ins.operands[0][0] == 'x':
+                self.delete(ins)
+                i -= 1
+                code.pop(i)
+                changed = True
+                continue
+
+            # Find the instruction that produced source, with neither register touched since
+            j = i - 2
+            while j >= 0 and not code[j].is_barrier and source not in code[j].writes():
+                if {source, dest} & (code[j].reads() | code[j].writes()):
+                    break
+                j -= 1
+            if j < 0 or code[j].is_barrier or source not in code[j].writes():
+                continue
+            producer = code[j]
+            if producer.mnemonic not in PURE or dest in producer.writes():
+                continue
+            if producer.address() and producer.address()[2]:
+                continue
+            targets = [op for op in producer.operands[:2 if producer.mnemonic == 'ldp' else 1]
+                       if register(op) == source]
+            if targets[0][0] != ins.operands[0][0] or self.live_after(code, i, source):
+                continue
+
+            # An adrp/add pair is renamed together; otherwise only the destination
+            if source in producer.reads():
+                if not (producer.mnemonic == 'add' and j > 0 and code[j - 1].mnemonic == 'adrp'
+                        and register(code[j - 1].operands[0]) == source
+                        and register(producer.operands[1]) == source):
+                    renamed = [(producer, 0)]
+                else:
+                    renamed = [(code[j - 1], 0), (producer, 0), (producer, 1)]
+            else:
+                renamed = [(producer, producer.operands.index(op)) for op in targets]
+            for member, k in renamed:
+                member.operands[k] = rename(member.operands[k], dest)
+                member.render()
+            self.delete(ins)
+            i -= 1
+            code.pop(i)
+            changed = True
+        return changed
+
+    def remove_dead(self):
+        changed = False
+        code = self.instructions()
+        live = set(ALL_REGISTERS)
+        for ins in reversed(code):
+            if ins.is_barrier:
+                live = set(ALL_REGISTERS)
+                continue
+            writes = ins.writes()
+            pure = ins.mnemonic in PURE and not (ins.address() and ins.address()[2])
+            if pure and writes and not writes & live:
+                self.delete(ins)
+                changed = True
+                continue
+            live = (live - writes) | ins.reads()
+        return changed
+
+    def optimize(self):
+        while self.forward_values() | self.coalesce_moves() | self.remove_dead():
+            pass
+        return [ins.line for ins in self.code]
+
+def count_instructions(lines):
+    """Number of instructions in a line list, not counting labels, directives or comments."""
+    return sum(1 for ins in map(Instruction, lines) if ins.is_code and ins.mnemonic != ':')
+
+def optimize(lines):
+    """Return an optimized copy of an AArch64 assembly line list."""
+    return PeepholeOptimizer(lines).optimize()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/pipeline.py
+
+import io
+import os
+import shutil
+import tempfile
+import subprocess
+
+# Directories for intermediate files, tried in order; the first is RAM-backed on Linux
+TEMP_ROOTS = ['/dev/shm', os.environ.get('XDG_RUNTIME_DIR')]
+
+# Bytes of generated text buffered before they are written to the pipe
+PIPE_BUFFER = 1024 * 1024
+
+def temp_root():
+    """The directory build directories are created in: RAM-backed when there is one."""
+    for directory in TEMP_ROOTS:
+        if directory and os.path.isdir(directory) and os.access(directory, os.W_OK | os.X_OK):
+            return directory
+    return tempfile.gettempdir()
+
+class BuildDirectory:
+    """Private directory for the intermediate files of one build.
+
+    Object files, and assembly or IR when they are written out at all, go
+    to a directory only this build uses under temp_root(), so parallel
+    builds never share names and nothing is written next to the output.
+    On exit the directory is removed; with keep_temp its files are first
+    copied next to the output as <output>.s, <output>.o and so on.
+    """
+    def __init__(self, output_filename, keep_temp=False):
+        self.output_filename = output_filename
+        self.keep_temp = keep_temp
+        self.directory = None
+
+    def __enter__(self):
+        self.directory = tempfile.mkdtemp(prefix='vibe-', dir=temp_root())
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if self.keep_temp:
+                for name in sorted(os.listdir(self.directory)):
+                    kept = self.output_filename + os.path.splitext(name)[1]
+                    shutil.copyfile(os.path.join(self.directory, name), kept)
+                    print(f"Kept temporary file: {kept}")
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        return False
+
+    def path(self, suffix):
+        """Path of the build's intermediate file with the given suffix."""
+        return os.path.join(self.directory, 'program' + suffix)
+
+def run_pipeline(commands, generate, files=None):
+    """Run commands connected by pipes, the first reading the text generate writes.
+
+    generate(stream) is called with the first command's standard input, so
+    the tool reads the program while it is still being generated and the
+    text never touches the disk. In the commands '-' stands for standard
+    input, and '-o -' for standard output feeding the next command.
+
+    With files, a list of one path per command, each stage instead reads
+    the file before it: the text goes to files[0], and '-o -' of command
+    i is replaced by files[i + 1], so every intermediate file can be kept.
+
+    Raises subprocess.CalledProcessError when a command fails.
+    """
+    if files is not None:
+        with open(files[0], 'w', encoding='utf-8') as f:
+            generate(f)
+        for i, command in enumerate(commands):
+            stage = list(command)
+            for j, arg in enumerate(stage):
+                if arg == '-':
+                    stage[j] = files[i + 1] if stage[j - 1] == '-o' else files[i]
+            subprocess.run(stage, check=True)
+        return
+
+    processes = []
+    try:
+        stdin = subprocess.PIPE
+        for i, command in enumerate(commands):
+            last = i == len(commands) - 1
+            process = subprocess.Popen(command, stdin=stdin, stdout=None if last else subprocess.PIPE,
+                                       bufsize=PIPE_BUFFER)
+            if processes:
+                # Only the next command holds the read end, so it sees end of file
+                processes[-1].stdout.close()
+            processes.append(process)
+            stdin = process.stdout
+
+        stream = io.TextIOWrapper(processes[0].stdin, encoding='utf-8')
+        try:
+            generate(stream)
+            stream.close()
+        except BrokenPipeError:
+            # The tool stopped reading; its exit status below says why
+            try:
+                stream.close()
+            except BrokenPipeError:
+                pass
+    except BaseException:
+        # Generation failed, so the tools must not finish with half a program
+        for process in processes:
+            process.kill()
+            process.wait()
+        raise
+
+    for command, process in zip(commands, processes):
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/precompute.py
+
+import time
+from .interpreter import Interpreter
+
+# Budgets for evaluating a program at build time; past either it is compiled as usual
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_SECONDS = 1.0
+
+# Numbers in compiled programs are unsigned 64-bit integers
+NUM_MIN, NUM_MAX = 0, 2**64 - 1
+
+# Bytes per .ascii directive
+ASCII_CHUNK = 64
+
+class PrecomputingInterpreter(Interpreter):
+    """Interpreter that collects the program's output instead of printing it.
+
+    Evaluates programs the way the compiled backends run them, and gives up
+    with an exception once the output or any string it builds passes
+    max_bytes, a statement finishes after max_seconds, or a number leaves
+    the range the compiled backends can hold.
+    """
+    def __init__(self, max_bytes, max_seconds):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.deadline = time.perf_counter() + max_seconds
+        self.max_seconds = max_seconds
+        self.output = bytearray()
+
+    def visit_Num(self, node):
+        if not NUM_MIN <= node.value <= NUM_MAX:
+            raise Exception(f"{node.value} does not fit in 64 bits")
+        return node.value
+
+    def visit_BinOp(self, node):
+        if node.op.type != 'PLUS':
+            raise Exception(f"Unknown operator: {node.op.type}")
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(left, str) or isinstance(right, str):
+            # As in the compiled backends, a number added to a string is converted
+            value = f"{left}{right}"
+        else:
+            value = left + right
+        if isinstance(value, int) and not NUM_MIN <= value <= NUM_MAX:
+            raise Exception(f"{value} does not fit in 64 bits")
+        if isinstance(value, str) and len(value) > self.max_bytes:
+            raise Exception(f"a string is longer than the {self.max_bytes} byte budget")
+        return value
+
+    def visit_HollaStmt(self, node):
+        value = self.visit(node.expr)
+        self.output += f"{value}\n".encode('utf-8')
+        if len(self.output) > self.max_bytes:
+            raise Exception(f"output is larger than the {self.max_bytes} byte budget")
+        return None
+
+    def interpret(self, tree):
+        for statement in (tree if isinstance(tree, list) else [tree]):
+            self.visit(statement)
+            if time.perf_counter() > self.deadline:
+                raise Exception(f"evaluation took longer than {self.max_seconds}s")
+        return bytes(self.output)
+
+def precompute_output(ast, budget):
+    """Evaluate a program at build time.
+
+    budget is (max_bytes, max_seconds). Returns everything the program
+    prints, or None (saying why) when it has to be compiled as usual.
+    """
+    max_bytes, max_seconds = budget
+    try:
+        output = PrecomputingInterpreter(max_bytes, max_seconds).interpret(ast)
+    except Exception as e:
+        print(f"Not precomputing: {e}; generating code instead")
+        return None
+    print(f"Precomputed {len(output)} bytes of output")
+    return output
+
+def ascii_directives(data):
+    """Assembler .ascii lines holding data exactly, with no terminator."""
+    lines = []
+    for start in range(0, len(data), ASCII_CHUNK):
+        chunk = data[start:start + ASCII_CHUNK]
+        text = ''.join(chr(b) if 32 <= b < 127 and b not in (34, 92) else f"\\{b:03o}" for b in chunk)
+        lines.append(f'    .ascii "{text}"')
+    return lines
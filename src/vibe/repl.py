@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/repl.py
+
+import time
+import tracemalloc
+from .tokenizer import Lexer
+from .parser import Parser
+from .interpreter import Interpreter
+
+# Tokens that cannot end a statement, so the entry continues on the next line
+CONTINUATION_TOKENS = ('PLUS', 'ASSIGN', 'HOLLA')
+
+PROMPT = ">>> "
+CONTINUATION_PROMPT = "... "
+
+class ReplSession:
+    """One interactive session: its variables persist across entries.
+
+    Each entry is tokenized and parsed on its own, numbered after the lines
+    before it, and only its statements are run, against the interpreter
+    state left by the earlier entries. Nothing is re-run, re-parsed or kept
+    once run, so an entry costs the same however long the session has been
+    going.
+    """
+    def __init__(self):
+        self.interpreter = Interpreter()
+        self.line = 1
+        self.pending = []           # lines of an entry that is not complete yet
+        self.show_time = False
+        self.show_memory = False
+
+    def needs_more(self, source):
+        """Whether source stops partway through a statement."""
+        try:
+            tokens = Lexer(source, self.line).tokenize()
+        except Exception as e:
+            return str(e).startswith("Unterminated string")
+        return len(tokens) > 1 and tokens[-2].type in CONTINUATION_TOKENS
+
+    def feed(self, line):
+        """Take one line of input; returns False once the session should end.
+
+        Lines are collected until they make a complete entry, or a blank
+        line ends an incomplete one so its error is reported. Blank lines
+        between entries are skipped without counting as source lines.
+        """
+        if not self.pending:
+            stripped = line.strip()
+            if not stripped:
+                # Nothing was typed, so there is nothing to run or report
+                return True
+            if stripped == "exit()":
+                return False
+            if stripped.startswith(':'):
+                self.command(stripped)
+                return True
+        if line.strip():
+            self.pending.append(line)
+        source = '\n'.join(self.pending)
+        if line.strip() and self.needs_more(source):
+            return True
+        self.pending = []
+        self.execute(source)
+        return True
+
+    def execute(self, source):
+        """Parse and run one complete entry, reporting its cost when asked."""
+        if self.show_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            statements = Parser(Lexer(source, self.line).tokenize()).parse()
+            for statement in statements:
+                self.interpreter.visit(statement)
+        except Exception as e:
+            print(f"Error: {e}")
+        elapsed = time.perf_counter() - start
+        self.line += source.count('\n') + 1
+
+        if self.show_time:
+            print(f"[time] {elapsed * 1000:.3f}ms")
+        if self.show_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"[mem] {(current - before) / 1024:+.1f}KB retained, {(peak - before) / 1024:.1f}KB peak, "
+                  f"{current / 1024:.1f}KB traced since :mem")
+
+    def command(self, text):
+        """Run a meta-command."""
+        name = text.split()[0]
+        if name == ':time':
+            self.show_time = not self.show_time
+            print(f"Timing {'on' if self.show_time else 'off'}")
+        elif name == ':mem':
+            # tracemalloc slows allocation down, so it only runs while reporting
+            self.show_memory = not self.show_memory
+            if self.show_memory:
+                tracemalloc.start()
+            else:
+                tracemalloc.stop()
+            print(f"Memory reporting {'on' if self.show_memory else 'off'}")
+        elif name == ':vars':
+            for var_name, value in self.interpreter.variables.items():
+                print(f"{var_name} = {value!r}")
+        elif name == ':help':
+            print(":time   toggle reporting how long each entry takes")
+            print(":mem    toggle reporting the memory each entry allocates")
+            print(":vars   show the session's variables")
+            print("exit()  leave the REPL")
+        else:
+            print(f"Unknown command: {name} (try :help)")
+
+def repl():
+    """Read entries from the terminal until exit() or end of input."""
+    print("Vibe Language Interpreter (REPL)")
+    print("Type 'exit()' to exit, ':help' for commands")
+    session = ReplSession()
+    while True:
+        try:
+            line = input(CONTINUATION_PROMPT if session.pending else PROMPT)
+        except EOFError:
+            print()
+            break
+        except KeyboardInterrupt:
+            # Abandon the entry being typed
+            print()
+            session.pending = []
+            continue
+        if not session.feed(line):
+            break
+
+if __name__ == "__main__":
+    repl()
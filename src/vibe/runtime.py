@@ -0,0 +1,20 @@
+# Settings shared by the generated runtimes of every backend
+
+# Size of the first chunk the runtime arena maps; later chunks double in size
+ARENA_CHUNK_SIZE = 1024 * 1024
+
+# Size of the runtime's stdout buffer, flushed when full and before exit
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# Environment variable that switches the runtime to flushing after every line
+LINE_BUFFERED_ENV = "VIBE_LINE_BUFFERED"
+
+# Number formatting: "00" to "99" for two digits at a time, the powers of ten that
+# correct a digit count estimated from the bit length, and x // 100 as
+# umulh(x >> 2, DIVIDE_BY_100) >> 2, exact for every unsigned 64-bit x
+DIGIT_PAIRS = ''.join(f"{i:02d}" for i in range(100))
+POWERS_OF_TEN = [10 ** i for i in range(20)]
+DIVIDE_BY_100 = 0x28F5C28F5C28F5C3
+
+# Longest number a conversion writes, 18446744073709551615
+NUMBER_MAX_LENGTH = 20
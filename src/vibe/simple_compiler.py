@@ -0,0 +1,959 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/simple_compiler.py
+
+import io
+import sys
+import os
+import subprocess
+from .tokenizer import Lexer
+from .parser import Parser
+from .runtime import ARENA_CHUNK_SIZE, OUTPUT_BUFFER_SIZE, LINE_BUFFERED_ENV
+from .runtime import DIGIT_PAIRS, POWERS_OF_TEN, DIVIDE_BY_100, NUMBER_MAX_LENGTH
+from .type_inference import NUM
+from .ir import lower, OPCODE_NAMES
+from .peephole import optimize
+from .literal_pool import LiteralPool
+from .output_sink import OutputSink, FLUSH_LINES
+from .pipeline import BuildDirectory, run_pipeline
+from .debug_info import file_directive, loc_directive, annotate_functions, end_function
+from .precompute import precompute_output, ascii_directives, DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS
+
+# Runtime helpers, in the order they are written, and the program's entry point
+RUNTIME_FUNCTIONS = ('init_stdout', 'flush_stdout', 'arena_alloc', 'string_release', 'format_number',
+                     'num_to_string', 'copy_bytes', 'print_string', 'string_concat', 'string_concat_owned', 'string_concat_n',
+                     '_start')
+
+class ARMCodeGenerator:
+    def __init__(self, opt_level=0, source_file=None):
+        self.opt_level = opt_level
+        self.source_file = source_file      # set for -g: .loc directives for its lines
+        self.literals = LiteralPool(".LC{}")
+        self.variables = {}
+        self.assembly = []
+    
+    def emit(self, instruction):
+        self.assembly.append(instruction)
+    
+    def generate(self, ast, output=None):
+        """Generate the program's assembly, writing it to output as it goes.
+
+        The program is written out a window of FLUSH_LINES lines at a time
+        (each optimized on its own at -O1), then its data, which is only
+        complete at the end. Without output the assembly is returned.
+        """
+        return self.generate_ir(lower(ast), output)
+    
+    def generate_ir(self, program, output=None):
+        """Generate assembly for an IRProgram, as generate() does for an AST.
+
+        A statement's temporaries are a stack: the top one is in x0 (and
+        its length in x1), the one below it in x19 (and x20). The pieces of
+        a JOIN wait on the machine stack instead.
+        """
+        self.program = program
+        self.joined = bytearray(len(program.temp_types))
+        for temp in program.pieces:
+            self.joined[temp] = 1
+        self.literals.collect(program)
+        for slot in range(len(program.slots)):
+            self.variables[slot] = f"var_{slot}"
+        self.stack = []
+        self.sink = OutputSink(output)
+        
+        # Runtime helpers first, then the program from _start
+        if self.source_file:
+            self.sink.write([file_directive(self.source_file)])
+        self.sink.write(annotate_functions(self.get_runtime_code(), RUNTIME_FUNCTIONS))
+        
+        # Find envp above argv and check whether stdout should be line buffered
+        self.emit("    ldr x0, [sp]")              # argc
+        self.emit("    add x0, x0, #2")
+        self.emit("    add x0, sp, x0, lsl #3")    # envp = sp + 8 * (argc + 2)
+        self.emit("    bl init_stdout")
+        
+        # One method per opcode
+        handlers = [getattr(self, f"generate_{name}") for name in OPCODE_NAMES]
+        current_line = 0
+        for op, dest, arg1, arg2, line in program.located_instructions():
+            if line != current_line and self.source_file:
+                # Attribute the statement's code to its source line
+                self.emit(loc_directive(line))
+                current_line = line
+            handlers[op](dest, arg1, arg2)
+            if not self.stack and len(self.assembly) >= FLUSH_LINES:
+                self.flush()
+        
+        # Generate exit code
+        self.emit("    // Flush buffered output and exit cleanly")
+        self.emit("    bl flush_stdout")
+        self.emit("    mov x0, #0")      # status = 0
+        self.emit("    mov x8, #93")     # exit syscall for ARM64
+        self.emit("    svc #0")
+        self.emit(end_function("_start"))
+        self.flush()
+        
+        # Data for the literals and variables the program used
+        self.sink.write_data(self.get_data_code())
+        return self.sink.close()
+    
+    def generate_precomputed(self, data, output=None):
+        """Assembly for a program whose whole output, data, is known at build time.
+
+        It writes data to stdout in as few write syscalls as the kernel
+        allows and exits; nothing else of the runtime is needed.
+        """
+        sink = OutputSink(output)
+        sink.write([
+            ".arch armv8-a",
+            ".global _start",
+            ".text",
+            "_start:",
+            "    adrp x1, precomputed_output",
+            "    add x1, x1, :lo12:precomputed_output",
+            "    adrp x2, precomputed_end",
+            "    add x2, x2, :lo12:precomputed_end",
+            "    sub x2, x2, x1",            # bytes left to write
+            "precomputed_write:",
+            "    cbz x2, precomputed_exit",
+            "    mov x0, #1",                # stdout
+            "    mov x8, #64",               # write syscall for ARM64
+            "    svc #0",
+            "    cmp x0, #0",
+            "    b.le precomputed_fail",
+            "    add x1, x1, x0",            # short write: carry on after what was written
+            "    sub x2, x2, x0",
+            "    b precomputed_write",
+            "precomputed_exit:",
+            "    mov x0, #0",
+            "    mov x8, #93",               # exit syscall for ARM64
+            "    svc #0",
+            "precomputed_fail:",
+            "    mov x0, #1",
+            "    mov x8, #93",
+            "    svc #0",
+        ])
+        sink.write_data([".section .rodata", "precomputed_output:"] + ascii_directives(data) +
+                        ["precomputed_end:"])
+        return sink.close()
+    
+    def flush(self):
+        """Write out the code generated so far."""
+        if self.opt_level > 0:
+            self.assembly = optimize(self.assembly)
+        self.sink.write(self.assembly)
+        self.assembly = []
+    
+    def push(self, temp):
+        """Make room in x0 and x1 for a new temporary, saving the one there."""
+        if self.stack and self.joined[self.stack[-1]]:
+            # A piece of a JOIN: pairs pushed one after another make the array it reads
+            self.emit("    stp x1, x0, [sp, #-16]!")
+        elif self.stack:
+            if len(self.stack) > 1 and not self.joined[self.stack[-2]]:
+                raise Exception("Expression needs more than two temporaries at once")
+            self.emit("    mov x19, x0")  # Save left operand
+            if self.program.temp_type(self.stack[-1]) != NUM:
+                self.emit("    mov x20, x1")  # and its length
+        self.stack.append(temp)
+    
+    def generate_CONST(self, dest, value, arg2):
+        self.push(dest)
+        self.emit(f"    // Load number {value}")
+        self.load_immediate("x0", value)
+    
+    def generate_STRING(self, dest, literal, arg2):
+        self.push(dest)
+        value = self.program.literals[literal]
+        string_label = self.literals.symbol(value)
+        self.emit(f"    // Load string {value!r}")
+        self.emit(f"    adrp x0, {string_label}")
+        self.emit(f"    add x0, x0, :lo12:{string_label}")
+        self.load_immediate("x1", len(value.encode('utf-8')))
+    
+    def generate_LOAD(self, dest, slot, arg2):
+        self.push(dest)
+        var_label = self.variables[slot]
+        var_name, value_type = self.program.slots[slot]
+        self.emit(f"    // Load variable {var_name}")
+        self.emit(f"    adrp x2, {var_label}")
+        self.emit(f"    add x2, x2, :lo12:{var_label}")
+        if value_type == NUM:
+            self.emit("    ldr x0, [x2]")
+        else:
+            self.emit("    ldp x0, x1, [x2]")
+    
+    def generate_STORE(self, dest, slot, value):
+        self.stack.pop()
+        var_label = self.variables[slot]
+        var_name, value_type = self.program.slots[slot]
+        
+        # Store result to variable: numbers are a bare integer, strings a pointer and length
+        self.emit(f"    // Assign to {var_name}")
+        self.emit(f"    adrp x2, {var_label}")
+        self.emit(f"    add x2, x2, :lo12:{var_label}")
+        if value_type == NUM:
+            self.emit("    str x0, [x2]")
+        else:
+            self.emit("    stp x0, x1, [x2]")
+    
+    def generate_ADD(self, dest, left, right):
+        del self.stack[-2:]
+        self.emit("    // Numeric addition")
+        self.emit("    add x0, x19, x0")
+        self.stack.append(dest)
+    
+    def generate_CONCAT(self, dest, left, right):
+        del self.stack[-2:]
+        self.emit("    // String concatenation")
+        self.emit("    mov x2, x0")   # Second arg: right string
+        self.emit("    mov x3, x1")   # and its length
+        self.emit("    mov x0, x19")  # First arg: left string
+        self.emit("    mov x1, x20")  # and its length
+        owned = self.program.owned[left] | self.program.owned[right] << 1
+        if owned:
+            # Operands read for the last time lend their storage to the result
+            self.emit(f"    mov x4, #{owned}")
+            self.emit("    bl string_concat_owned")
+        else:
+            self.emit("    bl string_concat")
+        self.stack.append(dest)
+    
+    def generate_TO_STRING(self, dest, value, arg2):
+        self.stack[-1] = dest
+        self.emit("    // Convert number to string")
+        self.emit("    bl num_to_string")
+    
+    def generate_PRINT(self, dest, value, arg2):
+        # Print the string (pointer in x0, length in x1)
+        self.stack.pop()
+        self.emit("    // Call print function")
+        if self.program.owned[value]:
+            # Nothing reads the string again; print_string keeps x19 and x20
+            self.emit("    mov x19, x0")
+            self.emit("    mov x20, x1")
+            self.emit("    bl print_string")
+            self.emit("    mov x0, x19")
+            self.emit("    mov x1, x20")
+            self.emit("    bl string_release")
+        else:
+            self.emit("    bl print_string")
+    
+    def generate_JOIN(self, dest, first, count):
+        # The last piece goes on top of the others: (length, pointer) pairs, last piece first
+        pieces = self.program.join_pieces(first, count)
+        del self.stack[-count:]
+        self.emit(f"    // Join {count} strings")
+        self.emit("    stp x1, x0, [sp, #-16]!")
+        self.emit("    mov x0, sp")
+        self.load_immediate("x1", count)
+        self.emit(f"    mov x2, #{self.program.owned[pieces[0]]}")
+        self.emit("    bl string_concat_n")
+        if 16 * count <= 0xfff:
+            self.emit(f"    add sp, sp, #{16 * count}")
+        else:
+            self.load_immediate("x9", 16 * count)
+            self.emit("    add sp, sp, x9")
+        self.stack.append(dest)
+    
+    def load_immediate(self, register, value):
+        # mov only takes 16-bit immediates; larger values go via the literal pool
+        if 0 <= value < 65536:
+            self.emit(f"    mov {register}, #{value}")
+        else:
+            self.emit(f"    ldr {register}, ={value}")
+    
+    def get_data_code(self):
+        # Data section, written after the program
+        result = []
+        result.append(".data")
+        
+        # String literals, one per distinct value, byte for byte so newlines and
+        # other control characters survive the assembler
+        for label, string in self.literals.stored.items():
+            result.append(f"{label}:")
+            result.extend(ascii_directives(string.encode('utf-8') + b'\0'))
+        
+        # Variables hold a pointer and a length (or a number and unused word)
+        result.append("    .balign 8")
+        for name, label in self.variables.items():
+            result.append(f"{label}:")
+            result.append("    .quad 0, 0")
+        
+        result.extend(runtime_data())
+        return result
+    
+    def get_runtime_code(self):
+        # Text section with helper functions, ahead of the program
+        return runtime_code() + ["_start:"]
+
+def runtime_code():
+    """The runtime helpers of the ARM64 backends, as assembly lines in the text section.
+
+    The program's _start follows them. Strings are passed as a pointer in
+    x0 and a length in x1; num_to_string and string_concat NUL-terminate
+    the strings they return. Output is buffered in out_buf and written
+    with raw syscalls, so nothing needs libc.
+    """
+    result = []
+    result.append(".arch armv8-a")
+    result.append(".global _start")
+    result.append(".text")
+
+    # Scan the environment (x0 = envp) for VIBE_LINE_BUFFERED set to anything but 0
+    result.append("init_stdout:")
+    result.append("    ldr x1, [x0], #8")    # Next environment string
+    result.append("    cbz x1, init_stdout_done")
+    result.append("    adrp x2, line_buffered_env")
+    result.append("    add x2, x2, :lo12:line_buffered_env")
+    result.append("init_stdout_compare:")
+    result.append("    ldrb w3, [x2], #1")
+    result.append("    cbz w3, init_stdout_match") # Whole name matched
+    result.append("    ldrb w4, [x1], #1")
+    result.append("    cmp w3, w4")
+    result.append("    b.eq init_stdout_compare")
+    result.append("    b init_stdout")
+    result.append("init_stdout_match:")
+    result.append("    ldrb w4, [x1]")       # First character of the value
+    result.append("    cbz w4, init_stdout")
+    result.append("    cmp w4, #'0'")
+    result.append("    b.eq init_stdout")
+    result.append("    mov x5, #1")
+    result.append("    adrp x2, line_buffered")
+    result.append("    str x5, [x2, :lo12:line_buffered]")
+    result.append("init_stdout_done:")
+    result.append("    ret")
+
+    # Write out everything in the output buffer
+    result.append("flush_stdout:")
+    result.append("    adrp x9, out_len")
+    result.append("    add x9, x9, :lo12:out_len")
+    result.append("    ldr x2, [x9]")        # Bytes to write
+    result.append("    adrp x1, out_buf")
+    result.append("    add x1, x1, :lo12:out_buf")
+    result.append("flush_stdout_loop:")
+    result.append("    cmp x2, #0")
+    result.append("    b.le flush_stdout_done")
+    result.append("    mov x0, #1")          # file descriptor (stdout)
+    result.append("    mov x8, #64")         # write syscall
+    result.append("    svc #0")
+    result.append("    cmp x0, #0")
+    result.append("    b.le flush_stdout_done") # Give up on errors
+    result.append("    add x1, x1, x0")      # Handle partial writes
+    result.append("    sub x2, x2, x0")
+    result.append("    b flush_stdout_loop")
+    result.append("flush_stdout_done:")
+    result.append("    str xzr, [x9]")
+    result.append("    ret")
+
+    # Bump allocator: hands out 16-byte aligned slices of large mmap'd chunks
+    result.append("arena_alloc:")
+    result.append("    // x0 contains the number of bytes wanted")
+    result.append("    add x0, x0, #15")
+    result.append("    and x0, x0, #-16")    # Round up to 16 bytes
+    result.append("    adrp x9, arena_ptr")
+    result.append("    add x9, x9, :lo12:arena_ptr")
+    result.append("    ldp x10, x11, [x9]")  # x10 = arena_ptr, x11 = arena_end
+    result.append("    add x12, x10, x0")    # End of this allocation
+    result.append("    cmp x12, x11")
+    result.append("    b.hi arena_grow")     # Doesn't fit, get a new chunk
+    result.append("    str x12, [x9]")       # Bump the pointer
+    result.append("    mov x0, x10")         # Return start of slice
+    result.append("    ret")
+
+    result.append("arena_grow:")
+    result.append("    // Map max(arena_chunk, size) bytes and double arena_chunk")
+    result.append("    ldr x13, [x9, #16]")  # arena_chunk
+    result.append("    cmp x13, x0")
+    result.append("    csel x1, x13, x0, hs") # length to allocate
+    result.append("    lsl x13, x13, #1")
+    result.append("    str x13, [x9, #16]")
+    result.append("    mov x12, x0")         # Save size
+    result.append("    mov x14, x1")         # Save chunk length
+    result.append("    mov x0, #0")          # let kernel choose address
+    result.append("    mov x2, #3")          # PROT_READ | PROT_WRITE
+    result.append("    mov x3, #0x22")       # MAP_PRIVATE | MAP_ANONYMOUS
+    result.append("    mov x4, #-1")         # fd (not used)
+    result.append("    mov x5, #0")          # offset (not used)
+    result.append("    mov x8, #222")        # mmap syscall number for ARM64
+    result.append("    svc #0")
+    result.append("    add x11, x0, x14")    # New arena_end
+    result.append("    add x10, x0, x12")    # New arena_ptr, past this allocation
+    result.append("    stp x10, x11, [x9]")
+    result.append("    ret")                 # Slice starts at the chunk
+
+    # Give a string back to the arena when it is the last thing allocated. Every string
+    # the runtime allocates starts its slice and takes up its length plus the NUL,
+    # rounded up to 16 bytes, so its end is known from the string alone
+    result.append("string_release:")
+    result.append("    // x0 contains the string, x1 its length")
+    result.append("    add x2, x0, x1")
+    result.append("    add x2, x2, #16")
+    result.append("    and x2, x2, #-16")    # End of its slice
+    result.append("    adrp x9, arena_ptr")
+    result.append("    add x9, x9, :lo12:arena_ptr")
+    result.append("    ldr x3, [x9]")
+    result.append("    cmp x2, x3")
+    result.append("    b.ne string_release_done")
+    result.append("    str x0, [x9]")
+    result.append("string_release_done:")
+    result.append("    ret")
+
+    # Write the unsigned number in x0 to the buffer at x1 in decimal, two digits at a time from
+    # the end; returns its length in x0 and leaves x1 alone. The buffer needs room for 20 bytes
+    result.append("format_number:")
+    result.append("    // Digit count: estimated from the bit length, one more at the next power of ten")
+    result.append("    orr x2, x0, #1")      # Same digit count; 0 has one digit too
+    result.append("    clz x3, x2")
+    result.append("    mov x4, #64")
+    result.append("    sub x3, x4, x3")      # Bit length
+    result.append("    mov x4, #1233")       # log10(2) * 4096
+    result.append("    mul x3, x3, x4")
+    result.append("    lsr x3, x3, #12")
+    result.append("    adrp x4, powers_of_ten")
+    result.append("    add x4, x4, :lo12:powers_of_ten")
+    result.append("    add x4, x4, x3, lsl #3")
+    result.append("    ldr x4, [x4]")
+    result.append("    cmp x2, x4")
+    result.append("    csinc x3, x3, x3, lo")
+    result.append("    add x9, x1, x3")      # The digits end here
+    result.append("    mov x6, x9")
+
+    result.append("    // Two digits per step: the quotient by 100 from a multiply, the pair from a table")
+    result.append("    adrp x4, digit_pairs")
+    result.append("    add x4, x4, :lo12:digit_pairs")
+    result.append(f"    ldr x5, ={DIVIDE_BY_100}")
+    result.append("    mov x7, #100")
+    result.append("format_number_pairs:")
+    result.append("    cmp x0, #100")
+    result.append("    b.lo format_number_last")
+    result.append("    lsr x2, x0, #2")
+    result.append("    umulh x2, x2, x5")
+    result.append("    lsr x2, x2, #2")      # x2 = x0 / 100
+    result.append("    msub x3, x2, x7, x0") # x3 = x0 % 100
+    result.append("    add x3, x4, x3, lsl #1")
+    result.append("    ldrh w3, [x3]")
+    result.append("    strh w3, [x6, #-2]!")
+    result.append("    mov x0, x2")
+    result.append("    b format_number_pairs")
+    result.append("format_number_last:")
+    result.append("    cmp x0, #10")
+    result.append("    b.lo format_number_digit")
+    result.append("    add x3, x4, x0, lsl #1")
+    result.append("    ldrh w3, [x3]")
+    result.append("    strh w3, [x6, #-2]")
+    result.append("    b format_number_done")
+    result.append("format_number_digit:")
+    result.append("    add w0, w0, #'0'")
+    result.append("    strb w0, [x6, #-1]")
+    result.append("format_number_done:")
+    result.append("    sub x0, x9, x1")      # Length
+    result.append("    ret")
+
+    # Number to string: formatted straight into an arena slice, which is then cut down to
+    # what the digits use, so the string can be released or extended like any other
+    result.append("num_to_string:")
+    result.append("    stp x29, x30, [sp, #-32]!")
+    result.append("    mov x29, sp")
+    result.append("    str x0, [sp, #16]")
+    result.append(f"    mov x0, #{NUMBER_MAX_LENGTH + 1}")
+    result.append("    bl arena_alloc")
+    result.append("    mov x1, x0")
+    result.append("    ldr x0, [sp, #16]")
+    result.append("    bl format_number")
+    result.append("    add x2, x1, x0")
+    result.append("    strb wzr, [x2]")      # Null terminator
+    result.append("    add x2, x2, #16")
+    result.append("    and x2, x2, #-16")    # End of its slice
+    result.append("    adrp x9, arena_ptr")
+    result.append("    add x9, x9, :lo12:arena_ptr")
+    result.append("    str x2, [x9]")        # Nothing was allocated since
+    result.append("    mov x2, x0")
+    result.append("    mov x0, x1")
+    result.append("    mov x1, x2")
+    result.append("    ldp x29, x30, [sp], #32")
+    result.append("    ret")
+
+    # Copy x2 bytes from x1 to x0, 16 bytes at a time, returning x0 past the copy
+    result.append("copy_bytes:")
+    result.append("copy_pairs:")
+    result.append("    cmp x2, #16")
+    result.append("    b.lo copy_tail")
+    result.append("    ldp x3, x4, [x1], #16")
+    result.append("    stp x3, x4, [x0], #16")
+    result.append("    sub x2, x2, #16")
+    result.append("    b copy_pairs")
+    result.append("copy_tail:")
+    result.append("    cbz x2, copy_done")
+    result.append("    ldrb w3, [x1], #1")
+    result.append("    strb w3, [x0], #1")
+    result.append("    sub x2, x2, #1")
+    result.append("    b copy_tail")
+    result.append("copy_done:")
+    result.append("    ret")
+
+    # String print function: appends the string and a newline to the output buffer
+    result.append("print_string:")
+    result.append("    // x0 contains the string, x1 its length")
+    result.append("    stp x29, x30, [sp, #-32]!")
+    result.append("    stp x19, x20, [sp, #16]")
+    result.append("    mov x29, sp")
+    result.append("    mov x19, x0")
+    result.append("    mov x20, x1")
+    result.append(f"    mov x4, #{OUTPUT_BUFFER_SIZE}")
+
+    result.append("    // Flush first if the string and newline don't fit")
+    result.append("    adrp x9, out_len")
+    result.append("    ldr x2, [x9, :lo12:out_len]")
+    result.append("    add x3, x2, x20")
+    result.append("    add x3, x3, #1")
+    result.append("    cmp x3, x4")
+    result.append("    b.ls print_string_buffer")
+    result.append("    bl flush_stdout")
+    result.append(f"    mov x4, #{OUTPUT_BUFFER_SIZE}")
+    result.append("    add x3, x20, #1")
+    result.append("    cmp x3, x4")
+    result.append("    b.ls print_string_buffer")
+
+    result.append("    // Too large for the buffer: write the string directly")
+    result.append("    mov x0, #1")          # file descriptor (stdout)
+    result.append("    mov x1, x19")
+    result.append("    mov x2, x20")
+    result.append("    mov x8, #64")         # write syscall
+    result.append("    svc #0")
+    result.append("    mov x20, #0")         # Only the newline is left to buffer
+
+    result.append("print_string_buffer:")
+    result.append("    adrp x9, out_len")
+    result.append("    add x9, x9, :lo12:out_len")
+    result.append("    ldr x2, [x9]")
+    result.append("    adrp x0, out_buf")
+    result.append("    add x0, x0, :lo12:out_buf")
+    result.append("    add x0, x0, x2")      # Destination: end of buffered output
+    result.append("    mov x1, x19")
+    result.append("    mov x2, x20")
+    result.append("    bl copy_bytes")
+    result.append("    mov w3, #10")         # newline
+    result.append("    strb w3, [x0], #1")
+    result.append("    adrp x1, out_buf")
+    result.append("    add x1, x1, :lo12:out_buf")
+    result.append("    sub x0, x0, x1")
+    result.append("    adrp x9, out_len")
+    result.append("    str x0, [x9, :lo12:out_len]")
+
+    result.append("    // Interactive use: flush after every line")
+    result.append("    adrp x9, line_buffered")
+    result.append("    ldr x0, [x9, :lo12:line_buffered]")
+    result.append("    cbz x0, print_string_done")
+    result.append("    bl flush_stdout")
+    result.append("print_string_done:")
+    result.append("    ldp x19, x20, [sp, #16]")
+    result.append("    ldp x29, x30, [sp], #32")
+    result.append("    ret")
+
+    # String concatenation function
+    result.append("string_concat:")
+    result.append("    // Save registers")
+    result.append("    stp x29, x30, [sp, #-48]!")
+    result.append("    stp x19, x20, [sp, #16]")
+    result.append("    stp x21, x22, [sp, #32]")
+    result.append("    mov x29, sp")
+
+    # Save input strings and their lengths
+    result.append("    mov x19, x0")   # first string
+    result.append("    mov x20, x1")   # length of first string
+    result.append("    mov x21, x2")   # second string
+    result.append("    mov x22, x3")   # length of second string
+
+    # Allocate len1 + len2 + 1 for null terminator from the arena
+    result.append("    add x0, x20, x22")
+    result.append("    add x0, x0, #1")
+    result.append("    bl arena_alloc")
+    result.append("    mov x5, x0")           # save buffer address
+
+    # Copy both strings
+    result.append("    mov x1, x19")          # source (first string)
+    result.append("    mov x2, x20")          # bytes to copy
+    result.append("    bl copy_bytes")
+    result.append("    mov x1, x21")          # source (second string)
+    result.append("    mov x2, x22")          # bytes to copy
+    result.append("    bl copy_bytes")
+
+    # Add null terminator
+    result.append("    strb wzr, [x0]")
+
+    # Return new string buffer and its length
+    result.append("    mov x0, x5")
+    result.append("    add x1, x20, x22")
+
+    # Restore registers and return
+    result.append("    ldp x21, x22, [sp, #32]")
+    result.append("    ldp x19, x20, [sp, #16]")
+    result.append("    ldp x29, x30, [sp], #48")
+    result.append("    ret")
+
+    # Concatenation that may reuse the storage of an operand nothing reads again (bit 0
+    # of x4 for the left, bit 1 for the right): the left string is extended where it is
+    # when it is the last allocation, or only has the right string above it; otherwise
+    # the right string is moved up and the left copied in front of it
+    result.append("string_concat_owned:")
+    result.append("    stp x29, x30, [sp, #-48]!")
+    result.append("    stp x19, x20, [sp, #16]")
+    result.append("    stp x21, x22, [sp, #32]")
+    result.append("    mov x29, sp")
+    result.append("    mov x19, x0")         # first string
+    result.append("    mov x20, x1")         # length of first string
+    result.append("    mov x21, x2")         # second string
+    result.append("    mov x22, x3")         # length of second string
+    result.append("    add x6, x20, x22")
+    result.append("    add x6, x6, #16")
+    result.append("    and x6, x6, #-16")    # Slice the result needs
+    result.append("    adrp x9, arena_ptr")
+    result.append("    add x9, x9, :lo12:arena_ptr")
+    result.append("    ldp x10, x11, [x9]")  # x10 = arena_ptr, x11 = arena_end
+    result.append("    mov x12, x10")        # Top of the arena, without an owned right string
+
+    result.append("    and x7, x4, #2")
+    result.append("    cbz x7, string_concat_append")
+    result.append("    add x7, x21, x22")
+    result.append("    add x7, x7, #16")
+    result.append("    and x7, x7, #-16")
+    result.append("    cmp x7, x10")
+    result.append("    csel x12, x21, x12, eq") # The right string is last: its slice is free
+
+    result.append("string_concat_append:")
+    result.append("    and x7, x4, #1")
+    result.append("    cbz x7, string_concat_prepend")
+    result.append("    add x7, x19, x20")
+    result.append("    add x7, x7, #16")
+    result.append("    and x7, x7, #-16")
+    result.append("    cmp x7, x12")
+    result.append("    b.ne string_concat_prepend")
+    result.append("    add x7, x19, x6")     # End of the extended string
+    result.append("    cmp x7, x11")
+    result.append("    b.hi string_concat_prepend")
+    result.append("    str x7, [x9]")
+    result.append("    add x0, x19, x20")
+    result.append("    mov x1, x21")         # At or above the destination, so copy forwards
+    result.append("    mov x2, x22")
+    result.append("    bl copy_bytes")
+    result.append("    strb wzr, [x0]")
+    result.append("    mov x0, x19")
+    result.append("    b string_concat_owned_done")
+
+    result.append("string_concat_prepend:")
+    result.append("    and x7, x4, #2")
+    result.append("    cbz x7, string_concat_copy")
+    result.append("    add x7, x21, x22")
+    result.append("    add x7, x7, #16")
+    result.append("    and x7, x7, #-16")
+    result.append("    cmp x7, x10")
+    result.append("    b.ne string_concat_copy")
+    result.append("    add x7, x21, x6")
+    result.append("    cmp x7, x11")
+    result.append("    b.hi string_concat_copy")
+    result.append("    str x7, [x9]")
+    result.append("    add x1, x21, x22")    # Move the right string up, last byte first
+    result.append("    add x0, x1, x20")
+    result.append("    strb wzr, [x0]")
+    result.append("    mov x2, x22")
+    result.append("string_concat_move:")
+    result.append("    cbz x2, string_concat_moved")
+    result.append("    ldrb w3, [x1, #-1]!")
+    result.append("    strb w3, [x0, #-1]!")
+    result.append("    sub x2, x2, #1")
+    result.append("    b string_concat_move")
+    result.append("string_concat_moved:")
+    result.append("    mov x0, x21")         # Then the left string in front of it
+    result.append("    mov x1, x19")
+    result.append("    mov x2, x20")
+    result.append("    bl copy_bytes")
+    result.append("    mov x0, x21")
+    result.append("    b string_concat_owned_done")
+
+    result.append("string_concat_copy:")
+    result.append("    mov x0, x19")         # No storage to reuse: a new string
+    result.append("    mov x1, x20")
+    result.append("    mov x2, x21")
+    result.append("    mov x3, x22")
+    result.append("    ldp x21, x22, [sp, #32]")
+    result.append("    ldp x19, x20, [sp, #16]")
+    result.append("    ldp x29, x30, [sp], #48")
+    result.append("    b string_concat")
+
+    result.append("string_concat_owned_done:")
+    result.append("    add x1, x20, x22")
+    result.append("    ldp x21, x22, [sp, #32]")
+    result.append("    ldp x19, x20, [sp, #16]")
+    result.append("    ldp x29, x30, [sp], #48")
+    result.append("    ret")
+
+    # Concatenate x1 strings at once: x0 points to their (length, pointer) pairs, the last
+    # string's first. The lengths are added up, the result allocated once and each string
+    # copied once. When x2 is set nothing reads the first string again, and it is
+    # extended where it is if it is the last allocation
+    result.append("string_concat_n:")
+    result.append("    stp x29, x30, [sp, #-48]!")
+    result.append("    stp x19, x20, [sp, #16]")
+    result.append("    stp x21, x22, [sp, #32]")
+    result.append("    mov x29, sp")
+    result.append("    mov x19, x0")         # Last pair
+    result.append("    add x20, x0, x1, lsl #4") # End of the pairs; the first string's is below
+    result.append("    mov x21, #0")         # Total length
+    result.append("    mov x3, x0")
+    result.append("string_concat_n_measure:")
+    result.append("    ldr x4, [x3], #16")
+    result.append("    add x21, x21, x4")
+    result.append("    cmp x3, x20")
+    result.append("    b.lo string_concat_n_measure")
+
+    result.append("    cbz x2, string_concat_n_new")
+    result.append("    ldp x4, x5, [x20, #-16]") # First string's length and pointer
+    result.append("    add x6, x5, x4")
+    result.append("    add x6, x6, #16")
+    result.append("    and x6, x6, #-16")    # End of its slice
+    result.append("    adrp x9, arena_ptr")
+    result.append("    add x9, x9, :lo12:arena_ptr")
+    result.append("    ldp x10, x11, [x9]")  # x10 = arena_ptr, x11 = arena_end
+    result.append("    cmp x6, x10")
+    result.append("    b.ne string_concat_n_new")
+    result.append("    add x6, x5, x21")
+    result.append("    add x6, x6, #16")
+    result.append("    and x6, x6, #-16")    # End of the extended string
+    result.append("    cmp x6, x11")
+    result.append("    b.hi string_concat_n_new")
+    result.append("    str x6, [x9]")
+    result.append("    mov x22, x5")
+    result.append("    add x0, x5, x4")      # The rest go after the first string
+    result.append("    sub x20, x20, #16")
+    result.append("    b string_concat_n_copy")
+
+    result.append("string_concat_n_new:")
+    result.append("    add x0, x21, #1")
+    result.append("    bl arena_alloc")
+    result.append("    mov x22, x0")
+
+    result.append("string_concat_n_copy:")
+    result.append("    cmp x20, x19")
+    result.append("    b.ls string_concat_n_done")
+    result.append("    ldp x2, x1, [x20, #-16]!") # Length and pointer of the next string
+    result.append("    bl copy_bytes")
+    result.append("    b string_concat_n_copy")
+
+    result.append("string_concat_n_done:")
+    result.append("    strb wzr, [x0]")
+    result.append("    mov x0, x22")
+    result.append("    mov x1, x21")
+    result.append("    ldp x21, x22, [sp, #32]")
+    result.append("    ldp x19, x20, [sp, #16]")
+    result.append("    ldp x29, x30, [sp], #48")
+    result.append("    ret")
+
+    return result
+
+def runtime_data():
+    """The data the helpers of runtime_code() use, in sections of their own."""
+    # format_number's tables
+    result = [".section .rodata"]
+    result.append("    .balign 8")
+    result.append("powers_of_ten:")
+    result.append(f"    .quad {', '.join(map(str, POWERS_OF_TEN))}")
+    result.append("digit_pairs:")
+    result.append(f'    .ascii "{DIGIT_PAIRS}"')
+
+    result.append(".data")
+
+    # Name of the environment variable that enables line buffering
+    result.append("line_buffered_env:")
+    result.append(f'    .string "{LINE_BUFFERED_ENV}="')
+
+    # Arena allocator state: current pointer, end of chunk, next chunk size
+    result.append("    .balign 8")
+    result.append("arena_ptr:")
+    result.append("    .quad 0")
+    result.append("arena_end:")
+    result.append("    .quad 0")
+    result.append("arena_chunk:")
+    result.append(f"    .quad {ARENA_CHUNK_SIZE}")
+
+    # Output buffer state: bytes used and line buffering flag
+    result.append("out_len:")
+    result.append("    .quad 0")
+    result.append("line_buffered:")
+    result.append("    .quad 0")
+
+    result.append(".bss")
+    result.append("    .balign 16")
+    result.append("out_buf:")
+    result.append(f"    .skip {OUTPUT_BUFFER_SIZE}")
+    return result
+
+def compile_file(input_filename, output_filename=None, debug=False, integrated=False, opt_level=0,
+                 precompute=None, debug_info=False, keep_temp=False):
+    """Compile a Vibe Language source file into an ARM64 executable.
+
+    With integrated=True the assembly is encoded and linked in-process by
+    arm_assembler instead of running as and ld. opt_level 1 and above run
+    the peephole optimizer over the generated code. precompute, a
+    (max_bytes, max_seconds) budget, runs the program at build time and
+    builds an executable that only writes its output. debug_info adds the
+    line table (-g), which the integrated assembler cannot write. The
+    assembly is piped straight into as; keep_temp writes it and the object
+    file next to the output as well.
+    """
+    if integrated and debug_info:
+        print("Error during compilation: -g is not supported with the integrated assembler")
+        sys.exit(1)
+
+    # Set default output filename if not provided
+    if output_filename is None:
+        output_filename = os.path.splitext(input_filename)[0]
+    
+    try:
+        # Read source file
+        with open(input_filename, 'r') as f:
+            source = f.read()
+        
+        if debug:
+            print(f"Source code:\n{source}\n")
+        
+        # Tokenize
+        lexer = Lexer(source)
+        tokens = lexer.tokenize()
+        
+        if debug:
+            print("Tokens:")
+            for token in tokens:
+                print(f"  {token}")
+        
+        # Parse
+        parser = Parser(tokens)
+        ast = parser.parse()
+        
+        if debug:
+            print("\nAST structure:")
+            print_ast(ast, 0)
+            print()
+        
+        precomputed = precompute_output(ast, precompute) if precompute else None
+    except Exception as e:
+        print(f"Error during compilation: {e}")
+        sys.exit(1)
+
+    def generate(output):
+        code_generator = ARMCodeGenerator(opt_level, input_filename if debug_info else None)
+        if precomputed is not None:
+            code_generator.generate_precomputed(precomputed, output)
+        else:
+            code_generator.generate(ast, output)
+
+    with BuildDirectory(output_filename, keep_temp) as build:
+        # The assembly only goes to a file when it is kept or previewed
+        asm_filename = build.path('.s') if keep_temp or debug else None
+        try:
+            if integrated:
+                from .arm_assembler import write_executable
+                assembly = io.StringIO()
+                generate(assembly)
+                assembly = assembly.getvalue()
+                if asm_filename:
+                    with open(asm_filename, 'w') as f:
+                        f.write(assembly)
+                preview_assembly(asm_filename, debug)
+                write_executable(assembly, output_filename)
+                print(f"Executable created: {output_filename}")
+                return
+
+            # Assemble the generated code as it is written
+            print("Assembling...")
+            object_filename = build.path('.o')
+            run_pipeline([["as", "-o", object_filename, "-"]], generate,
+                         [asm_filename] if asm_filename else None)
+            preview_assembly(asm_filename, debug)
+
+            print("Linking...")
+            subprocess.run(["ld", "-o", output_filename, object_filename], check=True)
+
+            print(f"Executable created: {output_filename}")
+
+            # Make the file executable
+            os.chmod(output_filename, 0o755)
+        except subprocess.SubprocessError as e:
+            print(f"Compilation error: {e}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error during compilation: {e}")
+            sys.exit(1)
+
+
+def preview_assembly(asm_filename, debug):
+    """Print the first lines of the generated assembly in debug mode."""
+    if not debug:
+        return
+    print("\nAssembly code preview:")
+    with open(asm_filename, 'r') as f:
+        for i, line in enumerate(f):
+            if i == 20:  # Print first 20 lines
+                print("...")
+                break
+            print(f"{i+1:4d}: {line.rstrip()}")
+
+
+def print_ast(node, level):
+    """Helper function to print AST structure for debugging"""
+    indent = "  " * level
+    if isinstance(node, list):
+        print(f"{indent}[List of statements]")
+        for item in node:
+            print_ast(item, level + 1)
+    else:
+        node_type = type(node).__name__
+        if hasattr(node, 'value'):
+            print(f"{indent}{node_type}: {node.value}")
+        elif hasattr(node, 'op') and hasattr(node.op, 'type'):
+            print(f"{indent}{node_type}: {node.op.type}")
+            print(f"{indent}Left:")
+            print_ast(node.left, level + 1)
+            print(f"{indent}Right:")
+            print_ast(node.right, level + 1)
+        elif hasattr(node, 'expr'):
+            print(f"{indent}{node_type}:")
+            print_ast(node.expr, level + 1)
+        else:
+            print(f"{indent}{node_type}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.simple_compiler <input_file> [output_file] [--debug] [--integrated-as] [-O<level>] [--precompute] [-g] [--keep-temp]")
+        sys.exit(1)
+    
+    input_filename = sys.argv[1]
+    output_filename = None
+    debug_mode = False
+    integrated = False
+    opt_level = 0
+    precompute = None
+    debug_info = False
+    keep_temp = False
+    
+    for arg in sys.argv[2:]:
+        if arg == '--debug':
+            debug_mode = True
+        elif arg == '--keep-temp':
+            keep_temp = True
+        elif arg == '-g':
+            debug_info = True
+        elif arg == '--integrated-as':
+            integrated = True
+        elif arg == '--precompute':
+            precompute = (DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS)
+        elif arg.startswith('-O'):
+            opt_level = int(arg[2:] or 1)
+        elif output_filename is None:
+            output_filename = arg
+    
+    compile_file(input_filename, output_filename, debug_mode, integrated, opt_level, precompute, debug_info,
+                 keep_temp)
+
+if __name__ == "__main__":
+    main()
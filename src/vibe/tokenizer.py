@@ -10,19 +10,20 @@ class Token:
         return f"Token({self.type})"
 
 class Lexer:
-    def __init__(self, source):
+    def __init__(self, source, line=1):
         self.source = source
         self.pos = 0
-        self.line = 1
+        self.line = line    # Line numbers continue from here, for REPL entries
         self.current_char = self.source[0] if len(self.source) > 0 else None
     
     def advance(self):
+        # The line changes after a newline, so a token ending a line keeps its own line
+        if self.current_char == '\n':
+            self.line += 1
         self.pos += 1
         if self.pos >= len(self.source):
             self.current_char = None
         else:
-            if self.source[self.pos] == '\n':
-                self.line += 1
             self.current_char = self.source[self.pos]
     
     def peek(self, n=1):
@@ -97,23 +98,25 @@ class Lexer:
                 self.skip_comment()
                 continue
                 
+            # Tokens carry the line they start on
+            line = self.line
             if self.current_char == '"':
-                tokens.append(Token('STRING', self.get_string(), self.line))
+                tokens.append(Token('STRING', self.get_string(), line))
             elif self.current_char.isdigit():
-                tokens.append(Token('NUMBER', self.get_number(), self.line))
+                tokens.append(Token('NUMBER', self.get_number(), line))
             elif self.current_char.isalpha() or self.current_char == '_':
                 identifier = self.get_identifier()
                 if identifier == 'holla':
-                    tokens.append(Token('HOLLA', line=self.line))
+                    tokens.append(Token('HOLLA', line=line))
                 else:
-                    tokens.append(Token('IDENTIFIER', identifier, self.line))
+                    tokens.append(Token('IDENTIFIER', identifier, line))
             elif self.is_emoji_assignment():
                 self.advance()  # Skip ➡
                 self.advance()  # Skip ️ (variation selector)
-                tokens.append(Token('ASSIGN', line=self.line))
+                tokens.append(Token('ASSIGN', line=line))
             elif self.current_char == '+':
                 self.advance()
-                tokens.append(Token('PLUS', line=self.line))
+                tokens.append(Token('PLUS', line=line))
             else:
                 raise Exception(f"Invalid character: {self.current_char} at line {self.line}")
                 
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/type_inference.py
+
+import sys
+from .tokenizer import Token, Lexer
+from .parser import Parser, BinOp, Num, String, Var, Assign, HollaStmt
+
+NUM = 'num'
+STR = 'str'
+
+# Compiled code does its arithmetic in 64-bit registers
+WORD_MASK = (1 << 64) - 1
+
+def node_line(node):
+    """Source line of an expression, for nodes synthesized from it."""
+    if isinstance(node, BinOp):
+        return node.op.line
+    return node.token.line
+
+class TypeInference:
+    """Whole-program type inference shared by the compiler backends.
+
+    Programs are straight-line code, so the type of every variable is known
+    at every statement. Each expression node gets a value_type of NUM or STR,
+    where adding a number to a string means converting the number, as the
+    compiled runtime always has. Numbers that are converted to strings and
+    whose value is known at compile time are replaced by String nodes, so
+    the backends never emit a num_to_string call for them.
+    """
+    def __init__(self):
+        self.var_types = {}
+        self.constants = {}
+        self.conversions = 0
+        self.folded = 0
+        self.additions = 0
+
+    def infer(self, ast):
+        statements = ast if isinstance(ast, list) else [ast]
+        for node in statements:
+            self.infer_statement(node)
+        return ast
+
+    def infer_statement(self, node):
+        if isinstance(node, Assign):
+            value = self.infer_expression(node.right)
+            var_name = node.left.value
+            self.var_types[var_name] = node.right.value_type
+            if value is None:
+                self.constants.pop(var_name, None)
+            else:
+                self.constants[var_name] = value
+        elif isinstance(node, HollaStmt):
+            value = self.infer_expression(node.expr)
+            node.expr = self.to_string(node.expr, value)
+        else:
+            raise Exception(f"Unsupported node type: {type(node).__name__}")
+
+    def infer_expression(self, node):
+        """Annotate node and its operands; return its value if it is a known number."""
+        if isinstance(node, Num):
+            if not 0 <= node.value <= WORD_MASK:
+                raise Exception(f"Number {node.value} at line {node_line(node)} does not fit in 64 bits")
+            node.value_type = NUM
+            return node.value
+        if isinstance(node, String):
+            node.value_type = STR
+            return None
+        if isinstance(node, Var):
+            if node.value not in self.var_types:
+                raise Exception(f"Undefined variable: {node.value}")
+            node.value_type = self.var_types[node.value]
+            return self.constants.get(node.value)
+        if isinstance(node, BinOp):
+            # A chain of + nests down the left; walk it with a loop so long ones don't recurse
+            chain = []
+            while isinstance(node, BinOp):
+                if node.op.type != 'PLUS':
+                    raise Exception(f"Unsupported operator: {node.op.type}")
+                chain.append(node)
+                node = node.left
+            value = self.infer_expression(node)
+            for addition in reversed(chain):
+                value = self.infer_addition(addition, value)
+            return value
+        raise Exception(f"Unsupported expression node type: {type(node).__name__}")
+
+    def infer_addition(self, node, left):
+        """Annotate an addition whose left operand is annotated and has value left; return its value."""
+        right = self.infer_expression(node.right)
+        if node.left.value_type == NUM and node.right.value_type == NUM:
+            node.value_type = NUM
+            self.additions += 1
+            if left is None or right is None:
+                return None
+            return (left + right) & WORD_MASK
+        node.value_type = STR
+        node.left = self.to_string(node.left, left)
+        node.right = self.to_string(node.right, right)
+        return None
+
+    def to_string(self, node, value):
+        """Fold the conversion of a known number; other numbers are converted at run time."""
+        if node.value_type != NUM:
+            return node
+        self.conversions += 1
+        if value is None:
+            return node
+        self.folded += 1
+        folded = String(Token('STRING', str(value), node_line(node)))
+        folded.value_type = STR
+        return folded
+
+    def report(self):
+        runtime = self.conversions - self.folded
+        return (f"{self.conversions} number-to-string conversions: {self.folded} folded at compile time, "
+                f"{runtime} at run time; {self.additions} unboxed integer additions")
+
+def infer_types(ast):
+    """Run type inference over a parsed program, returning the inference state."""
+    inference = TypeInference()
+    inference.infer(ast)
+    return inference
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.type_inference <input_file> [<input_file> ...]")
+        sys.exit(1)
+
+    for input_filename in sys.argv[1:]:
+        with open(input_filename, 'r') as f:
+            source = f.read()
+        ast = Parser(Lexer(source).tokenize()).parse()
+        print(f"{input_filename}: {infer_types(ast).report()}")
+
+if __name__ == "__main__":
+    main()
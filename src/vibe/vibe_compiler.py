@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/vibe_compiler.py
+
+import sys
+import os
+import io
+import struct
+import argparse
+import contextlib
+
+from .build_cache import BuildCache, toolchain_version, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE
+from .precompute import DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS
+
+# Sections counted by --size-report, by name prefix
+REPORT_SECTIONS = ['text', 'rodata', 'data', 'bss']
+
+def load_backend(backend):
+    """Import the compile_file function of a backend."""
+    if backend == 'native':
+        from .compile import compile_file
+    elif backend == 'simple':
+        from .simple_compiler import compile_file
+    elif backend == 'llvm':
+        from .llvm_compiler import compile_file
+    elif backend == 'x86_64':
+        from .x86_compiler import compile_file
+    return compile_file
+
+def compile_one(job):
+    """Build one source file, consulting the cache first.
+
+    Runs in a worker process, so the backend's progress messages are
+    captured and handed back to the parent instead of interleaving.
+    Returns (input_file, output_file, status, log) where status is
+    'hit', 'miss' or 'error'.
+    """
+    input_file, output_file, backend, options, cache_options, keep_temp, verbose = job
+    log = io.StringIO()
+    cache = None
+    key = None
+
+    with contextlib.redirect_stdout(log if not verbose else sys.stdout):
+        try:
+            if cache_options:
+                directory, toolchain = cache_options
+                cache = BuildCache(directory)
+                with open(input_file, 'rb') as f:
+                    key = cache.key(f.read(), backend, options, toolchain, input_file)
+                if cache.fetch(key, output_file, keep_temp):
+                    return input_file, output_file, 'hit', log.getvalue()
+
+            compile_file = load_backend(backend)
+            compile_file(input_file, output_file, **options)
+
+            if cache:
+                cache.store(key, output_file)
+            status = 'miss'
+        except SystemExit:
+            status = 'error'
+        except Exception as e:
+            print(f"Error compiling {input_file}: {e}")
+            status = 'error'
+
+    return input_file, output_file, status, log.getvalue()
+
+def section_sizes(filename):
+    """Total size of the text, rodata, data and bss sections of a 64-bit ELF file."""
+    with open(filename, 'rb') as f:
+        image = f.read()
+    if image[:5] != b'\x7fELF\x02':
+        return None
+    shoff, = struct.unpack_from('<Q', image, 0x28)
+    shentsize, shnum, shstrndx = struct.unpack_from('<HHH', image, 0x3A)
+    names_offset, = struct.unpack_from('<Q', image, shoff + shstrndx * shentsize + 0x18)
+
+    sizes = dict.fromkeys(REPORT_SECTIONS, 0)
+    for index in range(shnum):
+        header = shoff + index * shentsize
+        name_offset, = struct.unpack_from('<I', image, header)
+        size, = struct.unpack_from('<Q', image, header + 0x20)
+        name = image[names_offset + name_offset:image.index(b'\0', names_offset + name_offset)].decode()
+        for section in REPORT_SECTIONS:
+            if name == f".{section}" or name.startswith(f".{section}."):
+                sizes[section] += size
+    return sizes
+
+def size_report(input_file, output_file):
+    """Print the section sizes of a build and what its string literals cost."""
+    from .literal_pool import literal_report
+    print(f"{output_file}:")
+    sizes = section_sizes(output_file)
+    if sizes is None:
+        print("  not an ELF executable")
+    else:
+        print("  " + "  ".join(f"{section} {size}" for section, size in sizes.items()))
+    with open(input_file, 'r') as f:
+        print(f"  {literal_report(f.read())}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vibe Programming Language Compiler")
+    parser.add_argument('input_files', nargs='+', help='Source files to compile')
+    parser.add_argument('-o', '--output', help='Output executable name (single input only)')
+    parser.add_argument('-b', '--backend', choices=['native', 'simple', 'llvm', 'x86_64'], 
+                        default='native', help='Compiler backend to use')
+    parser.add_argument('-v', '--verbose', action='store_true', 
+                        help='Print verbose compilation information')
+    parser.add_argument('--keep-temp', action='store_true',
+                        help='Copy the intermediate files (assembly or IR, object files) next to the output')
+    parser.add_argument('-O', dest='opt_level', type=int, choices=[0, 1, 2, 3], default=0,
+                        help='Optimization level (-O0 to -O3)')
+    parser.add_argument('-g', dest='debug_info', action='store_true',
+                        help='Emit source line debug info so perf, gdb and addr2line map code to .vpl lines')
+    parser.add_argument('--target', help='Target triple for the LLVM backend (default: host)')
+    parser.add_argument('--freestanding', action='store_true',
+                        help='Link the native or LLVM backend against a syscall runtime instead of libc')
+    parser.add_argument('--integrated-as', action='store_true',
+                        help='Assemble and link the simple backend in-process, without as/ld')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of files to compile in parallel (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always rebuild instead of reusing cached builds')
+    parser.add_argument('--cache-dir', default=os.environ.get('VIBE_CACHE_DIR', DEFAULT_CACHE_DIR),
+                        help='Build cache directory (default: $VIBE_CACHE_DIR or ~/.cache/vibe)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+                        help='Maximum build cache size in megabytes (default: 512)')
+    parser.add_argument('--size-report', action='store_true',
+                        help='Print section sizes and string literal bytes of each executable')
+    parser.add_argument('--precompute', action='store_true',
+                        help='Run the program at build time and build an executable that just writes its output')
+    parser.add_argument('--precompute-max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help='Largest output to precompute before generating code instead (default: 1MB)')
+    parser.add_argument('--precompute-max-seconds', type=float, default=DEFAULT_MAX_SECONDS,
+                        help='Longest build-time run before generating code instead (default: 1s)')
+    parser.add_argument('--dump-ir', action='store_true',
+                        help='Print the optimized IR of each input instead of compiling it')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print a JSON static cost report of the code each input compiles to, instead of building it')
+    
+    args = parser.parse_args(argv)
+    
+    if args.output and len(args.input_files) > 1:
+        parser.error("-o can only be used with a single input file")
+    if args.integrated_as and args.backend != 'simple':
+        parser.error("--integrated-as is only supported by the simple backend")
+    if args.integrated_as and args.debug_info:
+        parser.error("-g is not supported with --integrated-as, which writes no debug sections")
+    if args.freestanding and args.backend not in ('native', 'llvm'):
+        parser.error("--freestanding is only supported by the native and llvm backends")
+    if args.target and args.backend != 'llvm':
+        parser.error("--target is only supported by the llvm backend")
+    if args.opt_level and args.backend not in ('native', 'simple', 'llvm'):
+        parser.error(f"-O{args.opt_level} is only supported by the native, simple and llvm backends")
+    
+    if args.dump_ir:
+        # The IR is shared by every backend, so there is nothing backend specific to do
+        from .ir import dump_ir
+        for input_file in args.input_files:
+            print(f"; {input_file}")
+            print(dump_ir(input_file))
+        return
+    
+    # Backend specific options
+    options = {}
+    if args.backend == 'llvm':
+        options = {'opt_level': args.opt_level, 'target': args.target}
+    elif args.backend in ('native', 'simple'):
+        # -O1 and above run the peephole optimizer over the ARM64 assembly
+        options = {'opt_level': args.opt_level}
+        if args.integrated_as:
+            options['integrated'] = True
+    if args.debug_info:
+        options['debug_info'] = True
+    if args.freestanding:
+        # Static executables on raw syscalls, with no libc or dynamic loader to start
+        options['freestanding'] = True
+    if args.keep_temp:
+        # Intermediate files stay in a private temp directory unless kept. Keeping
+        # them is part of the cache key, so a hit has the files to copy out too
+        options['keep_temp'] = True
+    if args.precompute:
+        # Programs take no input, so their output is fixed at build time
+        options['precompute'] = (args.precompute_max_bytes, args.precompute_max_seconds)
+    
+    if args.stats:
+        # The generated code is analysed as it is, so nothing needs assembling or running
+        import json
+        from .cost_model import cost_report
+        reports = {}
+        for input_file in args.input_files:
+            with open(input_file, 'r') as f:
+                reports[input_file] = cost_report(f.read(), args.backend, options)
+        print(json.dumps(reports, indent=2))
+        return
+    
+    cache_options = None
+    if not args.no_cache:
+        cache_options = (args.cache_dir, toolchain_version(args.backend, options))
+    
+    jobs = []
+    outputs = {}
+    for input_file in args.input_files:
+        # Determine output filename
+        output_file = args.output
+        if not output_file:
+            output_file = os.path.splitext(os.path.basename(input_file))[0]
+        
+        # Parallel builds of one output would overwrite each other
+        output_path = os.path.abspath(output_file)
+        if output_path in outputs:
+            parser.error(f"{outputs[output_path]} and {input_file} would both be compiled to {output_file}")
+        outputs[output_path] = input_file
+        
+        # Print information
+        if args.verbose:
+            print(f"Compiling {input_file} to {output_file} using {args.backend} backend")
+        
+        jobs.append((input_file, output_file, args.backend, options,
+                     cache_options, args.keep_temp, args.verbose))
+    
+    # Compile the files, in a process pool when there is more than one
+    if len(jobs) == 1 or args.jobs <= 1:
+        results = list(map(compile_one, jobs))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            chunksize = max(1, len(jobs) // (args.jobs * 8))
+            results = list(executor.map(compile_one, jobs, chunksize=chunksize))
+    
+    stats = {'hit': 0, 'miss': 0, 'error': 0}
+    for input_file, output_file, status, log in results:
+        stats[status] += 1
+        if status == 'error':
+            sys.stdout.write(log)
+            print(f"Compilation failed: {input_file}")
+        elif len(jobs) == 1:
+            if status == 'miss':
+                sys.stdout.write(log)
+            print(f"Compilation complete: {output_file}")
+    
+    if cache_options:
+        cache = BuildCache(args.cache_dir, args.cache_size * 1024 * 1024)
+        evicted = cache.evict()
+        if args.verbose or len(jobs) > 1:
+            print(f"Build cache: {stats['hit']} hits, {stats['miss']} misses, {evicted} evicted")
+    
+    if len(jobs) > 1:
+        print(f"Compiled {stats['hit'] + stats['miss']} of {len(jobs)} files")
+    
+    if args.size_report:
+        for input_file, output_file, status, log in results:
+            if status != 'error':
+                size_report(input_file, output_file)
+    
+    if stats['error']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
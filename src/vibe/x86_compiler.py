@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+# filepath: /home/anthonyshaw/repos/new-programming-language/src/vibe/x86_compiler.py
+
+import sys
+import os
+import subprocess
+from .tokenizer import Lexer
+from .parser import Parser
+from .simple_compiler import print_ast
+from .type_inference import NUM
+from .ir import lower, OPCODE_NAMES
+from .literal_pool import LiteralPool
+from .output_sink import OutputSink, FLUSH_LINES
+from .pipeline import BuildDirectory, run_pipeline
+from .debug_info import file_directive, loc_directive, annotate_functions, end_function
+from .precompute import precompute_output, ascii_directives, DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS
+from .runtime import ARENA_CHUNK_SIZE, OUTPUT_BUFFER_SIZE, LINE_BUFFERED_ENV
+from .runtime import DIGIT_PAIRS, POWERS_OF_TEN, DIVIDE_BY_100, NUMBER_MAX_LENGTH
+
+# Runtime helpers, in the order they are written, and the program's entry point
+RUNTIME_FUNCTIONS = ('init_stdout', 'flush_stdout', 'arena_alloc', 'string_release', 'format_number',
+                     'num_to_string', 'print_string', 'string_concat', 'string_concat_owned', 'string_concat_n',
+                     '_start')
+
+class X86CodeGenerator:
+    """Generates x86-64 Linux assembly (AT&T syntax) using raw syscalls.
+
+    This mirrors ARMCodeGenerator: the same runtime helpers
+    (num_to_string, print_string, string_concat) are emitted alongside
+    the program. Numbers are passed around in %rax and strings as a
+    pointer in %rax with its length in %rdx.
+    """
+    def __init__(self, source_file=None):
+        self.source_file = source_file      # set for -g: .loc directives for its lines
+        self.literals = LiteralPool(".LC{}")
+        self.variables = {}
+        self.assembly = []
+
+    def emit(self, instruction):
+        self.assembly.append(instruction)
+
+    def generate(self, ast, output=None):
+        """Generate the program's assembly, writing it to output as it goes.
+
+        As in ARMCodeGenerator, the program is written out every
+        FLUSH_LINES lines and its data after it. Without output the
+        assembly is returned.
+        """
+        return self.generate_ir(lower(ast), output)
+
+    def generate_ir(self, program, output=None):
+        """Generate assembly for an IRProgram, as generate() does for an AST.
+
+        A statement's temporaries are a stack: the top one is in %rax (and
+        its length in %rdx), the ones below it on the machine stack.
+        """
+        self.program = program
+        self.literals.collect(program)
+        for slot in range(len(program.slots)):
+            self.variables[slot] = f"var_{slot}"
+        self.stack = []
+        self.sink = OutputSink(output)
+
+        # Runtime helpers first, then the program from _start
+        if self.source_file:
+            self.sink.write([file_directive(self.source_file)])
+        self.sink.write(annotate_functions(self.get_runtime_code(), RUNTIME_FUNCTIONS))
+
+        # Find envp above argv and check whether stdout should be line buffered
+        self.emit("    mov (%rsp), %rdi")             # argc
+        self.emit("    lea 16(%rsp,%rdi,8), %rdi")    # envp = rsp + 8 * (argc + 2)
+        self.emit("    call init_stdout")
+
+        # One method per opcode
+        handlers = [getattr(self, f"generate_{name}") for name in OPCODE_NAMES]
+        current_line = 0
+        for op, dest, arg1, arg2, line in program.located_instructions():
+            if line != current_line and self.source_file:
+                # Attribute the statement's code to its source line
+                self.emit(loc_directive(line))
+                current_line = line
+            handlers[op](dest, arg1, arg2)
+            if not self.stack and len(self.assembly) >= FLUSH_LINES:
+                self.flush()
+
+        # Generate exit code
+        self.emit("    # Flush buffered output and exit cleanly")
+        self.emit("    call flush_stdout")
+        self.emit("    mov $60, %eax")    # exit syscall for x86-64
+        self.emit("    xor %edi, %edi")   # status = 0
+        self.emit("    syscall")
+        self.emit(end_function("_start"))
+        self.flush()
+
+        # Data for the literals and variables the program used
+        self.sink.write_data(self.get_data_code())
+        return self.sink.close()
+
+    def generate_precomputed(self, data, output=None):
+        """Assembly for a program that only writes data, its output worked out at build time."""
+        sink = OutputSink(output)
+        sink.write([
+            ".global _start",
+            ".text",
+            "_start:",
+            "    lea precomputed_output(%rip), %rsi",
+            "    lea precomputed_end(%rip), %rdx",
+            "    sub %rsi, %rdx",              # bytes left to write
+            "precomputed_write:",
+            "    test %rdx, %rdx",
+            "    jz precomputed_exit",
+            "    mov $1, %eax",                # write syscall for x86-64
+            "    mov $1, %edi",                # stdout
+            "    syscall",
+            "    test %rax, %rax",
+            "    jle precomputed_fail",
+            "    add %rax, %rsi",              # short write: carry on after what was written
+            "    sub %rax, %rdx",
+            "    jmp precomputed_write",
+            "precomputed_exit:",
+            "    mov $60, %eax",               # exit syscall for x86-64
+            "    xor %edi, %edi",
+            "    syscall",
+            "precomputed_fail:",
+            "    mov $60, %eax",
+            "    mov $1, %edi",
+            "    syscall",
+        ])
+        sink.write_data([".section .rodata", "precomputed_output:"] + ascii_directives(data) +
+                        ["precomputed_end:"])
+        return sink.close()
+
+    def flush(self):
+        """Write out the code generated so far."""
+        self.sink.write(self.assembly)
+        self.assembly = []
+
+    def push(self, temp):
+        """Make room in %rax and %rdx for a new temporary, pushing the one there."""
+        if self.stack:
+            self.emit("    push %rax")
+            if self.program.temp_type(self.stack[-1]) != NUM:
+                self.emit("    push %rdx")
+        self.stack.append(temp)
+
+    def generate_CONST(self, dest, value, arg2):
+        self.push(dest)
+        self.emit(f"    # Load number {value}")
+        self.emit(f"    movabs ${value}, %rax")
+
+    def generate_STRING(self, dest, literal, arg2):
+        self.push(dest)
+        value = self.program.literals[literal]
+        string_label = self.literals.symbol(value)
+        self.emit(f"    # Load string {value!r}")
+        self.emit(f"    lea {string_label}(%rip), %rax")
+        self.emit(f"    mov ${len(value.encode('utf-8'))}, %edx")
+
+    def generate_LOAD(self, dest, slot, arg2):
+        self.push(dest)
+        var_label = self.variables[slot]
+        var_name, value_type = self.program.slots[slot]
+        self.emit(f"    # Load variable {var_name}")
+        self.emit(f"    mov {var_label}(%rip), %rax")
+        if value_type != NUM:
+            self.emit(f"    mov {var_label}+8(%rip), %rdx")
+
+    def generate_STORE(self, dest, slot, value):
+        # Numbers are a bare integer, strings also need their length
+        self.stack.pop()
+        var_label = self.variables[slot]
+        var_name, value_type = self.program.slots[slot]
+        self.emit(f"    # Assign to {var_name}")
+        self.emit(f"    mov %rax, {var_label}(%rip)")
+        if value_type != NUM:
+            self.emit(f"    mov %rdx, {var_label}+8(%rip)")
+
+    def generate_ADD(self, dest, left, right):
+        # Numeric addition on unboxed integers
+        del self.stack[-2:]
+        self.emit("    # Numeric addition")
+        self.emit("    pop %rdi")
+        self.emit("    add %rdi, %rax")
+        self.stack.append(dest)
+
+    def generate_CONCAT(self, dest, left, right):
+        del self.stack[-2:]
+        self.emit("    # String concatenation")
+        self.emit("    mov %rdx, %rcx")  # Second arg: right string and length
+        self.emit("    mov %rax, %rdx")
+        self.emit("    pop %rsi")        # First arg: left string and length
+        self.emit("    pop %rdi")
+        owned = self.program.owned[left] | self.program.owned[right] << 1
+        if owned:
+            # Operands read for the last time lend their storage to the result
+            self.emit(f"    mov ${owned}, %r8d")
+            self.emit("    call string_concat_owned")
+        else:
+            self.emit("    call string_concat")
+        self.stack.append(dest)
+
+    def generate_TO_STRING(self, dest, value, arg2):
+        self.stack[-1] = dest
+        self.emit("    # Convert number to string")
+        self.emit("    mov %rax, %rdi")
+        self.emit("    call num_to_string")
+
+    def generate_PRINT(self, dest, value, arg2):
+        # Print the string (pointer in %rax, length in %rdx)
+        self.stack.pop()
+        self.emit("    # Call print function")
+        if self.program.owned[value]:
+            self.emit("    push %rax")
+            self.emit("    push %rdx")
+        self.emit("    mov %rax, %rdi")
+        self.emit("    mov %rdx, %rsi")
+        self.emit("    call print_string")
+        if self.program.owned[value]:
+            # Nothing reads the string again
+            self.emit("    pop %rsi")
+            self.emit("    pop %rdi")
+            self.emit("    call string_release")
+
+    def generate_JOIN(self, dest, first, count):
+        # The pieces below the top were pushed as (length, pointer) pairs, the last piece at
+        # the lowest address; pushing the top one too makes the array string_concat_n reads
+        pieces = self.program.join_pieces(first, count)
+        del self.stack[-count:]
+        self.emit(f"    # Join {count} strings")
+        self.emit("    push %rax")
+        self.emit("    push %rdx")
+        self.emit("    mov %rsp, %rdi")
+        self.emit(f"    mov ${count}, %esi")
+        self.emit(f"    mov ${self.program.owned[pieces[0]]}, %edx")
+        self.emit("    call string_concat_n")
+        self.emit(f"    add ${16 * count}, %rsp")
+        self.stack.append(dest)
+
+    def get_data_code(self):
+        # Data section, written after the program
+        result = []
+
+        # format_number's tables
+        result.append(".section .rodata")
+        result.append("    .balign 8")
+        result.append("powers_of_ten:")
+        result.append(f"    .quad {', '.join(map(str, POWERS_OF_TEN))}")
+        result.append("digit_pairs:")
+        result.append(f'    .ascii "{DIGIT_PAIRS}"')
+
+        # Data section
+        result.append(".data")
+
+        # String literals, one per distinct value, byte for byte so newlines and
+        # other control characters survive the assembler
+        for label, string in self.literals.stored.items():
+            result.append(f"{label}:")
+            result.extend(ascii_directives(string.encode('utf-8') + b'\0'))
+
+        # Variables hold a pointer and a length (or a number and unused word)
+        result.append("    .balign 8")
+        for name, label in self.variables.items():
+            result.append(f"{label}:")
+            result.append("    .quad 0, 0")
+
+        # Name of the environment variable that enables line buffering
+        result.append("line_buffered_env:")
+        result.append(f'    .string "{LINE_BUFFERED_ENV}="')
+
+        # Arena allocator state: current pointer, end of chunk, next chunk size
+        result.append("    .balign 8")
+        result.append("arena_ptr:")
+        result.append("    .quad 0")
+        result.append("arena_end:")
+        result.append("    .quad 0")
+        result.append("arena_chunk:")
+        result.append(f"    .quad {ARENA_CHUNK_SIZE}")
+
+        # Output buffer state: bytes used and line buffering flag
+        result.append("out_len:")
+        result.append("    .quad 0")
+        result.append("line_buffered:")
+        result.append("    .quad 0")
+
+        result.append(".bss")
+        result.append("    .balign 16")
+        result.append("out_buf:")
+        result.append(f"    .skip {OUTPUT_BUFFER_SIZE}")
+        return result
+
+    def get_runtime_code(self):
+        # Text section with helper functions, ahead of the program
+        result = []
+        result.append(".global _start")
+        result.append(".text")
+
+        # Scan the environment (%rdi = envp) for VIBE_LINE_BUFFERED set to anything but 0
+        result.append("init_stdout:")
+        result.append("    mov (%rdi), %rsi")     # Next environment string
+        result.append("    add $8, %rdi")
+        result.append("    test %rsi, %rsi")
+        result.append("    jz init_stdout_done")
+        result.append("    lea line_buffered_env(%rip), %rdx")
+        result.append("init_stdout_compare:")
+        result.append("    movzbl (%rdx), %eax")
+        result.append("    test %al, %al")
+        result.append("    jz init_stdout_match") # Whole name matched
+        result.append("    cmp (%rsi), %al")
+        result.append("    jne init_stdout")
+        result.append("    inc %rdx")
+        result.append("    inc %rsi")
+        result.append("    jmp init_stdout_compare")
+        result.append("init_stdout_match:")
+        result.append("    movzbl (%rsi), %eax")  # First character of the value
+        result.append("    test %al, %al")
+        result.append("    jz init_stdout")
+        result.append("    cmp $'0', %al")
+        result.append("    je init_stdout")
+        result.append("    movq $1, line_buffered(%rip)")
+        result.append("init_stdout_done:")
+        result.append("    ret")
+
+        # Write out everything in the output buffer
+        result.append("flush_stdout:")
+        result.append("    lea out_buf(%rip), %rsi")
+        result.append("    mov out_len(%rip), %rdx") # Bytes to write
+        result.append("flush_stdout_loop:")
+        result.append("    test %rdx, %rdx")
+        result.append("    jle flush_stdout_done")
+        result.append("    mov $1, %eax")         # write syscall
+        result.append("    mov $1, %edi")         # file descriptor (stdout)
+        result.append("    syscall")
+        result.append("    test %rax, %rax")
+        result.append("    jle flush_stdout_done") # Give up on errors
+        result.append("    add %rax, %rsi")       # Handle partial writes
+        result.append("    sub %rax, %rdx")
+        result.append("    jmp flush_stdout_loop")
+        result.append("flush_stdout_done:")
+        result.append("    movq $0, out_len(%rip)")
+        result.append("    ret")
+
+        # Bump allocator: hands out 16-byte aligned slices of large mmap'd chunks
+        result.append("arena_alloc:")
+        result.append("    # %rdi contains the number of bytes wanted")
+        result.append("    add $15, %rdi")
+        result.append("    and $-16, %rdi")       # Round up to 16 bytes
+        result.append("    mov arena_ptr(%rip), %rax")
+        result.append("    lea (%rax,%rdi), %rdx") # End of this allocation
+        result.append("    cmp arena_end(%rip), %rdx")
+        result.append("    ja arena_grow")        # Doesn't fit, get a new chunk
+        result.append("    mov %rdx, arena_ptr(%rip)")  # Bump the pointer
+        result.append("    ret")                  # Return start of slice
+
+        result.append("arena_grow:")
+        result.append("    # Map max(arena_chunk, size) bytes and double arena_chunk")
+        result.append("    mov arena_chunk(%rip), %rsi")
+        result.append("    cmp %rdi, %rsi")
+        result.append("    cmovb %rdi, %rsi")     # length to allocate
+        result.append("    shlq arena_chunk(%rip)")
+        result.append("    push %rdi")            # Save size
+        result.append("    push %rsi")            # Save chunk length
+        result.append("    mov $9, %eax")         # mmap syscall number for x86-64
+        result.append("    xor %edi, %edi")       # let kernel choose address
+        result.append("    mov $3, %edx")         # PROT_READ | PROT_WRITE
+        result.append("    mov $0x22, %r10d")     # MAP_PRIVATE | MAP_ANONYMOUS
+        result.append("    mov $-1, %r8")         # fd (not used)
+        result.append("    xor %r9d, %r9d")       # offset (not used)
+        result.append("    syscall")
+        result.append("    pop %rsi")
+        result.append("    pop %rdi")
+        result.append("    lea (%rax,%rsi), %rdx")
+        result.append("    mov %rdx, arena_end(%rip)")
+        result.append("    lea (%rax,%rdi), %rdx") # New arena_ptr, past this allocation
+        result.append("    mov %rdx, arena_ptr(%rip)")
+        result.append("    ret")                  # Slice starts at the chunk
+
+        # Give a string back to the arena when it is the last thing allocated. Every string
+        # the runtime allocates starts its slice and takes up its length plus the NUL,
+        # rounded up to 16 bytes, so its end is known from the string alone
+        result.append("string_release:")
+        result.append("    # %rdi contains the string, %rsi its length")
+        result.append("    lea 16(%rdi,%rsi), %rax")
+        result.append("    and $-16, %rax")       # End of its slice
+        result.append("    cmp arena_ptr(%rip), %rax")
+        result.append("    jne string_release_done")
+        result.append("    mov %rdi, arena_ptr(%rip)")
+        result.append("string_release_done:")
+        result.append("    ret")
+
+        # Write the unsigned number in %rdi to the buffer at %rsi in decimal, two digits at a
+        # time from the end; returns its length in %rax and leaves %rsi alone. The buffer
+        # needs room for 20 bytes
+        result.append("format_number:")
+        result.append("    mov %rsi, %r8")
+        result.append("    mov %rdi, %rax")
+        result.append("    # Digit count: estimated from the bit length, one more at the next power of ten")
+        result.append("    mov %rax, %rcx")
+        result.append("    or $1, %rcx")          # Same digit count; 0 has one digit too
+        result.append("    bsr %rcx, %rdx")
+        result.append("    inc %rdx")             # Bit length
+        result.append("    imul $1233, %rdx, %rdx") # log10(2) * 4096
+        result.append("    shr $12, %rdx")
+        result.append("    lea powers_of_ten(%rip), %r9")
+        result.append("    cmp (%r9,%rdx,8), %rcx")
+        result.append("    sbb $-1, %rdx")        # One more unless below
+        result.append("    add %rdx, %r8")        # The digits end here
+        result.append("    mov %r8, %r11")
+
+        result.append("    # Two digits per step: the quotient by 100 from a multiply, the pair from a table")
+        result.append("    lea digit_pairs(%rip), %r9")
+        result.append(f"    movabs ${DIVIDE_BY_100}, %r10")
+        result.append("format_number_pairs:")
+        result.append("    cmp $100, %rax")
+        result.append("    jb format_number_last")
+        result.append("    mov %rax, %rdi")
+        result.append("    shr $2, %rax")
+        result.append("    mul %r10")
+        result.append("    mov %rdx, %rax")
+        result.append("    shr $2, %rax")         # %rax = %rdi / 100
+        result.append("    imul $100, %rax, %rdx")
+        result.append("    sub %rdx, %rdi")       # %rdi = %rdi % 100
+        result.append("    movzwl (%r9,%rdi,2), %edx")
+        result.append("    sub $2, %r8")
+        result.append("    mov %dx, (%r8)")
+        result.append("    jmp format_number_pairs")
+        result.append("format_number_last:")
+        result.append("    cmp $10, %rax")
+        result.append("    jb format_number_digit")
+        result.append("    movzwl (%r9,%rax,2), %edx")
+        result.append("    mov %dx, -2(%r8)")
+        result.append("    jmp format_number_done")
+        result.append("format_number_digit:")
+        result.append("    add $'0', %al")
+        result.append("    mov %al, -1(%r8)")
+        result.append("format_number_done:")
+        result.append("    mov %r11, %rax")
+        result.append("    sub %rsi, %rax")       # Length
+        result.append("    ret")
+
+        # Number to string: formatted straight into an arena slice, which is then cut down to
+        # what the digits use, so the string can be released or extended like any other
+        result.append("num_to_string:")
+        result.append("    push %rdi")
+        result.append(f"    mov ${NUMBER_MAX_LENGTH + 1}, %edi")
+        result.append("    call arena_alloc")
+        result.append("    pop %rdi")
+        result.append("    mov %rax, %rsi")
+        result.append("    call format_number")
+        result.append("    lea (%rsi,%rax), %rcx")
+        result.append("    movb $0, (%rcx)")      # Null terminator
+        result.append("    add $16, %rcx")
+        result.append("    and $-16, %rcx")       # End of its slice
+        result.append("    mov %rcx, arena_ptr(%rip)") # Nothing was allocated since
+        result.append("    mov %rax, %rdx")
+        result.append("    mov %rsi, %rax")
+        result.append("    ret")
+
+        # String print function: appends the string and a newline to the output buffer
+        result.append("print_string:")
+        result.append("    # %rdi contains the string, %rsi its length")
+        result.append("    push %rbx")
+        result.append("    push %r12")
+        result.append("    mov %rdi, %rbx")
+        result.append("    mov %rsi, %r12")
+
+        result.append("    # Flush first if the string and newline don't fit")
+        result.append("    mov out_len(%rip), %rax")
+        result.append("    lea 1(%rax,%r12), %rcx")
+        result.append(f"    cmp ${OUTPUT_BUFFER_SIZE}, %rcx")
+        result.append("    jbe print_string_buffer")
+        result.append("    call flush_stdout")
+        result.append("    lea 1(%r12), %rcx")
+        result.append(f"    cmp ${OUTPUT_BUFFER_SIZE}, %rcx")
+        result.append("    jbe print_string_buffer")
+
+        result.append("    # Too large for the buffer: write the string directly")
+        result.append("    mov $1, %eax")         # write syscall
+        result.append("    mov $1, %edi")         # file descriptor (stdout)
+        result.append("    mov %rbx, %rsi")
+        result.append("    mov %r12, %rdx")
+        result.append("    syscall")
+        result.append("    xor %r12d, %r12d")     # Only the newline is left to buffer
+
+        result.append("print_string_buffer:")
+        result.append("    lea out_buf(%rip), %rdi")
+        result.append("    add out_len(%rip), %rdi") # Destination: end of buffered output
+        result.append("    mov %rbx, %rsi")
+        result.append("    mov %r12, %rcx")
+        result.append("    rep movsb")
+        result.append("    movb $10, (%rdi)")     # newline
+        result.append("    inc %rdi")
+        result.append("    lea out_buf(%rip), %rax")
+        result.append("    sub %rax, %rdi")
+        result.append("    mov %rdi, out_len(%rip)")
+
+        result.append("    # Interactive use: flush after every line")
+        result.append("    cmpq $0, line_buffered(%rip)")
+        result.append("    je print_string_done")
+        result.append("    call flush_stdout")
+        result.append("print_string_done:")
+        result.append("    pop %r12")
+        result.append("    pop %rbx")
+        result.append("    ret")
+
+        # String concatenation function
+        result.append("string_concat:")
+        result.append("    # Save registers")
+        result.append("    push %rbx")
+        result.append("    push %r12")
+        result.append("    push %r13")
+        result.append("    push %r14")
+
+        # Save input strings and their lengths
+        result.append("    mov %rdi, %rbx")       # first string
+        result.append("    mov %rsi, %r12")       # length of first string
+        result.append("    mov %rdx, %r13")       # second string
+        result.append("    mov %rcx, %r14")       # length of second string
+
+        # Allocate len1 + len2 + 1 for null terminator from the arena
+        result.append("    lea 1(%r12,%r14), %rdi")
+        result.append("    call arena_alloc")
+        result.append("    mov %rax, %rdi")       # destination
+
+        # Copy both strings with rep movsb
+        result.append("    mov %rbx, %rsi")       # source (first string)
+        result.append("    mov %r12, %rcx")       # bytes to copy
+        result.append("    rep movsb")
+        result.append("    mov %r13, %rsi")       # source (second string)
+        result.append("    mov %r14, %rcx")       # bytes to copy
+        result.append("    rep movsb")
+
+        # Add null terminator
+        result.append("    movb $0, (%rdi)")
+
+        # Return new string buffer (still in %rax) and its length
+        result.append("    lea (%r12,%r14), %rdx")
+
+        # Restore registers and return
+        result.append("    pop %r14")
+        result.append("    pop %r13")
+        result.append("    pop %r12")
+        result.append("    pop %rbx")
+        result.append("    ret")
+
+        # Concatenation that may reuse the storage of an operand nothing reads again (bit 0 of
+        # %r8 for the left, bit 1 for the right): the left string is extended where it is
+        # when it is the last allocation, or only has the right string above it; otherwise
+        # the right string is moved up and the left copied in front of it
+        result.append("string_concat_owned:")
+        result.append("    push %rbx")
+        result.append("    push %r12")
+        result.append("    push %r13")
+        result.append("    push %r14")
+        result.append("    mov %rdi, %rbx")       # first string
+        result.append("    mov %rsi, %r12")       # length of first string
+        result.append("    mov %rdx, %r13")       # second string
+        result.append("    mov %rcx, %r14")       # length of second string
+        result.append("    lea 16(%r12,%r14), %r9")
+        result.append("    and $-16, %r9")        # Slice the result needs
+        result.append("    mov arena_ptr(%rip), %r10") # Top of the arena, without an owned right string
+
+        result.append("    test $2, %r8b")
+        result.append("    jz string_concat_append")
+        result.append("    lea 16(%r13,%r14), %rax")
+        result.append("    and $-16, %rax")
+        result.append("    cmp %r10, %rax")
+        result.append("    cmove %r13, %r10")     # The right string is last: its slice is free
+
+        result.append("string_concat_append:")
+        result.append("    test $1, %r8b")
+        result.append("    jz string_concat_prepend")
+        result.append("    lea 16(%rbx,%r12), %rax")
+        result.append("    and $-16, %rax")
+        result.append("    cmp %r10, %rax")
+        result.append("    jne string_concat_prepend")
+        result.append("    lea (%rbx,%r9), %rax") # End of the extended string
+        result.append("    cmp arena_end(%rip), %rax")
+        result.append("    ja string_concat_prepend")
+        result.append("    mov %rax, arena_ptr(%rip)")
+        result.append("    lea (%rbx,%r12), %rdi")
+        result.append("    mov %r13, %rsi")       # At or above the destination, so copy forwards
+        result.append("    mov %r14, %rcx")
+        result.append("    rep movsb")
+        result.append("    movb $0, (%rdi)")
+        result.append("    mov %rbx, %rax")
+        result.append("    jmp string_concat_owned_done")
+
+        result.append("string_concat_prepend:")
+        result.append("    test $2, %r8b")
+        result.append("    jz string_concat_copy")
+        result.append("    lea 16(%r13,%r14), %rax")
+        result.append("    and $-16, %rax")
+        result.append("    cmp arena_ptr(%rip), %rax")
+        result.append("    jne string_concat_copy")
+        result.append("    lea (%r13,%r9), %rax")
+        result.append("    cmp arena_end(%rip), %rax")
+        result.append("    ja string_concat_copy")
+        result.append("    mov %rax, arena_ptr(%rip)")
+        result.append("    lea -1(%r13,%r14), %rsi") # Move the right string up, last byte first
+        result.append("    lea (%rsi,%r12), %rdi")
+        result.append("    mov %r14, %rcx")
+        result.append("    std")
+        result.append("    rep movsb")
+        result.append("    cld")
+        result.append("    lea (%r12,%r14), %rax")
+        result.append("    movb $0, (%r13,%rax)")
+        result.append("    mov %r13, %rdi")       # Then the left string in front of it
+        result.append("    mov %rbx, %rsi")
+        result.append("    mov %r12, %rcx")
+        result.append("    rep movsb")
+        result.append("    mov %r13, %rax")
+        result.append("    jmp string_concat_owned_done")
+
+        result.append("string_concat_copy:")
+        result.append("    mov %rbx, %rdi")       # No storage to reuse: a new string
+        result.append("    mov %r12, %rsi")
+        result.append("    mov %r13, %rdx")
+        result.append("    mov %r14, %rcx")
+        result.append("    pop %r14")
+        result.append("    pop %r13")
+        result.append("    pop %r12")
+        result.append("    pop %rbx")
+        result.append("    jmp string_concat")
+
+        result.append("string_concat_owned_done:")
+        result.append("    lea (%r12,%r14), %rdx")
+        result.append("    pop %r14")
+        result.append("    pop %r13")
+        result.append("    pop %r12")
+        result.append("    pop %rbx")
+        result.append("    ret")
+
+        # Concatenate %rsi strings at once: %rdi points to their (length, pointer) pairs, the
+        # last string's first. The lengths are added up, the result allocated once and each
+        # string copied once. When %edx is set nothing reads the first string again, and
+        # it is extended where it is if it is the last allocation
+        result.append("string_concat_n:")
+        result.append("    push %rbx")
+        result.append("    push %r12")
+        result.append("    push %r13")
+        result.append("    mov %rdi, %rbx")       # Last pair
+        result.append("    shl $4, %rsi")
+        result.append("    lea (%rdi,%rsi), %r12") # End of the pairs; the first string's is below
+        result.append("    xor %r13d, %r13d")     # Total length
+        result.append("    mov %rdi, %rcx")
+        result.append("string_concat_n_measure:")
+        result.append("    add (%rcx), %r13")
+        result.append("    add $16, %rcx")
+        result.append("    cmp %r12, %rcx")
+        result.append("    jb string_concat_n_measure")
+
+        result.append("    test %edx, %edx")
+        result.append("    jz string_concat_n_new")
+        result.append("    mov -8(%r12), %rdi")   # First string
+        result.append("    mov -16(%r12), %rsi")  # and its length
+        result.append("    lea 16(%rdi,%rsi), %rax")
+        result.append("    and $-16, %rax")
+        result.append("    cmp arena_ptr(%rip), %rax")
+        result.append("    jne string_concat_n_new")
+        result.append("    lea 16(%rdi,%r13), %rax")
+        result.append("    and $-16, %rax")       # End of the extended string
+        result.append("    cmp arena_end(%rip), %rax")
+        result.append("    ja string_concat_n_new")
+        result.append("    mov %rax, arena_ptr(%rip)")
+        result.append("    mov %rdi, %rax")
+        result.append("    add %rsi, %rdi")       # The rest go after the first string
+        result.append("    sub $16, %r12")
+        result.append("    jmp string_concat_n_copy")
+
+        result.append("string_concat_n_new:")
+        result.append("    lea 1(%r13), %rdi")
+        result.append("    call arena_alloc")
+        result.append("    mov %rax, %rdi")
+
+        result.append("string_concat_n_copy:")
+        result.append("    cmp %rbx, %r12")
+        result.append("    jbe string_concat_n_done")
+        result.append("    sub $16, %r12")
+        result.append("    mov (%r12), %rcx")
+        result.append("    mov 8(%r12), %rsi")
+        result.append("    rep movsb")
+        result.append("    jmp string_concat_n_copy")
+
+        result.append("string_concat_n_done:")
+        result.append("    movb $0, (%rdi)")
+        result.append("    mov %r13, %rdx")       # Return the string in %rax and its length
+        result.append("    pop %r13")
+        result.append("    pop %r12")
+        result.append("    pop %rbx")
+        result.append("    ret")
+
+        # Main code follows
+        result.append("_start:")
+        return result
+
+def compile_file(input_filename, output_filename=None, debug=False, precompute=None, debug_info=False,
+                 keep_temp=False):
+    """Compile a Vibe Language source file into an x86-64 Linux executable.
+
+    precompute, a (max_bytes, max_seconds) budget, runs the program at
+    build time and builds an executable that only writes its output.
+    debug_info adds a line table mapping the code to source lines (-g).
+    The assembly is piped straight into as; keep_temp writes it and the
+    object file next to the output as well.
+    """
+    # Set default output filename if not provided
+    if output_filename is None:
+        output_filename = os.path.splitext(input_filename)[0]
+
+    try:
+        # Read source file
+        with open(input_filename, 'r') as f:
+            source = f.read()
+
+        if debug:
+            print(f"Source code:\n{source}\n")
+
+        # Tokenize
+        lexer = Lexer(source)
+        tokens = lexer.tokenize()
+
+        # Parse
+        parser = Parser(tokens)
+        ast = parser.parse()
+
+        if debug:
+            print("\nAST structure:")
+            print_ast(ast, 0)
+            print()
+
+        precomputed = precompute_output(ast, precompute) if precompute else None
+    except Exception as e:
+        print(f"Error during compilation: {e}")
+        sys.exit(1)
+
+    def generate(output):
+        if precomputed is not None:
+            X86CodeGenerator().generate_precomputed(precomputed, output)
+        else:
+            X86CodeGenerator(input_filename if debug_info else None).generate(ast, output)
+
+    # Assemble the generated code as it is written, then link with the host toolchain
+    with BuildDirectory(output_filename, keep_temp) as build:
+        try:
+            print("Assembling...")
+            object_filename = build.path('.o')
+            run_pipeline([["as", "--64", "-o", object_filename, "-"]], generate,
+                         [build.path('.s')] if keep_temp else None)
+
+            print("Linking...")
+            subprocess.run(["ld", "-o", output_filename, object_filename], check=True)
+
+            print(f"Executable created: {output_filename}")
+
+            # Make the file executable
+            os.chmod(output_filename, 0o755)
+        except subprocess.SubprocessError as e:
+            print(f"Compilation error: {e}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error during compilation: {e}")
+            sys.exit(1)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m vibe.x86_compiler <input_file> [output_file] [--debug] [--precompute] [-g] [--keep-temp]")
+        sys.exit(1)
+
+    input_filename = sys.argv[1]
+    output_filename = None
+    debug_mode = False
+    precompute = None
+    debug_info = False
+    keep_temp = False
+
+    for arg in sys.argv[2:]:
+        if arg == '--debug':
+            debug_mode = True
+        elif arg == '--keep-temp':
+            keep_temp = True
+        elif arg == '-g':
+            debug_info = True
+        elif arg == '--precompute':
+            precompute = (DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS)
+        elif output_filename is None:
+            output_filename = arg
+
+    compile_file(input_filename, output_filename, debug_mode, precompute, debug_info, keep_temp)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 # Debug script
 import sys
-from src.tokenizer import Lexer
-from src.parser import Parser
-from src.interpreter import Interpreter
+sys.path.insert(0, 'src')
+from vibe.tokenizer import Lexer
+from vibe.parser import Parser
+from vibe.interpreter import Interpreter
 
 print("Starting debug script")
 